@@ -0,0 +1,125 @@
+"""Benchmark decoding of gamecenter landing payloads.
+
+Compares the time and memory taken to decode payloads, and parse goals from them,
+with the stdlib json module, orjson, and the msgspec decoder of only the fields
+goals are parsed from (`yohonhl.decode.game_goals`).
+
+Run with saved landing payloads, e.g. from
+https://api-web.nhle.com/v1/gamecenter/2023020747/landing::
+
+    python benchmarks/bench_decode.py landing.json ...
+
+or without arguments to use a synthetic payload of a similar shape and size.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any
+
+from yohonhl import decode
+from yohonhl.stats import parse_goals
+
+
+def synthetic_landing(goals_per_period: int = 3, padding: int = 400) -> bytes:
+    """Build a landing payload with scoring plus bulky data goals don't need."""
+    name = {"default": "A. Player", "cs": "A. Player", "fi": "A. Player"}
+    goal = {
+        "timeInPeriod": "12:34",
+        "name": name,
+        "firstName": name,
+        "lastName": name,
+        "teamAbbrev": {"default": "DET"},
+        "homeScore": 1,
+        "awayScore": 0,
+        "strength": "ev",
+        "headshot": "https://assets.nhle.com/mugs/nhl/20232024/DET/8475000.png",
+        "highlightClipSharingUrl": "https://nhl.com/video/" + "x" * 80,
+        "assists": [{"playerId": 8470000 + i, "name": name} for i in range(2)],
+    }
+    scoring = [
+        {
+            "periodDescriptor": {"number": p, "periodType": "REG"},
+            "goals": [goal] * goals_per_period,
+        }
+        for p in (1, 2, 3)
+    ]
+    team = {"id": 17, "abbrev": "DET", "name": name, "logo": "x" * 60, "sog": 30}
+    stats = [
+        {"playerId": 8470000 + i, "name": name, "toi": "20:00", "shots": i % 5}
+        for i in range(padding)
+    ]
+    payload = {
+        "id": 2023020747,
+        "season": 20232024,
+        "gameDate": "2024-01-25",
+        "gameState": "OFF",
+        "homeTeam": team,
+        "awayTeam": team,
+        "summary": {"scoring": scoring, "threeStars": stats[:3], "penalties": []},
+        "matchup": {"skaterComparison": stats, "goalieComparison": stats[:4]},
+    }
+    return json.dumps(payload).encode()
+
+
+def stdlib_loads(body: bytes) -> Any:
+    """Decode with the stdlib json module."""
+    return json.loads(body)
+
+
+def measure(
+    decoder: Callable[[bytes], Any], bodies: list[bytes], repeat: int
+) -> tuple[float, int, int]:
+    """Get the time to decode and parse goals, and memory allocated, per body.
+
+    Memory is the peak allocated while decoding all bodies, and what is still
+    allocated after, for as long as the decoded payloads are kept.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for body in bodies:
+            parse_goals(decoder(body))
+    per_body = (time.perf_counter() - start) / (repeat * len(bodies))
+
+    tracemalloc.start()
+    kept = [decoder(body) for body in bodies]
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return per_body, peak // len(bodies), retained // len(bodies)
+
+
+def main() -> None:
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("payloads", nargs="*", type=Path, help="landing JSON files")
+    parser.add_argument("-n", "--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    bodies = [p.read_bytes() for p in args.payloads] or [synthetic_landing()]
+    size = sum(map(len, bodies)) // len(bodies)
+    print(f"{len(bodies)} payload(s), {size / 1024:.1f} KiB on average\n")
+
+    decoders: dict[str, Callable[[bytes], Any]] = {"json": stdlib_loads}
+    if find_spec("orjson") is not None:
+        decoders["orjson"] = decode.loads
+    if find_spec("msgspec") is not None:
+        decoders["msgspec game_goals"] = decode.game_goals
+
+    print(f"{'decoder':<20}{'time/game':>14}{'peak alloc':>14}{'retained':>14}")
+    for label, decoder in decoders.items():
+        per_body, peak, retained = measure(decoder, bodies, args.repeat)
+        print(
+            f"{label:<20}{per_body * 1e6:>11.1f} us"
+            f"{peak / 1024:>10.1f} KiB{retained / 1024:>10.1f} KiB"
+        )
+    if len(decoders) == 1:
+        print("\nInstall the 'fast' extra to compare orjson and msgspec.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark parsing of period clocks and schedule dates.
+
+Compares strptime, which parsing used to go through, with slicing and caching
+of repeated values in `yohonhl.api.parse_date` and `yohonhl.stats.parse_clock`,
+on inputs the size of a season: about 1,300 games and 7,500 goals.
+
+    python benchmarks/bench_parse.py
+"""
+
+import argparse
+import random
+import timeit
+from collections.abc import Callable
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from typing import Any
+
+from yohonhl import api
+from yohonhl import stats
+
+
+def strptime_date(datestr: str) -> date:
+    """Parse a date the way it used to be."""
+    return datetime.strptime(datestr, "%Y-%m-%d").date()  # noqa: DTZ007
+
+
+def strptime_clock(clock: str) -> time:
+    """Parse a period clock the way it used to be."""
+    return datetime.strptime(clock, "%M:%S").time()  # noqa: DTZ007
+
+
+def season_inputs(seed: int = 0) -> tuple[list[str], list[str]]:
+    """Get the schedule days of a season's games, and clocks of its goals.
+
+    Each game's day is parsed once per schedule week it is in, and each goal's
+    clock once.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    start = date(2023, 10, 10)
+    days = [str(start + timedelta(days=rng.randrange(250))) for _ in range(1312)]
+    clocks = [f"{rng.randrange(20):02d}:{rng.randrange(60):02d}" for _ in range(7500)]
+    return days, clocks
+
+
+def bench(parse: Callable[[str], Any], values: list[str], repeat: int) -> float:
+    """Get the best time to parse all `values`, in seconds."""
+
+    def run() -> None:
+        cache_clear = getattr(parse, "cache_clear", None)
+        if cache_clear is not None:
+            # Each run parses a new season, rather than reusing the last one's.
+            cache_clear()
+        for value in values:
+            parse(value)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main() -> None:
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    days, clocks = season_inputs()
+    cases = [
+        ("dates", days, strptime_date, api.parse_date),
+        ("clocks", clocks, strptime_clock, stats.parse_clock),
+    ]
+    print(f"{'input':<8}{'count':>7}{'strptime':>12}{'fast':>12}{'speedup':>9}")
+    for label, values, slow, fast in cases:
+        slow_time = bench(slow, values, args.repeat)
+        fast_time = bench(fast, values, args.repeat)
+        print(
+            f"{label:<8}{len(values):>7}{slow_time * 1e3:>9.2f} ms"
+            f"{fast_time * 1e3:>9.2f} ms{slow_time / fast_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
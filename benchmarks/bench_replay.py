@@ -0,0 +1,67 @@
+"""Benchmark getting goals against recorded API traffic, without a network.
+
+Record the responses to getting a date range's goals once, such as a whole
+season's::
+
+    python benchmarks/bench_replay.py record season.zip -f 2023-10-10 -t 2024-04-18
+
+then get the same goals from the recording as often as needed, with each
+response taking a simulated latency plus random jitter::
+
+    python benchmarks/bench_replay.py replay season.zip -f 2023-10-10 -t 2024-04-18 \
+        --latency 0.05 --jitter 0.05 -c 20
+
+Both print the number of goals and the time taken to get them.
+"""
+
+import argparse
+import time
+
+from yohonhl import api
+from yohonhl import stats
+from yohonhl.transport import RecordingTransport
+from yohonhl.transport import ReplayTransport
+from yohonhl.transport import Transport
+
+
+def get_goals(args: argparse.Namespace, transport: Transport) -> None:
+    """Get the goals of the date range over `transport`, printing how long it took."""
+    client = api.Client(transport=transport)
+    start = time.perf_counter()
+    goals = sum(
+        1
+        for _ in stats.get_goals(
+            args.start, args.end, args.concurrency, client=client, workers=args.jobs
+        )
+    )
+    elapsed = time.perf_counter() - start
+    api.close(client)
+    print(f"{goals} goals in {elapsed:.2f} s ({goals / elapsed:.0f} goals/s)")
+
+
+def main() -> None:
+    """Record or replay getting goals."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("archive")
+    parser.add_argument("-f", "--from", dest="start", required=True)
+    parser.add_argument("-t", "--to", dest="end", default="")
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        with RecordingTransport(args.archive) as recording:
+            get_goals(args, recording)
+    else:
+        with ReplayTransport(
+            args.archive, args.latency, args.jitter, args.seed
+        ) as replay:
+            get_goals(args, replay)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,19 @@
 """Command-line interface."""
 
 import logging
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Any
+from typing import Optional
+from typing import TypeVar
 
 import click
-import pandas as pd
 
 from yohonhl import api
-from yohonhl import stats
+
+_F = TypeVar("_F", bound=Callable[..., Any])
 
 
 @click.group()
@@ -20,48 +26,346 @@ def main(verbose: bool) -> None:
         logging.getLogger().setLevel(logging.DEBUG)
 
 
-def _current_datestr() -> str:
-    return api.fmt_date(datetime.now().date())  # noqa: DTZ005
+@contextmanager
+def _client(cache: Optional[str]) -> Iterator[Optional[api.Client]]:
+    """Make a client caching responses in `cache`, or use the shared one if None."""
+    if not cache:
+        yield None
+        return
+    from yohonhl.cache import ResponseCache
+
+    with ResponseCache(cache) as response_cache:
+        client = api.Client(cache=response_cache)
+        try:
+            yield client
+        finally:
+            api.close(client)
+
+
+# Options of commands getting games from the API.
+_LIMIT_OPTIONS = [
+    click.option(
+        "-c",
+        "--concurrency",
+        help="Maximum number of API requests in flight at once.",
+        type=click.IntRange(min=1),
+        default=api.DEFAULT_CONCURRENCY,
+        show_default=True,
+    ),
+    click.option(
+        "-r",
+        "--rate",
+        help="Maximum number of API requests per second.  [default: unlimited]",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+    ),
+]
+
+_FETCH_OPTIONS = [
+    click.option(
+        "-f",
+        "--from",
+        "start",
+        help="Get games starting from date (YYYY-MM-DD).",
+        default="",
+        show_default="today",
+    ),
+    click.option(
+        "-t",
+        "--to",
+        "end",
+        help="End date for range from which to get games (YYYY-MM-DD). "
+        "Ignored if --from is not specified as well.",
+        default="",
+        show_default="today",
+    ),
+    *_LIMIT_OPTIONS,
+    click.option(
+        "--cache",
+        help="Cache API responses in this file, so finished games are only "
+        "downloaded once.",
+        type=click.Path(dir_okay=False, writable=True),
+        envvar="YOHONHL_CACHE",
+        default=None,
+    ),
+]
+
+
+def _options(options: list[Callable[[_F], _F]]) -> Callable[[_F], _F]:
+    """Get a decorator adding all of `options` to a command, in order."""
+
+    def decorator(command: _F) -> _F:
+        for option in reversed(options):
+            command = option(command)
+        return command
+
+    return decorator
+
+
+# Options of commands getting games from the API, and of limiting its requests.
+_fetch_options = _options(_FETCH_OPTIONS)
+_limit_options = _options(_LIMIT_OPTIONS)
+
+
+_db_option = click.option(
+    "--db",
+    help="SQLite database of games and goals.",
+    type=click.Path(dir_okay=False, writable=True),
+    envvar="YOHONHL_DB",
+    required=True,
+)
 
 
 @main.command()
 @click.option(
     "-o",
     "--output",
-    help="Write goals to output file as CSV",
-    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Write goals to output file, or directory for Parquet.",
+    type=click.Path(writable=True, allow_dash=True),
     default="-",
 )
+@click.option(
+    "--format",
+    "fmt",
+    help="Output format. Parquet is written as a dataset partitioned by season, "
+    "in which the goals of the games written replace those already there.",
+    type=click.Choice(["csv", "jsonl", "arrow", "parquet"]),
+    default="csv",
+    show_default=True,
+)
 @click.option(
     "-a",
     "--append",
-    help="Append to the output file if it exists.",
+    help="Update the output file if it exists, rather than overwrite it. "
+    "Games already in a CSV or JSON Lines file are written once, and replaced "
+    "if their goals changed. Parquet datasets are always updated this way.",
     is_flag=True,
     default=False,
 )
+@_fetch_options
+@click.option(
+    "-j",
+    "--jobs",
+    help="Number of processes to parse goals in. Not used when updating a CSV or "
+    "JSON Lines file with --append.",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+)
+def goals(
+    output: str,
+    fmt: str,
+    append: bool,
+    start: str,
+    end: str,
+    concurrency: int,
+    rate: Optional[float],
+    cache: Optional[str],
+    jobs: int,
+) -> None:
+    """Get goal data for games."""
+    from yohonhl import incremental
+    from yohonhl import stats
+
+    if fmt == "parquet" and output == "-":
+        raise click.UsageError("--format parquet needs an --output directory")
+    if fmt == "arrow" and append:
+        raise click.UsageError("--append is not supported with --format arrow")
+    mode = "a" if append else "w"
+    with _client(cache) as client:
+        options: dict[str, Any] = {
+            "start_date": start,
+            "end_date": end,
+            "concurrency": concurrency,
+            "rate": rate,
+            "client": client,
+            "workers": jobs if jobs > 1 else None,
+        }
+        if append and fmt in incremental.FORMATS and output != "-":
+            del options["workers"]
+            goal_file = incremental.GoalFile(output, fmt)
+            goal_file.update(stats.iter_game_goals(**options))
+        # Rows are written as games are parsed, rather than all at the end.
+        elif fmt == "csv":
+            with click.open_file(output, mode=mode) as f:
+                stats.write_csv(stats.get_goals(**options), f, header=not append)
+        elif fmt == "jsonl":
+            with click.open_file(output, mode=mode) as f:
+                stats.write_jsonl(stats.get_goals(**options), f)
+        # Columnar formats are written from a table of all the goals.
+        elif fmt == "arrow":
+            with click.open_file(output, mode="wb") as f:
+                stats.write_arrow(stats.get_goal_table(**options), f)
+        else:
+            stats.write_parquet(stats.get_goal_table(**options), output)
+
+
+@main.command()
+@_db_option
+@_fetch_options
+def ingest(
+    db: str,
+    start: str,
+    end: str,
+    concurrency: int,
+    rate: Optional[float],
+    cache: Optional[str],
+) -> None:
+    """Store games and their goals in a local database, to query later."""
+    from yohonhl import sync
+    from yohonhl.store import Store
+
+    with _client(cache) as client, Store(db) as store:
+        sync.ingest(store, start, end, concurrency, rate, client)
+
+
+@main.command("sync")
+@_db_option
+@_fetch_options
+def sync_(
+    db: str,
+    start: str,
+    end: str,
+    concurrency: int,
+    rate: Optional[float],
+    cache: Optional[str],
+) -> None:
+    """Update a database of games and goals with what changed since last time.
+
+    The first sync gets games from --from. Later ones start after the last day
+    whose games were all final, and only get the goals of games that started
+    or were live since.
+    """
+    from yohonhl import sync
+    from yohonhl.store import Store
+
+    with _client(cache) as client, Store(db) as store:
+        sync.update(store, start, end, concurrency, rate, client)
+
+
+@main.command()
+@click.argument("game_ids", metavar="[GAME_ID]...", nargs=-1, type=int)
+@click.option(
+    "-o",
+    "--output",
+    help="Write goals to output file.",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    default="-",
+)
+@click.option(
+    "--format",
+    "fmt",
+    help="Output format.",
+    type=click.Choice(["csv", "jsonl"]),
+    default="csv",
+    show_default=True,
+)
+@click.option(
+    "-i",
+    "--interval",
+    help="Seconds between polls of a game in play, at least 1.  [default: 10]",
+    type=click.FloatRange(min=1),
+    default=None,
+)
+@_limit_options
+def watch(
+    game_ids: tuple[int, ...],
+    output: str,
+    fmt: str,
+    interval: Optional[float],
+    concurrency: int,
+    rate: Optional[float],
+) -> None:
+    """Follow games in progress, writing goals as they are scored.
+
+    Follows the given games, or today's games that are not final, until they
+    are over. Games are polled less often in intermissions and before they
+    start.
+    """
+    from yohonhl import live
+    from yohonhl import stats
+
+    goals = live.watch(
+        game_ids or None,
+        concurrency=concurrency,
+        rate=rate,
+        interval=live.LIVE_INTERVAL if interval is None else interval,
+    )
+    with click.open_file(output, mode="w") as f:
+        if fmt == "csv":
+            stats.write_csv([], f)
+        for goal in goals:
+            if fmt == "csv":
+                stats.write_csv([goal], f, header=False)
+            else:
+                stats.write_jsonl([goal], f)
+            f.flush()
+
+
+@main.command()
+@_db_option
+@click.option("--season", help="Season, such as 20232024.", type=int)
+@click.option("--team", help="Abbreviation of the scoring team, such as DET.")
+@click.option("--player", help='Name of the scorer, such as "D. Larkin".')
+@click.option("--strength", help="Strength goals were scored at: ev, pp or sh.")
 @click.option(
     "-f",
     "--from",
     "start",
-    help="Get goals starting from date (YYYY-MM-DD).",
-    default=_current_datestr(),
-    show_default=True,
+    help="First day goals were scored on (YYYY-MM-DD).",
+    type=click.DateTime(["%Y-%m-%d"]),
 )
 @click.option(
     "-t",
     "--to",
     "end",
-    help="End date for range from which to get goals (YYYY-MM-DD). "
-    "Ignored if --from is not specified as well.",
-    default=_current_datestr(),
+    help="Last day goals were scored on (YYYY-MM-DD).",
+    type=click.DateTime(["%Y-%m-%d"]),
+)
+@click.option(
+    "-o",
+    "--output",
+    help="Write goals to output file.",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    default="-",
+)
+@click.option(
+    "--format",
+    "fmt",
+    help="Output format.",
+    type=click.Choice(["csv", "jsonl"]),
+    default="csv",
     show_default=True,
 )
-def goals(output: str, append: bool, start: str, end: str) -> None:
-    """Get goal data for games."""
-    goals = stats.get_goals(start_date=start, end_date=end)
-    df = pd.DataFrame(goals)  # type: ignore
-    with click.open_file(output, mode="a" if append else "w") as f:
-        df.to_csv(f, index=False, header=not append)
+def query(
+    db: str,
+    season: Optional[int],
+    team: Optional[str],
+    player: Optional[str],
+    strength: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    output: str,
+    fmt: str,
+) -> None:
+    """Get goals stored by ingest matching all the given filters."""
+    from yohonhl import stats
+    from yohonhl.store import Store
+
+    with Store(db) as store:
+        goals = store.goals(
+            season=season,
+            team=team.upper() if team else None,
+            player=player,
+            strength=strength.lower() if strength else None,
+            start=start.date() if start else None,
+            end=end.date() if end else None,
+        )
+    with click.open_file(output, mode="w") as f:
+        if fmt == "csv":
+            stats.write_csv(goals, f)
+        else:
+            stats.write_jsonl(goals, f)
 
 
 if __name__ == "__main__":
@@ -5,40 +5,94 @@
 """
 
 import asyncio
+import atexit
 import logging
+import math
+import os
+import random
+import threading
+import time
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
 from collections.abc import Coroutine
+from collections.abc import Hashable
 from collections.abc import Iterable
 from collections.abc import Iterator
 from collections.abc import Sequence
-from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from http import HTTPStatus
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import Optional
+from typing import TypeVar
 from typing import Union
+from urllib.parse import urlsplit
 
-import aiohttp
+from yohonhl import decode
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from yohonhl.cache import CacheEntry
+    from yohonhl.cache import ResponseCache
+    from yohonhl.transport import Response
+    from yohonhl.transport import Transport
 
 URL = "https://api-web.nhle.com/v1"
 
 DATE_FMT = "%Y-%m-%d"
 
+DEFAULT_CONCURRENCY = 20
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+FINAL_STATES = frozenset({"OFF", "FINAL"})
+
+# States of games that have not started (yet), so have no goals.
+UPCOMING_STATES = frozenset({"FUT", "PRE", "PPD"})
+
+# States of games in progress, whose goals and clock change from one poll to the next.
+LIVE_STATES = frozenset({"LIVE", "CRIT"})
+
 _log = logging.getLogger("yohonhl.api")
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
 
+
+@lru_cache(maxsize=4096)
 def parse_date(datestr: str) -> date:
-    """Parse a date string from the API into a naive datetime.date object."""
+    """Parse a date string from the API into a naive datetime.date object.
+
+    YYYY-MM-DD strings, as the API sends, are sliced rather than going through
+    strptime, and repeated strings such as schedule days are only parsed once.
+    """
+    year, month, day = datestr[:4], datestr[5:7], datestr[8:]
+    if datestr[4:5] == datestr[7:8] == "-" and (year + month + day).isdigit():
+        try:
+            return date(int(year), int(month), int(day))
+        except ValueError:
+            pass
     return datetime.strptime(datestr, DATE_FMT).date()  # noqa: DTZ007
 
 
 def fmt_date(d: date) -> str:
     """Format a datetime.date into YYYY-MM-DD for the API."""
-    return d.strftime(DATE_FMT)
+    return d.isoformat()
 
 
 def normalize_datestr(datestr: str) -> str:
     """Normalize a datestring into YYYY-MM-DD."""
-    return datetime.strftime(datetime.strptime(datestr, DATE_FMT), DATE_FMT)  # noqa: DTZ007
+    return fmt_date(parse_date(datestr))
 
 
 def _get_week_start_dates(date_from: str, date_to: str) -> Sequence[str]:
@@ -59,59 +113,1013 @@ def _get_week_start_dates(date_from: str, date_to: str) -> Sequence[str]:
     return [fmt_date(d) for d in dts_start]  # pragma: no branch
 
 
-async def _get_endpoint_async(url: str, session: aiohttp.ClientSession) -> Any:
-    async with session.get(url=url) as response:
-        _log.debug("GET %r -> status: %r", response.url, response.status)
-        if response.ok:
-            return await response.json()
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Policy for retrying transient API failures.
+
+    Attributes
+    ----------
+    max_attempts : int
+        Maximum number of attempts per request, including the first.
+    backoff : float
+        Base delay in seconds, doubled after every failed attempt.
+    max_backoff : float
+        Upper bound in seconds for any single delay, including `Retry-After`.
+    jitter : bool
+        Whether to pick a random delay up to the backoff ("full jitter").
+    statuses : frozenset[int]
+        HTTP statuses worth retrying. Connection errors are always retried.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    jitter: bool = True
+    statuses: frozenset[int] = RETRY_STATUSES
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Get the delay in seconds before retrying after failed `attempt`."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_backoff)
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay  # noqa: S311
+
+
+DEFAULT_RETRY = RetryPolicy()
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching a single endpoint.
+
+    Attributes
+    ----------
+    url : str
+        The requested URL.
+    data : Any
+        Decoded JSON payload, or None if the request failed.
+    status : int, optional
+        HTTP status of the last response, None if no response was received.
+    attempts : int
+        Number of attempts made.
+    error : str, optional
+        Description of the last failure, None on success.
+    cached : bool
+        Whether the payload was served from the response cache, either directly
+        or after the server confirmed it was unchanged.
+    """
+
+    url: str
+    data: Any = None
+    status: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Whether a payload was received."""
+        return self.error is None and self.data is not None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header given in seconds or as an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
         return None
+    return retry_at.timestamp() - time.time()
 
 
-async def _get_endpoints_async(urls: Iterable[str]) -> Iterator[dict[str, Any]]:
-    """Get multiple endpoints in parallel."""
-    async with aiohttp.ClientSession() as session:
-        tasks = (_get_endpoint_async(url, session) for url in urls)
-        results = await asyncio.gather(*tasks)
-        return filter(None, results)
+class Client:
+    """Long-lived NHL API client sharing one connection pool between requests.
 
+    The underlying `aiohttp.ClientSession` is created lazily on first use and
+    bound to the event loop that created it. It stays open, keeping connections
+    warm, until `close` is called. Sync api functions use clients from the
+    library's own background event loop.
 
-def _run_async(coro: Coroutine[Any, Any, Iterable[dict[str, Any]]]) -> Any:
-    """Run asyncio in a thread if an event loop is already running.
+    Parameters
+    ----------
+    limit : int
+        Maximum number of simultaneous connections in the pool.
+    limit_per_host : int
+        Maximum number of simultaneous connections to one host, 0 for no limit.
+    keepalive_timeout : float
+        Seconds an idle connection is kept open for reuse.
+    ttl_dns_cache : int
+        Seconds DNS lookups are cached for.
+    retry : RetryPolicy
+        Policy for retrying failed requests.
+    cache : ResponseCache, optional
+        Cache serving finished games and recent schedule weeks without a request.
+        The client does not close it.
+    transport : Transport, optional
+        Transport sending requests, such as a `RecordingTransport` or
+        `ReplayTransport`. Defaults to sending them over the client's session.
+        The client does not close it.
 
-    This is necessary to allow running async functions from a Jupyter Notebook,
-    which has a running asyncio event loop.
+    Concurrent requests over the client for the same URL, decoded the same way,
+    share one request and the same `FetchResult`.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        ttl_dns_cache: int = 300,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        cache: Optional["ResponseCache"] = None,
+        transport: Optional["Transport"] = None,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.retry = retry
+        self.cache = cache
+        if transport is None:
+            from yohonhl.transport import Transport
+
+            transport = Transport()
+        self.transport = transport
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flights = _SingleFlight()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the client currently has no open session."""
+        return self._session is None or self._session.closed
+
+    def session(self) -> "aiohttp.ClientSession":
+        """Get the shared session, creating it on the running event loop.
+
+        Raises
+        ------
+        RuntimeError
+            If the session is open on a different event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed:
+            if self._loop is not loop:
+                raise RuntimeError("Client session is bound to another event loop")
+            return self._session
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._loop = loop
+        _log.debug("Opened client session (limit=%d)", self.limit)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            _log.debug("Closed client session")
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self) -> "Client":
+        """Enter an async context that closes the client on exit."""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the client."""
+        await self.close()
+
+
+class _Flight:
+    """A request shared by the callers waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[FetchResult]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _SingleFlight:
+    """Shares one request between concurrent callers asking for the same thing.
+
+    A caller asking for a key that is already in flight waits for the same
+    result instead of making a request of its own. The request is cancelled only
+    if all of its callers are, and forgotten once it completes, so later callers
+    make a new one.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        """Get the number of requests in flight."""
+        return len(self._flights)
+
+    async def run(
+        self, key: Hashable, fetch: Callable[[], Awaitable[FetchResult]]
+    ) -> FetchResult:
+        """Get the result of `fetch`, or of the request in flight for `key`."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fetch()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+                # Let the request finish cancelling before its client may close.
+                await asyncio.wait([flight.task])
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+_client: Optional[Client] = None
+
+
+def get_client() -> Client:
+    """Get the shared client used by api functions when none is given."""
+    global _client
+    if _client is None:
+        _client = Client()
+    return _client
+
+
+def _is_final(game: dict[str, Any]) -> bool:
+    return game.get("gameState") in FINAL_STATES
+
+
+def _cache_ttl(url: str, data: Any, schedule_ttl: float) -> Optional[float]:
+    """Get how long a payload may be served from cache, or None to not cache it.
+
+    Finished games never change, so they are cached forever, as are schedule
+    weeks whose games have all finished. Other schedule weeks are cached for
+    `schedule_ttl` seconds. Live and future games are not cached.
+    """
+    if not isinstance(data, dict):
+        return None
+    if "gameWeek" in data:
+        games = [g for day in data["gameWeek"] for g in day["games"]]
+        if games and all(map(_is_final, games)) and not url.endswith("/now"):
+            return math.inf
+        return schedule_ttl
+    return math.inf if _is_final(data) else None
+
+
+def _conditional_headers(entry: Optional["CacheEntry"]) -> dict[str, str]:
+    """Get headers asking the server to only send `entry` if it has changed."""
+    headers = {}
+    if entry is not None and entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry is not None and entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _put_cached(
+    url: str,
+    response: "Response",
+    data: Any,
+    cache: Optional["ResponseCache"],
+) -> None:
+    if cache is None:
+        return
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    ttl = _cache_ttl(url, data, cache.schedule_ttl)
+    if ttl is None and (etag or last_modified):
+        # Not worth serving as is, but worth revalidating next time.
+        ttl = 0.0
+    if ttl is not None:
+        cache.put(url, response.body, ttl, etag=etag, last_modified=last_modified)
+
+
+def _revalidated(
+    result: FetchResult,
+    entry: "CacheEntry",
+    cache: "ResponseCache",
+    decoder: decode.Decoder,
+) -> FetchResult:
+    """Complete `result` from a cache entry the server reported unchanged."""
+    result.data = decoder(entry.body)
+    result.error = None
+    result.cached = True
+    ttl = _cache_ttl(result.url, result.data, cache.schedule_ttl)
+    cache.touch(result.url, 0.0 if ttl is None else ttl)
+    return result
+
+
+def _decoded(
+    result: FetchResult,
+    url: str,
+    response: "Response",
+    decoder: decode.Decoder,
+    cache: Optional["ResponseCache"],
+) -> FetchResult:
+    """Complete `result` from a successful response, caching its body.
+
+    Bodies that don't decode are not retried: the server sent them whole, and
+    would send the same again.
     """
     try:
-        asyncio.get_running_loop()
-        with ThreadPoolExecutor(1) as pool:
+        result.data = decoder(response.body)
+    except ValueError as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    result.error = None
+    _put_cached(url, response, result.data, cache)
+    return result
 
-            def job() -> Any:
-                return asyncio.run(coro)
 
-            return pool.submit(job).result()
-    except RuntimeError:
-        return asyncio.run(coro)
+async def _get_endpoint_async(
+    url: str,
+    client: Client,
+    limits: "RequestLimits",
+    decoder: decode.Decoder = decode.loads,
+) -> FetchResult:
+    """Get a single endpoint, retrying transient failures per the client's policy.
 
+    Every attempt waits for its own place within `limits`, rate included, and
+    gives it up while backing off before the next one.
 
-def get_weekly_schedules(
-    date_from: str = "", date_to: str = ""
+    Fresh payloads in the client's cache are returned without a request. Stale
+    ones with validators are revalidated with a conditional request, and reused
+    if the server responds 304 Not Modified. Response bodies are decoded with
+    `decoder`; the cache keeps them as they were received. Connection errors,
+    timeouts and retryable statuses are retried, but not bodies that fail to
+    decode.
+    """
+    cache = client.cache
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and entry.fresh:
+        _log.debug("GET %r -> cached", url)
+        return FetchResult(url, data=decoder(entry.body), cached=True)
+
+    import aiohttp
+
+    transport, retry = client.transport, client.retry
+    headers = _conditional_headers(entry)
+    result = FetchResult(url)
+    while True:
+        result.attempts += 1
+        retry_after = None
+        try:
+            async with limits.slot(url):
+                response = await transport.get(client, url, headers)
+            _log.debug("GET %r -> status: %r", url, response.status)
+            result.status = response.status
+            not_modified = response.status == HTTPStatus.NOT_MODIFIED
+            if not_modified and entry is not None and cache is not None:
+                return _revalidated(result, entry, cache, decoder)
+            if response.ok:
+                return _decoded(result, url, response, decoder, cache)
+            result.error = f"HTTP {response.status}"
+            if response.status not in retry.statuses:
+                return result
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result.error = f"{type(e).__name__}: {e}"
+
+        if result.attempts >= retry.max_attempts:
+            return result
+        delay = retry.delay(result.attempts, retry_after)
+        _log.debug("Retrying %r in %.2fs after %s", url, delay, result.error)
+        await asyncio.sleep(delay)
+
+
+class _TokenBucket:
+    """Token bucket allowing on average `rate` acquisitions per second.
+
+    Tokens are reserved before sleeping, so concurrent callers queue up behind
+    one another without needing a lock.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class RequestLimits:
+    """Limits shared by a group of requests.
+
+    At most `concurrency` of the requests are in flight at once, and if `rate`
+    is given each host is sent at most `rate` of them per second. Passing one
+    instance to several concurrent calls makes them share the limits.
+    """
+
+    def __init__(
+        self, concurrency: int = DEFAULT_CONCURRENCY, rate: Optional[float] = None
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency!r}")
+        if rate is not None and rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        self.concurrency = concurrency
+        self.rate = rate
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._buckets: dict[str, _TokenBucket] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Wait until a request to `url` is allowed, and hold its place."""
+        if self._slots is None:
+            # Created here rather than in __init__, which may run outside a loop.
+            self._slots = asyncio.Semaphore(self.concurrency)
+        async with self._slots:
+            if self.rate is not None:
+                host = urlsplit(url).netloc
+                bucket = self._buckets.setdefault(host, _TokenBucket(self.rate))
+                await bucket.acquire()
+            yield
+
+
+class _Source:
+    """Takes URLs from a sync or async iterable, without waiting on the latter.
+
+    Items of an async iterable are pulled in a background task, which callers
+    wait on (see `waiting`) alongside the requests in flight.
+    """
+
+    def __init__(self, urls: Union[Iterable[str], AsyncIterable[str]]) -> None:
+        self._sync: Optional[Iterator[str]] = None
+        self._async: Optional[AsyncIterator[str]] = None
+        if isinstance(urls, AsyncIterable):
+            self._async = urls.__aiter__()
+        else:
+            self._sync = iter(urls)
+        self._pull: Optional[asyncio.Future[tuple[bool, Optional[str]]]] = None
+        self._index = 0
+        self.exhausted = False
+
+    def take(self) -> Optional[tuple[int, str]]:
+        """Take the next URL and its index, if one is available right away."""
+        if self.exhausted:
+            return None
+        if self._async is None:
+            url = next(self._sync, None)  # type: ignore[arg-type]
+        elif self._pull is None:
+            self._pull = asyncio.ensure_future(_anext(self._async))
+            return None
+        elif not self._pull.done():
+            return None
+        else:
+            _, url = self._pull.result()
+            self._pull = None
+        if url is None:
+            self.exhausted = True
+            return None
+        self._index += 1
+        return self._index - 1, url
+
+    def waiting(self) -> list[asyncio.Future[Any]]:
+        """Get the pull of the next URL, if it is still in progress."""
+        return [self._pull] if self._pull and not self._pull.done() else []
+
+    async def close(self) -> None:
+        if self._pull is not None:
+            self._pull.cancel()
+            await asyncio.gather(self._pull, return_exceptions=True)
+
+
+def _ready(held: dict[int, Any], next_index: int, ordered: bool) -> list[int]:
+    """Get the indexes of held results that can be yielded now."""
+    if not ordered:
+        return list(held)
+    ready: list[int] = []
+    while next_index + len(ready) in held:
+        ready.append(next_index + len(ready))
+    return ready
+
+
+async def _iter_endpoints_async(
+    urls: Union[Iterable[str], AsyncIterable[str]],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    ordered: bool = False,
+    limits: Optional[RequestLimits] = None,
+    decoder: decode.Decoder = decode.loads,
+) -> AsyncGenerator[FetchResult, None]:
+    """Fetch multiple endpoints in parallel, yielding each result as it completes.
+
+    At most `concurrency` requests are in flight at once, and if `rate` is given
+    each host is sent at most `rate` requests per second; or `limits` are shared
+    with other calls instead. New requests are only started as results are
+    consumed, so a slow consumer holds at most about `concurrency` payloads in
+    memory. There is one result for every URL, whether or not it succeeded.
+
+    `urls` may be an async iterable, in which case requests start as soon as each
+    URL arrives, while the results of earlier ones are being yielded.
+
+    If `ordered`, results are yielded in the order of `urls` instead, holding
+    back any that complete before those ahead of them. Held results count
+    towards `concurrency` as if still in flight, so a slow request holds back
+    new ones rather than letting results pile up behind it. Payloads are decoded
+    with `decoder`.
+    """
+    limits = limits or RequestLimits(concurrency, rate)
+    client = client or get_client()
+
+    def fetch(url: str) -> Awaitable[FetchResult]:
+        flights = client._flights  # noqa: SLF001
+        return flights.run(
+            (url, decoder), lambda: _get_endpoint_async(url, client, limits, decoder)
+        )
+
+    source = _Source(urls)
+    running: dict[asyncio.Future[Any], int] = {}
+    held: dict[int, FetchResult] = {}
+    next_index = 0
+    try:
+        while True:
+            while len(running) + len(held) < limits.concurrency:
+                taken = source.take()
+                if taken is None:
+                    break
+                running[asyncio.ensure_future(fetch(taken[1]))] = taken[0]
+            if not running and source.exhausted:
+                return
+            done, _ = await asyncio.wait(
+                [*running, *source.waiting()], return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done & running.keys():
+                held[running.pop(task)] = task.result()
+            ready = _ready(held, next_index, ordered)
+            next_index += len(ready)
+            for i in ready:
+                yield held.pop(i)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, source.close(), return_exceptions=True)
+
+
+async def _fetch_endpoints_async(
+    urls: Iterable[str],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[RequestLimits] = None,
+    decoder: decode.Decoder = decode.loads,
+) -> list[FetchResult]:
+    """Fetch multiple endpoints in parallel over the client's connection pool.
+
+    Results are returned in the order of `urls`, one for every URL whether or not
+    it succeeded. See `_iter_endpoints_async` for the scheduling parameters.
+    """
+    results = _iter_endpoints_async(
+        urls, client, concurrency, rate, ordered=True, limits=limits, decoder=decoder
+    )
+    return [r async for r in results]
+
+
+def _payloads(results: Iterable[FetchResult]) -> Iterator[dict[str, Any]]:
+    """Get payloads of successful results, logging the failed ones."""
+    for r in results:
+        if r.ok:
+            yield r.data
+        else:
+            _log_failure(r)
+
+
+async def _apayloads(
+    results: AsyncIterable[FetchResult],
+) -> AsyncIterator[dict[str, Any]]:
+    """Get payloads of successful results, logging the failed ones."""
+    async for r in results:
+        if r.ok:
+            yield r.data
+        else:
+            _log_failure(r)
+
+
+def _log_failure(result: FetchResult) -> None:
+    _log.warning(
+        "Failed to get %r after %d attempt(s): %s",
+        result.url,
+        result.attempts,
+        result.error,
+    )
+
+
+async def _get_endpoints_async(
+    urls: Iterable[str],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[RequestLimits] = None,
 ) -> Iterator[dict[str, Any]]:
-    """Get the weekly schedule of games between given dates."""
+    """Get payloads of multiple endpoints, skipping those that failed."""
+    results = await _fetch_endpoints_async(urls, client, concurrency, rate, limits)
+    return _payloads(results)
+
+
+class _LoopThread:
+    """Event loop owned by the library, running forever in a daemon thread.
+
+    Sync api functions run their coroutines on this loop, so sessions opened by
+    one call stay usable, with their connections warm, for the next.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Get the loop, starting its thread if it is not running yet."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="yohonhl-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, _R]) -> _R:
+        """Run `coro` on the loop and wait for its result.
+
+        Raises
+        ------
+        RuntimeError
+            If called from a coroutine running on the loop itself, which would
+            deadlock.
+        """
+        loop = self.loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Cannot wait on the yohonhl event loop from itself")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result()
+        except BaseException:
+            # E.g. KeyboardInterrupt: don't leave the coroutine running.
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Stop the loop and wait for its thread to finish."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _reset(self) -> None:
+        # After a fork, the loop's thread does not exist in the child.
+        self._lock = threading.Lock()
+        self._loop = self._thread = None
+
+
+_background = _LoopThread()
+
+
+def run_sync(coro: Coroutine[Any, Any, _R]) -> _R:
+    """Run a coroutine on the library's background event loop from sync code.
+
+    The loop runs in its own thread, so this also works when the calling thread
+    already has a running event loop, as in a Jupyter Notebook.
+    """
+    return _background.run(coro)
+
+
+def close(client: Optional[Client] = None) -> None:
+    """Close `client`, or the shared client, from sync code."""
+    client = client or _client
+    if client is not None:
+        run_sync(client.close())
+
+
+def _shutdown() -> None:
+    close()
+    _background.stop()
+
+
+def _after_fork_in_child() -> None:
+    global _client
+    _client = None
+    _background._reset()  # noqa: SLF001
+
+
+atexit.register(_shutdown)
+if hasattr(os, "register_at_fork"):  # pragma: no branch
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+async def _anext(it: AsyncIterator[_T]) -> tuple[bool, Optional[_T]]:
+    """Get the next item of `it` as (True, item), or (False, None) at its end."""
+    try:
+        return True, await it.__anext__()
+    except StopAsyncIteration:
+        return False, None
+
+
+def iter_sync(it: AsyncGenerator[_T, None]) -> Iterator[_T]:
+    """Iterate over an async generator from sync code.
+
+    The generator runs on the library's background event loop, which keeps
+    going (e.g. finishing requests in flight) while the caller handles each item.
+    """
+    try:
+        while True:
+            has_item, item = run_sync(_anext(it))
+            if not has_item:
+                return
+            yield item  # type: ignore[misc]
+    finally:
+        run_sync(it.aclose())
+
+
+@asynccontextmanager
+async def use_client(client: Optional[Client] = None) -> AsyncIterator[Client]:
+    """Get a client to make requests with on the running event loop.
+
+    This is `client` if given. Otherwise it is the shared client when running
+    on the library's background loop, or else a temporary client that is closed
+    on exit; pass a client to keep connections open between calls.
+    """
+    if client is not None:
+        yield client
+    elif asyncio.get_running_loop() is _background._loop:  # noqa: SLF001
+        yield get_client()
+    else:
+        async with Client() as temporary:
+            yield temporary
+
+
+def game_url(game_id: int) -> str:
+    """Get the gamecenter landing endpoint for a game."""
+    return f"{URL}/gamecenter/{game_id}/landing"
+
+
+def _schedule_urls(date_from: str, date_to: str) -> list[str]:
     if not date_from:
-        return _run_async(_get_endpoints_async([f"{URL}/schedule/now"]))  # type: ignore
+        return [f"{URL}/schedule/now"]
 
     date_from = normalize_datestr(date_from)
     date_to = date_from if not date_to else normalize_datestr(date_to)
     start_dates = _get_week_start_dates(date_from, date_to)
 
     _log.debug("Getting weekly schedules for %r", start_dates)
-    urls = (f"{URL}/schedule/{dt}" for dt in start_dates)
-    return _run_async(_get_endpoints_async(urls))  # type: ignore
+    return [f"{URL}/schedule/{dt}" for dt in start_dates]
+
+
+async def aget_weekly_schedules(
+    date_from: str = "",
+    date_to: str = "",
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[RequestLimits] = None,
+) -> list[dict[str, Any]]:
+    """Get the weekly schedule of games between given dates.
+
+    Requests run on the caller's event loop over `client` (see `use_client`),
+    within `limits` if given, or else with at most `concurrency` in flight and at
+    most `rate` per second.
+    """
+    urls = _schedule_urls(date_from, date_to)
+    async with use_client(client) as client:
+        return list(await _get_endpoints_async(urls, client, concurrency, rate, limits))
+
+
+async def _aiter_schedules(
+    urls: Iterable[str],
+    client: Optional[Client],
+    concurrency: int,
+    rate: Optional[float],
+    limits: Optional[RequestLimits],
+) -> AsyncGenerator[dict[str, Any], None]:
+    async with use_client(client) as client:
+        results = _iter_endpoints_async(
+            urls, client, concurrency, rate, ordered=True, limits=limits
+        )
+        try:
+            async for week in _apayloads(results):
+                yield week
+        finally:
+            await results.aclose()
+
+
+def aiter_weekly_schedules(
+    date_from: str = "",
+    date_to: str = "",
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[RequestLimits] = None,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Get the weekly schedules between given dates as an async iterator.
+
+    Weeks are yielded in date order as soon as each one and those before it have
+    arrived. Requests run on the caller's event loop over `client` (see
+    `use_client`), within `limits` if given, or else with at most `concurrency`
+    in flight and at most `rate` per second.
+    """
+    urls = _schedule_urls(date_from, date_to)
+    return _aiter_schedules(urls, client, concurrency, rate, limits)
+
+
+def aiter_schedule_weeks(
+    start_dates: Iterable[str],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[RequestLimits] = None,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Get the schedule weeks starting on each of `start_dates`, in that order.
+
+    This is `aiter_weekly_schedules` for weeks that are not consecutive, such as
+    those planned by `schedule.ScheduleIndex.plan`.
+    """
+    urls = [f"{URL}/schedule/{normalize_datestr(dt)}" for dt in start_dates]
+    return _aiter_schedules(urls, client, concurrency, rate, limits)
 
 
-def get_game_info(game_ids: Union[int, list[int]]) -> Iterator[dict[str, Any]]:
-    """Get game info with parallel API requests using aiohttp."""
+def get_weekly_schedules(
+    date_from: str = "",
+    date_to: str = "",
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+) -> Iterator[dict[str, Any]]:
+    """Get the weekly schedule of games between given dates.
+
+    Requests are made over `client`, or the shared client from `get_client`,
+    with at most `concurrency` in flight and at most `rate` per second.
+    """
+    return iter(
+        run_sync(aget_weekly_schedules(date_from, date_to, client, concurrency, rate))
+    )
+
+
+async def aget_game_info(
+    game_ids: Union[int, Iterable[int]],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[RequestLimits] = None,
+) -> list[dict[str, Any]]:
+    """Get game info with parallel API requests using aiohttp.
+
+    Requests run on the caller's event loop over `client` (see `use_client`),
+    within `limits` if given, or else with at most `concurrency` in flight and at
+    most `rate` per second.
+    """
     if isinstance(game_ids, int):
         game_ids = [game_ids]
-    urls = (f"{URL}/gamecenter/{g}/landing" for g in game_ids)
-    return _run_async(_get_endpoints_async(urls))  # type: ignore
+    urls = map(game_url, game_ids)
+    async with use_client(client) as client:
+        return list(await _get_endpoints_async(urls, client, concurrency, rate, limits))
+
+
+def get_game_info(
+    game_ids: Union[int, Iterable[int]],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+) -> Iterator[dict[str, Any]]:
+    """Get game info with parallel API requests using aiohttp.
+
+    Requests are made over `client`, or the shared client from `get_client`,
+    with at most `concurrency` in flight and at most `rate` per second.
+    """
+    return iter(run_sync(aget_game_info(game_ids, client, concurrency, rate)))
+
+
+async def afetch_game_info(
+    game_ids: Iterable[int],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[RequestLimits] = None,
+    decoder: decode.Decoder = decode.loads,
+) -> dict[int, FetchResult]:
+    """Fetch game info on the caller's event loop. See `fetch_game_info`.
+
+    Payloads are decoded with `decoder`, such as `decode.game_goals`.
+    """
+    game_ids = list(game_ids)
+    urls = map(game_url, game_ids)
+    async with use_client(client) as client:
+        results = await _fetch_endpoints_async(
+            urls, client, concurrency, rate, limits, decoder
+        )
+    return dict(zip(game_ids, results))
+
+
+def fetch_game_info(
+    game_ids: Iterable[int],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+) -> dict[int, FetchResult]:
+    """Fetch game info, reporting the outcome for every game.
+
+    Unlike `get_game_info`, failed requests are not dropped, so the ids of games
+    that could not be fetched can be retried on their own::
+
+        results = fetch_game_info(game_ids)
+        retry = fetch_game_info(g for g, r in results.items() if not r.ok)
+
+    Returns
+    -------
+    dict[int, FetchResult]
+        Fetch results keyed by game id, in the order requested.
+    """
+    return run_sync(afetch_game_info(game_ids, client, concurrency, rate))
+
+
+async def _game_urls(game_ids: AsyncIterable[int]) -> AsyncIterator[str]:
+    async for game_id in game_ids:
+        yield game_url(game_id)
+
+
+async def aiter_game_info(
+    game_ids: Union[Iterable[int], AsyncIterable[int]],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    ordered: bool = False,
+    limits: Optional[RequestLimits] = None,
+    decoder: decode.Decoder = decode.loads,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Get game info as an async iterator yielding each game as it arrives.
+
+    Games are yielded in the order their requests complete, or in the order of
+    `game_ids` if `ordered`. Games that could not be fetched are logged and
+    skipped. Requests run on the caller's event loop over `client` (see
+    `use_client`), within `limits` if given, or else with at most `concurrency`
+    in flight and at most `rate` per second.
+
+    `game_ids` may be an async iterable, such as ids taken from schedule weeks
+    as they arrive; each game is requested as soon as its id is known. Sharing
+    `limits` with the producer of the ids keeps both within the same bounds.
+
+    Payloads are decoded with `decoder`, such as `decode.game_goals` to decode
+    only what goals are parsed from.
+    """
+    urls: Union[Iterable[str], AsyncIterable[str]]
+    if isinstance(game_ids, AsyncIterable):
+        urls = _game_urls(game_ids)
+    else:
+        urls = map(game_url, game_ids)
+    async with use_client(client) as client:
+        results = _iter_endpoints_async(
+            urls, client, concurrency, rate, ordered, limits, decoder
+        )
+        try:
+            async for info in _apayloads(results):
+                yield info
+        finally:
+            # Cancel requests still in flight before the client may be closed.
+            await results.aclose()
+
+
+def iter_game_info(
+    game_ids: Iterable[int],
+    client: Optional[Client] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    ordered: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Get game info as an iterator yielding each game as it arrives.
+
+    This is the sync counterpart of `aiter_game_info`: requests keep running in
+    the background while each game is being handled, and only a window of about
+    `concurrency` games is held in memory at once.
+    """
+    return iter_sync(aiter_game_info(game_ids, client, concurrency, rate, ordered))
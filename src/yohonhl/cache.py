@@ -0,0 +1,161 @@
+"""On-disk cache of API responses."""
+
+import logging
+import math
+import sqlite3
+import time
+import zlib
+from os import PathLike
+from pathlib import Path
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+_log = logging.getLogger("yohonhl.cache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    stored REAL NOT NULL,
+    expires REAL
+);
+CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires);
+"""
+
+# Migrations from each schema version to the next, applied in order.
+_MIGRATIONS = [
+    """
+    ALTER TABLE responses ADD COLUMN etag TEXT;
+    ALTER TABLE responses ADD COLUMN last_modified TEXT;
+    PRAGMA user_version = 1;
+    """,
+]
+
+
+def _expires(now: float, ttl: float) -> Optional[float]:
+    return None if math.isinf(ttl) else now + ttl
+
+
+class CacheEntry(NamedTuple):
+    """A cached response body and the validators it was served with."""
+
+    body: bytes
+    stored: float
+    expires: Optional[float]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the entry has not yet expired. Entries without expiry never do."""
+        return self.expires is None or self.expires > time.time()
+
+
+class ResponseCache:
+    """SQLite-backed cache of raw API response bodies keyed by endpoint URL.
+
+    Bodies are stored zlib-compressed in a single database file, which also
+    serves as the index of cached URLs and their expiry times.
+
+    Parameters
+    ----------
+    path : str or PathLike
+        Path to the cache database. Parent directories are created if needed.
+        Use ":memory:" for a cache that lasts only as long as this object.
+    schedule_ttl : float
+        Seconds schedule weeks that still have unfinished games stay fresh.
+    """
+
+    def __init__(
+        self, path: Union[str, PathLike[str]], schedule_ttl: float = 3600.0
+    ) -> None:
+        if str(path) != ":memory:":
+            path = Path(path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.schedule_ttl = schedule_ttl
+        # The cache is used from whichever thread runs the event loop.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        for migration in _MIGRATIONS[version:]:
+            self._db.executescript(migration)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Get the cached entry for `url`, fresh or not."""
+        row = self._db.execute(
+            "SELECT body, stored, expires, etag, last_modified "
+            "FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        body, *rest = row
+        return CacheEntry(zlib.decompress(body), *rest)
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        ttl: float = math.inf,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store the response body for `url`, fresh for `ttl` seconds.
+
+        The `etag` and `last_modified` validators let a stale entry be
+        revalidated with a conditional request instead of downloaded again.
+        """
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, stored, expires, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    zlib.compress(body),
+                    now,
+                    _expires(now, ttl),
+                    etag,
+                    last_modified,
+                ),
+            )
+        _log.debug("Cached %r (%d bytes, ttl=%r)", url, len(body), ttl)
+
+    def touch(self, url: str, ttl: float = math.inf) -> None:
+        """Mark the entry for `url` as fresh for another `ttl` seconds."""
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                "UPDATE responses SET stored = ?, expires = ? WHERE url = ?",
+                (now, _expires(now, ttl), url),
+            )
+
+    def purge(self) -> int:
+        """Remove expired entries, returning how many were removed."""
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM responses WHERE expires <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        """Get the number of cached entries."""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        """Close the cache database."""
+        self._db.close()
+
+    def __enter__(self) -> "ResponseCache":
+        """Enter a context that closes the cache on exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the cache."""
+        self.close()
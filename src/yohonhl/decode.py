@@ -0,0 +1,118 @@
+"""Decoding of API response bodies.
+
+A decoder is a callable taking a response body and returning its payload, or
+raising ValueError if the body is malformed. `loads` decodes whole JSON documents,
+with orjson if it is installed. `game_goals` decodes only the parts of gamecenter
+landing payloads that goals are parsed from, and the game's clock, with msgspec
+if it is installed. Both are available with the "fast" extra, which is only
+imported when the first body is decoded.
+"""
+
+import json
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+from typing import TypedDict
+
+Decoder = Callable[[bytes], Any]
+
+
+@cache
+def _json_decoder() -> Decoder:
+    """Get a decoder of whole JSON documents, with orjson if it is installed."""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+def loads(body: bytes) -> Any:
+    """Decode a JSON document, with orjson if it is installed."""
+    return _json_decoder()(body)
+
+
+class _Name(TypedDict):
+    default: str
+
+
+class _ScoringGoal(TypedDict):
+    timeInPeriod: str
+    name: _Name
+    teamAbbrev: _Name
+    homeScore: int
+    awayScore: int
+    strength: str
+
+
+class _PeriodDescriptor(TypedDict):
+    number: int
+
+
+class _ScoringPeriod(TypedDict):
+    periodDescriptor: _PeriodDescriptor
+    goals: list[_ScoringGoal]
+
+
+class _Summary(TypedDict, total=False):
+    scoring: list[_ScoringPeriod]
+
+
+class _Team(TypedDict):
+    abbrev: str
+
+
+class _Clock(TypedDict, total=False):
+    secondsRemaining: int
+    running: bool
+    inIntermission: bool
+
+
+class _GameGoalsBase(TypedDict):
+    id: int
+    season: int
+    gameDate: str
+    gameState: str
+    homeTeam: _Team
+    awayTeam: _Team
+
+
+class GameGoals(_GameGoalsBase, total=False):
+    """The parts of a gamecenter landing payload that goals are parsed from.
+
+    Games that have not started yet have no summary. The start time and clock
+    tell live mode when a game may next change.
+    """
+
+    startTimeUTC: str
+    clock: _Clock
+    summary: _Summary
+
+
+@cache
+def _game_goals_decoder() -> Decoder:
+    """Get a decoder of `GameGoals`, with msgspec if it is installed."""
+    try:
+        import msgspec
+    except ImportError:
+        return _json_decoder()
+    decoder: msgspec.json.Decoder[Any] = msgspec.json.Decoder(GameGoals)
+
+    def decode(body: bytes) -> Any:
+        try:
+            return decoder.decode(body)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return decode
+
+
+def game_goals(body: bytes) -> Any:
+    """Decode a gamecenter landing payload into a `GameGoals` dict.
+
+    Keys not in `GameGoals` are skipped without being decoded, which is both
+    faster and keeps much less in memory than decoding the whole payload.
+    Without msgspec installed, this decodes the whole payload with `loads`
+    instead.
+    """
+    return _game_goals_decoder()(body)
@@ -0,0 +1,75 @@
+"""Telling new, corrected and rescinded goals apart between payloads of a game."""
+
+from collections.abc import Iterable
+from typing import NamedTuple
+from typing import Optional
+
+from yohonhl.stats import Goal
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+GoalKey = tuple[int, int, str]
+
+
+class GoalEvent(NamedTuple):
+    """A change to the goals of a game.
+
+    `goal` is the goal inserted, updated or deleted. For updates, `previous`
+    is the goal it replaces, which may have had another scorer.
+    """
+
+    kind: str
+    goal: Goal
+    previous: Optional[Goal] = None
+
+
+def goal_key(goal: Goal) -> GoalKey:
+    """Get what identifies a goal within its game across corrections.
+
+    That is its period, time in period and scoring team, which stay the same
+    when the scorer, strength or score of a goal is corrected.
+    """
+    return goal.period, goal.seconds, goal.player_team
+
+
+class GoalDiff:
+    """The goals of a game, diffed against each new set of them.
+
+    Parameters
+    ----------
+    goals : Iterable[Goal]
+        Goals of the game known so far, such as those in a store.
+    """
+
+    def __init__(self, goals: Iterable[Goal] = ()) -> None:
+        self.goals: dict[GoalKey, Goal] = {goal_key(goal): goal for goal in goals}
+
+    def update(self, goals: Iterable[Goal]) -> list[GoalEvent]:
+        """Replace the goals of the game, returning how they changed.
+
+        Goals not known before are inserted, and known goals that changed in
+        any way are updated, in the order of `goals`. Known goals no longer in
+        them, such as disallowed goals, are deleted after that. Goals that did
+        not change give no events.
+        """
+        old = self.goals
+        new = {goal_key(goal): goal for goal in goals}
+        events = []
+        kept = 0
+        for key, goal in new.items():
+            previous = old.get(key)
+            if previous is None:
+                events.append(GoalEvent(INSERT, goal))
+                continue
+            kept += 1
+            if previous != goal:
+                events.append(GoalEvent(UPDATE, goal, previous))
+        # Known goals are only looked through again if some were left out.
+        if kept < len(old):
+            events.extend(
+                GoalEvent(DELETE, goal) for key, goal in old.items() if key not in new
+            )
+        self.goals = new
+        return events
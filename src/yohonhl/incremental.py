@@ -0,0 +1,218 @@
+"""Incremental updates of CSV and JSON Lines files of goals."""
+
+import hashlib
+import io
+import json
+import logging
+import os
+from collections.abc import Iterable
+from os import PathLike
+from pathlib import Path
+from typing import IO
+from typing import Any
+from typing import NamedTuple
+from typing import Union
+
+from yohonhl import stats
+
+_log = logging.getLogger("yohonhl.incremental")
+
+FORMATS = ("csv", "jsonl")
+
+_INDEX_VERSION = 1
+
+
+class Segment(NamedTuple):
+    """Where the rows of a game are in a file, and a digest of them."""
+
+    offset: int
+    length: int
+    digest: str
+
+
+class Changes(NamedTuple):
+    """Numbers of games added, replaced and left unchanged by an update."""
+
+    added: int
+    replaced: int
+    unchanged: int
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _render(goals: Iterable[stats.Goal], fmt: str, header: bool = False) -> bytes:
+    """Get the rows of goals as written to a file of format `fmt`."""
+    f = io.StringIO()
+    if fmt == "csv":
+        stats.write_csv(goals, f, header=header)
+    else:
+        stats.write_jsonl(goals, f)
+    return f.getvalue().encode()
+
+
+def _game_id(line: bytes, fmt: str) -> int:
+    """Get the game id of a row. In CSV it is the second column, after season."""
+    if fmt == "csv":
+        return int(line.split(b",", 2)[1])
+    return int(json.loads(line)["game_id"])
+
+
+class GoalFile:
+    """A CSV or JSON Lines file of goals, updated in place game by game.
+
+    A sidecar index (``<path>.index``) records where the rows of each game are in
+    the file, and a digest of them. Updating the file with the goals of games,
+    e.g. of a date range overlapping the last update, skips games whose rows are
+    unchanged, appends games not in the file yet, and replaces the rows of games
+    whose goals changed since (such as after a scoring correction). Replacing
+    rows truncates the file at the first changed game and writes back only what
+    followed it, so the rest of the file is never read.
+
+    The index is rebuilt by reading the file once if it is missing or out of
+    date, e.g. if the file was written or edited without it. Games whose rows
+    were repeated by appending to the file before are then only kept once, at
+    their last position.
+
+    Parameters
+    ----------
+    path : str or PathLike
+        Path to the file. It is created if needed.
+    fmt : str
+        Format of the file, "csv" or "jsonl".
+    """
+
+    def __init__(self, path: Union[str, PathLike[str]], fmt: str = "csv") -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {FORMATS}, got {fmt!r}")
+        self.path = Path(path).expanduser()
+        self.fmt = fmt
+        self.index_path = self.path.with_name(self.path.name + ".index")
+        self.segments: dict[int, Segment] = {}
+
+    def update(self, games: Iterable[tuple[int, list[stats.Goal]]]) -> Changes:
+        """Write the goals of games to the file, returning what changed.
+
+        Parameters
+        ----------
+        games : Iterable[tuple[int, list[Goal]]]
+            Ids and goals of games, such as from `stats.iter_game_goals`. Games
+            with no goals are left out of the file, and removed if they had any.
+        """
+        changed: dict[int, bytes] = {}
+        added = unchanged = 0
+        # In append mode writes always go to the end, even after truncating.
+        with self.path.open("a+b") as f:
+            self._load(f)
+            if f.seek(0, os.SEEK_END) == 0:
+                f.write(_render([], self.fmt, header=True))
+            for game_id, goals in games:
+                data = _render(goals, self.fmt)
+                segment = self.segments.get(game_id)
+                if segment is None and data:
+                    self.segments[game_id] = Segment(f.tell(), len(data), _digest(data))
+                    f.write(data)
+                    added += 1
+                elif segment is not None and segment.digest == _digest(data):
+                    unchanged += 1
+                elif segment is not None:
+                    changed[game_id] = data
+            if changed:
+                self._rewrite(f, min(self.segments[g].offset for g in changed), changed)
+        self._save()
+        _log.info(
+            "Updated %s: %d games added, %d replaced, %d unchanged",
+            self.path,
+            added,
+            len(changed),
+            unchanged,
+        )
+        return Changes(added, len(changed), unchanged)
+
+    def _rewrite(self, f: IO[bytes], start: int, changed: dict[int, bytes]) -> None:
+        """Write back the games from offset `start` on, with rows in `changed`.
+
+        Games at or after `start` that are not in the index any more are dropped.
+        """
+        f.seek(start)
+        tail = f.read()
+        f.truncate(start)
+        f.seek(start)
+        following = sorted(
+            (s.offset, g) for g, s in self.segments.items() if s.offset >= start
+        )
+        _log.debug("Rewriting %d games from offset %d", len(following), start)
+        for offset, game_id in following:
+            segment = self.segments.pop(game_id)
+            if game_id in changed:
+                data = changed[game_id]
+                segment = Segment(offset, len(data), _digest(data))
+            else:
+                data = tail[offset - start : offset - start + segment.length]
+            if data:
+                self.segments[game_id] = segment._replace(offset=f.tell())
+                f.write(data)
+
+    def _load(self, f: IO[bytes]) -> None:
+        """Load the index, or rebuild it if it does not match the file."""
+        stat = os.fstat(f.fileno())
+        try:
+            index = json.loads(self.index_path.read_bytes())
+        except (OSError, ValueError):
+            index = {}
+        expected = {
+            "version": _INDEX_VERSION,
+            "format": self.fmt,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if all(index.get(k) == v for k, v in expected.items()):
+            self.segments = {int(g): Segment(*s) for g, s in index["games"].items()}
+        else:
+            self._rebuild(f)
+
+    def _rebuild(self, f: IO[bytes]) -> None:
+        """Index the file by reading it, keeping only the last rows of each game.
+
+        A partly written last row, as left by an interrupted update, is removed.
+        """
+        _log.info("Indexing %s", self.path)
+        header = _render([], self.fmt, header=True)
+        runs: list[list[Any]] = []
+        offset = 0
+        f.seek(0)
+        for line in f:
+            if not line.endswith(b"\n"):
+                f.truncate(offset)
+                break
+            if offset > 0 or line != header:
+                game_id = _game_id(line, self.fmt)
+                if not runs or runs[-1][0] != game_id:
+                    runs.append([game_id, offset, 0, hashlib.blake2b(digest_size=16)])
+                runs[-1][2] += len(line)
+                runs[-1][3].update(line)
+            offset += len(line)
+
+        self.segments, repeated = {}, []
+        for game_id, start, length, digest in runs:
+            if game_id in self.segments:
+                repeated.append(self.segments[game_id].offset)
+            self.segments[game_id] = Segment(start, length, digest.hexdigest())
+        if repeated:
+            _log.warning("Removing %d repeated games from %s", len(repeated), self.path)
+            self._rewrite(f, min(repeated), {})
+
+    def _save(self) -> None:
+        """Write the index, replacing the last one only once it is complete."""
+        stat = self.path.stat()
+        index = {
+            "version": _INDEX_VERSION,
+            "format": self.fmt,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "games": {str(g): list(s) for g, s in self.segments.items()},
+        }
+        partial = self.index_path.with_name(self.index_path.name + ".tmp")
+        partial.write_text(json.dumps(index))
+        partial.replace(self.index_path)
@@ -0,0 +1,230 @@
+"""Following games in progress, polling each only as often as it can change."""
+
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from http import HTTPStatus
+from typing import Any
+from typing import Optional
+
+from yohonhl import api
+from yohonhl import decode
+from yohonhl import stats
+from yohonhl.diff import INSERT
+from yohonhl.diff import GoalDiff
+from yohonhl.diff import GoalEvent
+
+_log = logging.getLogger("yohonhl.live")
+
+LIVE_INTERVAL = 10.0
+"""Seconds between polls of a game in play."""
+
+MAX_INTERVAL = 300.0
+"""Most seconds between polls of a game that has not started."""
+
+MAX_FAILURES = 5
+"""Most polls of a game in a row that may fail before it is no longer followed."""
+
+# States of games that will start later today, as opposed to postponed ones.
+_STARTING_STATES = frozenset({"FUT", "PRE"})
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _sleep(seconds: float) -> None:
+    await asyncio.sleep(seconds)
+
+
+def _delay(
+    info: dict[str, Any],
+    now: datetime,
+    interval: float = LIVE_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+) -> Optional[float]:
+    """Get how many seconds to wait before polling a game again, or None if done.
+
+    Games in play are polled every `interval` seconds, except in intermissions,
+    whose clock counts down to the next period. Games that have not started are
+    polled at their start time, and at least every `max_interval` seconds in
+    case it changes. Games that are over or postponed are not polled again.
+    """
+    state = info["gameState"]
+    if state in api.LIVE_STATES:
+        clock = info.get("clock", {})
+        if clock.get("inIntermission"):
+            return max(interval, float(clock.get("secondsRemaining", 0)))
+        return interval
+    if state not in _STARTING_STATES:
+        return None
+    if "startTimeUTC" not in info:
+        return max_interval
+    start = datetime.fromisoformat(info["startTimeUTC"].replace("Z", "+00:00"))
+    return min(max(interval, (start - now).total_seconds()), max_interval)
+
+
+def _gave_up(
+    result: api.FetchResult, failures: int, retry_statuses: frozenset[int]
+) -> bool:
+    """Get whether to stop polling a game after a failed poll, logging why.
+
+    Games whose poll failed with an HTTP error not worth retrying, such as 404
+    Not Found for an id of no game, or that failed `MAX_FAILURES` polls in a row,
+    are not polled again.
+    """
+    status = result.status
+    error = status is not None and status >= HTTPStatus.BAD_REQUEST
+    if (error and status not in retry_statuses) or failures >= MAX_FAILURES:
+        _log.warning(
+            "Stopped following %r after %d failed poll(s): %s",
+            result.url,
+            failures,
+            result.error,
+        )
+        return True
+    _log.warning("Failed to poll %r: %s", result.url, result.error)
+    return False
+
+
+async def awatch_events(
+    game_ids: Optional[Iterable[int]] = None,
+    client: Optional[api.Client] = None,
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    interval: float = LIVE_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+) -> AsyncGenerator[GoalEvent, None]:
+    """Get changes to the goals of games as polls find them, on the running loop.
+
+    See `watch_events` for the parameters.
+    """
+    if interval <= 0:
+        raise ValueError(f"interval must be positive, got {interval!r}")
+    async with api.use_client(client) as client:
+        if game_ids is None:
+            games = await stats.aget_scheduled_games("", "", concurrency, rate, client)
+            game_ids = [g.id for g in games if g.game_state not in api.FINAL_STATES]
+        limits = api.RequestLimits(concurrency, rate)
+        due = dict.fromkeys(game_ids, _now())
+        diffs = {game_id: GoalDiff() for game_id in due}
+        failures = dict.fromkeys(due, 0)
+        while due:
+            now = _now()
+            polling = [game_id for game_id, at in due.items() if at <= now]
+            if not polling:
+                await _sleep((min(due.values()) - now).total_seconds())
+                continue
+            results = await api.afetch_game_info(
+                polling, client, limits=limits, decoder=decode.game_goals
+            )
+            for game_id, result in results.items():
+                if not result.ok:
+                    failures[game_id] += 1
+                    if _gave_up(result, failures[game_id], client.retry.statuses):
+                        del due[game_id]
+                    else:
+                        due[game_id] = _now() + timedelta(seconds=interval)
+                    continue
+                failures[game_id] = 0
+                info = result.data
+                delay = _delay(info, _now(), interval, max_interval)
+                if delay is None:
+                    _log.info("Game %s is %s", game_id, info["gameState"])
+                    del due[game_id]
+                else:
+                    due[game_id] = _now() + timedelta(seconds=delay)
+                for event in diffs[game_id].update(stats.parse_goals(info)):
+                    yield event
+
+
+async def awatch(
+    game_ids: Optional[Iterable[int]] = None,
+    client: Optional[api.Client] = None,
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    interval: float = LIVE_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+) -> AsyncGenerator[stats.Goal, None]:
+    """Get goals of games as they are scored, on the running event loop.
+
+    See `watch` for the parameters.
+    """
+    events = awatch_events(game_ids, client, concurrency, rate, interval, max_interval)
+    try:
+        async for event in events:
+            if event.kind == INSERT:
+                yield event.goal
+    finally:
+        await events.aclose()
+
+
+def watch_events(
+    game_ids: Optional[Iterable[int]] = None,
+    client: Optional[api.Client] = None,
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    interval: float = LIVE_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+) -> Iterator[GoalEvent]:
+    """Get changes to the goals of games as polls find them, until they are over.
+
+    This is `watch` with corrections too: besides goals inserted as they are
+    scored, goals whose scorer, strength or score changed are updated, and
+    disallowed goals deleted. The events can be applied to a store with
+    `Store.apply`.
+
+    See `watch` for the parameters.
+    """
+    return api.iter_sync(
+        awatch_events(game_ids, client, concurrency, rate, interval, max_interval)
+    )
+
+
+def watch(
+    game_ids: Optional[Iterable[int]] = None,
+    client: Optional[api.Client] = None,
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    interval: float = LIVE_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+) -> Iterator[stats.Goal]:
+    """Get goals of games as they are scored, until the games are over.
+
+    Each game is polled on its own schedule: every `interval` seconds while in
+    play, once at the end of each intermission, and at its start time if it has
+    not started, so following a whole day of games takes few requests. Games
+    due at the same time are polled together. Goals already scored when a game
+    is first polled are yielded then, and after that only goals not yielded
+    before. Games that fail to be polled are polled again after `interval`,
+    unless they failed with an HTTP error not worth retrying, such as 404 Not
+    Found, or failed `MAX_FAILURES` polls in a row.
+
+    Parameters
+    ----------
+    game_ids : Iterable[int], optional
+        Ids of the games to follow. Defaults to today's games not final yet.
+    client : api.Client, optional
+        Client to make API requests with. Defaults to the shared client.
+    concurrency : int
+        Maximum number of API requests in flight at once.
+    rate : float, optional
+        Maximum number of API requests per second. Unlimited if not specified.
+    interval : float
+        Seconds between polls of a game in play. Must be positive.
+    max_interval : float
+        Most seconds between polls of a game that has not started.
+
+    Returns
+    -------
+    Iterator[Goal]
+        `Goal` objects, each once, as polls find them.
+    """
+    return api.iter_sync(
+        awatch(game_ids, client, concurrency, rate, interval, max_interval)
+    )
@@ -0,0 +1,356 @@
+"""Schedules of games: indexes of days known locally, and whole seasons."""
+
+import logging
+from bisect import bisect_left
+from bisect import bisect_right
+from collections.abc import Iterable
+from collections.abc import Iterator
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+
+from yohonhl import api
+
+_log = logging.getLogger("yohonhl.schedule")
+
+WEEK = timedelta(days=7)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _settled(day: date, games: list[dict[str, Any]], today: date) -> bool:
+    """Whether the games of a day can no longer change."""
+    return day < today and all(g.get("gameState") in api.FINAL_STATES for g in games)
+
+
+class ScheduleIndex:
+    """Schedule days known locally, and the date intervals they cover.
+
+    Weeks fetched from the schedule endpoint are added with `add_week`. Days that
+    are over, and whose games are all final, are kept along with their games and
+    counted as covered; later requests for the same dates only need to fetch the
+    gaps between covered intervals (see `gaps` and `plan`).
+
+    Covered days are kept as sorted, disjoint, half-open intervals of date
+    ordinals, so looking up coverage takes O(log n) in the number of intervals.
+    """
+
+    def __init__(self) -> None:
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._games: dict[date, list[dict[str, Any]]] = {}
+        # Start of the last week added, which planned weeks are aligned with.
+        self._week_start: Optional[date] = None
+
+    def __len__(self) -> int:
+        """Get the number of covered days."""
+        return sum(e - s for s, e in zip(self._starts, self._ends))
+
+    @property
+    def intervals(self) -> list[tuple[date, date]]:
+        """Get the covered intervals, as first and last days."""
+        return [
+            (date.fromordinal(s), date.fromordinal(e - 1))
+            for s, e in zip(self._starts, self._ends)
+        ]
+
+    def covers(self, day: date) -> bool:
+        """Whether `day` is covered."""
+        i = bisect_right(self._starts, day.toordinal()) - 1
+        return i >= 0 and day.toordinal() < self._ends[i]
+
+    def _cover(self, start: int, end: int) -> None:
+        """Cover the days from ordinal `start` up to `end`, merging intervals."""
+        i = bisect_left(self._ends, start)
+        j = bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def add_week(self, week: dict[str, Any], today: Optional[date] = None) -> int:
+        """Add the days of a schedule week, returning how many became covered.
+
+        The week spans from its first day up to its `nextStartDate`, so days
+        without games that are left out of its `gameWeek` are covered too.
+        """
+        today = today or _today()
+        days = {api.parse_date(d["date"]): d["games"] for d in week["gameWeek"]}
+        if not days:
+            return 0
+        first = min(days)
+        self._week_start = first
+        next_start = week.get("nextStartDate")
+        last = (
+            api.parse_date(next_start) - timedelta(days=1) if next_start else max(days)
+        )
+
+        added, day = 0, first
+        while day <= last:
+            games = days.get(day, [])
+            if not self.covers(day) and _settled(day, games, today):
+                self._games[day] = games
+                self._cover(day.toordinal(), day.toordinal() + 1)
+                added += 1
+            day += timedelta(days=1)
+        return added
+
+    def gaps(self, start: date, end: date) -> list[tuple[date, date]]:
+        """Get the uncovered intervals between two days, as first and last days."""
+        lo, hi = start.toordinal(), end.toordinal() + 1
+        gaps = []
+        i = bisect_right(self._ends, lo)
+        while lo < hi:
+            if i < len(self._starts) and self._starts[i] <= lo:
+                lo = self._ends[i]
+                i += 1
+                continue
+            gap_end = min(hi, self._starts[i]) if i < len(self._starts) else hi
+            gaps.append((date.fromordinal(lo), date.fromordinal(gap_end - 1)))
+            lo = gap_end
+        return gaps
+
+    def plan(self, start: date, end: date) -> list[str]:
+        """Get the start dates of the schedule weeks to fetch to cover two days.
+
+        Only the gaps in coverage are fetched, a week at a time from the first
+        day not covered yet, so a week reaching into later gaps covers those
+        days too. Weeks are moved back to start on the same weekday as the last
+        week added, whenever that leaves no day uncovered, so that weeks still
+        changing are requested with the same dates again, and can be served
+        from the response cache.
+        """
+        starts = []
+        day = start
+        for gap_start, gap_end in self.gaps(start, end):
+            day = max(day, gap_start)
+            while day <= gap_end:
+                week_start = self._aligned(day, end)
+                starts.append(api.fmt_date(week_start))
+                day = week_start + WEEK
+        return starts
+
+    def _aligned(self, day: date, end: date) -> date:
+        """Get the start of the aligned week covering `day`, if it covers as much.
+
+        The aligned week ends sooner than one starting on `day`, so it is only
+        used if the days between their ends are covered or after `end`.
+        """
+        if self._week_start is None:
+            return day
+        aligned = day - timedelta(days=(day - self._week_start).days % WEEK.days)
+        after = min(day + WEEK, end + timedelta(days=1))
+        lost = range((aligned + WEEK).toordinal(), after.toordinal())
+        if all(self.covers(date.fromordinal(o)) for o in lost):
+            return aligned
+        return day
+
+    def games(self, start: date, end: date) -> Iterator[tuple[date, list[Any]]]:
+        """Get the covered days between two days and their games, in date order."""
+        i = bisect_right(self._ends, start.toordinal())
+        for s, e in zip(self._starts[i:], self._ends[i:]):
+            if s > end.toordinal():
+                break
+            for ordinal in range(
+                max(s, start.toordinal()), min(e, end.toordinal() + 1)
+            ):
+                day = date.fromordinal(ordinal)
+                yield day, self._games[day]
+
+
+class ScheduledGame(NamedTuple):
+    """A game in the schedule. Scores are None until the game has started."""
+
+    id: int
+    season: int
+    game_type: int
+    game_date: date
+    start_time_utc: str
+    game_state: str
+    home_team: str
+    away_team: str
+    home_score: Optional[int]
+    away_score: Optional[int]
+
+    @classmethod
+    def from_schedule(cls, game: dict[str, Any], game_date: date) -> "ScheduledGame":
+        """Get a game from its entry in a schedule week."""
+        home, away = game["homeTeam"], game["awayTeam"]
+        return cls(
+            id=game["id"],
+            season=game["season"],
+            game_type=game["gameType"],
+            game_date=game_date,
+            start_time_utc=game["startTimeUTC"],
+            game_state=game["gameState"],
+            home_team=home["abbrev"],
+            away_team=away["abbrev"],
+            home_score=home.get("score"),
+            away_score=away.get("score"),
+        )
+
+
+class SeasonSchedule:
+    """The games of a season, sorted by date and indexed by id and date.
+
+    Parameters
+    ----------
+    season : int
+        The season, such as 20232024.
+    games : Iterable[ScheduledGame]
+        The games of the season, in any order.
+    start, regular_season_end, playoff_end : date
+        The first day of the schedule, and last days of the regular season and
+        playoffs.
+    """
+
+    def __init__(
+        self,
+        season: int,
+        games: Iterable[ScheduledGame],
+        start: date,
+        regular_season_end: date,
+        playoff_end: date,
+    ) -> None:
+        self.season = season
+        self.start = start
+        self.regular_season_end = regular_season_end
+        self.playoff_end = playoff_end
+        self.games = tuple(sorted(games, key=lambda g: (g.game_date, g.id)))
+        self.by_id = {g.id: g for g in self.games}
+        self._dates = [g.game_date.toordinal() for g in self.games]
+
+    def __len__(self) -> int:
+        """Get the number of games."""
+        return len(self.games)
+
+    def __iter__(self) -> Iterator[ScheduledGame]:
+        """Iterate over the games in date order."""
+        return iter(self.games)
+
+    def between(self, start: date, end: date) -> tuple[ScheduledGame, ...]:
+        """Get the games played between two days, in date order."""
+        lo = bisect_left(self._dates, start.toordinal())
+        hi = bisect_right(self._dates, end.toordinal())
+        return self.games[lo:hi]
+
+    def on(self, day: date) -> tuple[ScheduledGame, ...]:
+        """Get the games played on a day."""
+        return self.between(day, day)
+
+
+def _probe_date(season: int) -> str:
+    """Get a date in the middle of a season, such as 20232024."""
+    first, second = divmod(season, 10000)
+    if second != first + 1:
+        raise ValueError(f"season must be two consecutive years, got {season!r}")
+    return f"{second}-01-15"
+
+
+def _week_starts(start: date, end: date, known: date) -> list[str]:
+    """Get the start dates of weeks covering two days, but for the `known` week."""
+    starts = []
+    day = start
+    while day <= end:
+        if known <= day < known + WEEK:
+            day = known + WEEK
+            continue
+        starts.append(api.fmt_date(day))
+        day += WEEK
+    return starts
+
+
+async def aget_season_schedule(
+    season: int,
+    client: Optional[api.Client] = None,
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    preseason: bool = False,
+) -> SeasonSchedule:
+    """Get the schedule of a season on the running event loop.
+
+    See `get_season_schedule` for the parameters.
+    """
+    probe = _probe_date(season)
+    limits = api.RequestLimits(concurrency, rate)
+    async with api.use_client(client) as client:
+        weeks = await api.aget_weekly_schedules(probe, client=client, limits=limits)
+        if not weeks:
+            raise RuntimeError(f"Could not get the schedule of season {season}")
+        first = weeks[0]
+        start = api.parse_date(
+            first["preSeasonStartDate" if preseason else "regularSeasonStartDate"]
+        )
+        end = api.parse_date(first["playoffEndDate"])
+        starts = _week_starts(start, end, api.parse_date(probe))
+        _log.debug("Getting %d more weeks of season %d", len(starts), season)
+        rest = api.aiter_schedule_weeks(starts, client, limits=limits)
+        weeks.extend([week async for week in rest])
+
+    games = {}
+    for week in weeks:
+        for day in week["gameWeek"]:
+            game_date = api.parse_date(day["date"])
+            if not start <= game_date <= end:
+                continue
+            for game in day["games"]:
+                if game["season"] == season:
+                    games[game["id"]] = ScheduledGame.from_schedule(game, game_date)
+    return SeasonSchedule(
+        season,
+        games.values(),
+        start,
+        api.parse_date(first["regularSeasonEndDate"]),
+        end,
+    )
+
+
+def get_season_schedule(
+    season: int,
+    client: Optional[api.Client] = None,
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    preseason: bool = False,
+) -> SeasonSchedule:
+    """Get the schedule of a whole season.
+
+    One schedule week from the middle of the season gives its first and last
+    days, and the rest of its weeks are then fetched concurrently. Games are
+    listed once, even if weeks overlap.
+
+    Parameters
+    ----------
+    season : int
+        The season, such as 20232024.
+    client : api.Client, optional
+        Client to make API requests with. Defaults to the shared client.
+    concurrency : int
+        Maximum number of API requests in flight at once.
+    rate : float, optional
+        Maximum number of API requests per second. Unlimited if not specified.
+    preseason : bool
+        Whether to include preseason games.
+
+    Returns
+    -------
+    SeasonSchedule
+        The games of the season, from the start of the regular season (or the
+        preseason) to the end of the playoffs.
+
+    Raises
+    ------
+    ValueError
+        If `season` is not two consecutive years.
+    RuntimeError
+        If the schedule could not be fetched.
+    """
+    return api.run_sync(
+        aget_season_schedule(season, client, concurrency, rate, preseason)
+    )
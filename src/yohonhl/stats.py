@@ -1,22 +1,79 @@
 """Stats aggregation and calculations."""
 
+import asyncio
+import csv
+import json
 import logging
+import tempfile
+from array import array
+from collections import deque
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
 from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from dataclasses import fields
 from datetime import date
 from datetime import datetime
 from datetime import time
+from datetime import timedelta
+from functools import lru_cache
 from itertools import chain
+from multiprocessing import get_context
+from os import PathLike
+from pathlib import Path
+from typing import IO
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import Optional
+from typing import TypeVar
+from typing import Union
 
 from yohonhl import api
+from yohonhl import decode
+from yohonhl import schedule
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
 
 _log = logging.getLogger("yohonhl.stats")
 
+ONE_DAY = timedelta(days=1)
+
+# Games whose goals are parsed together by a worker process.
+GAMES_PER_CHUNK = 64
+
+_T = TypeVar("_T")
 
-@dataclass
+# Columns goals are ordered by, as they are got from the API.
+_GAME_ORDER = ("game_date", "game_id", "period", "time_in_period")
+
+
+@dataclass(frozen=True)
 class Goal:
-    """Goal dataclass."""
+    """Goal dataclass.
+
+    Goals are immutable and slotted, without a per-instance `__dict__`. For
+    many goals at once, see `GoalTable`.
+    """
+
+    __slots__ = (
+        "away_score",
+        "away_team",
+        "game_date",
+        "game_id",
+        "home_score",
+        "home_team",
+        "period",
+        "player_name",
+        "player_team",
+        "season",
+        "strength",
+        "time_in_period",
+    )
 
     season: int
     game_id: int
@@ -31,9 +88,47 @@ class Goal:
     away_score: int
     strength: str
 
+    @property
+    def seconds(self) -> int:
+        """Get the seconds elapsed in the period when the goal was scored."""
+        return self.time_in_period.minute * 60 + self.time_in_period.second
+
+    def astuple(self) -> tuple[Any, ...]:
+        """Get the fields of the goal in order, as in a row of `GoalTable`.
+
+        Unlike `dataclasses.astuple`, field values are not copied.
+        """
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def __reduce__(self) -> tuple[type["Goal"], tuple[Any, ...]]:
+        """Pickle by fields, which frozen slotted instances can't be restored by."""
+        return type(self), self.astuple()
 
-def _parse_goals_from_game_info(info: dict[str, Any]) -> list[Goal]:
-    """Get a list of all goals from a given game info object."""
+
+@lru_cache(maxsize=4096)
+def _clock(seconds: int) -> time:
+    """Get the time of a clock `seconds` into a period."""
+    return time(minute=seconds // 60, second=seconds % 60)
+
+
+@lru_cache(maxsize=4096)
+def parse_clock(clock: str) -> time:
+    """Parse a MM:SS period clock from the API.
+
+    Clocks are sliced rather than going through strptime, and as there are only
+    so many, each is only parsed once.
+    """
+    minutes, seconds = clock[:2], clock[3:]
+    if clock[2:3] == ":" and (minutes + seconds).isdigit() and len(clock) == 5:
+        try:
+            return time(minute=int(minutes), second=int(seconds))
+        except ValueError:
+            pass
+    return datetime.strptime(clock, "%M:%S").time()  # noqa: DTZ007
+
+
+def _goal_rows(info: dict[str, Any]) -> list[tuple[Any, ...]]:
+    """Get the fields of all goals from a given game info object, goal by goal."""
     season = info["season"]
     game_date = api.parse_date(info["gameDate"])
     home_team = info["homeTeam"]["abbrev"]
@@ -43,7 +138,13 @@ def _parse_goals_from_game_info(info: dict[str, Any]) -> list[Goal]:
         scoring = info["summary"]["scoring"]
     except KeyError:
         # Game may be incomplete, and thus have no summary/scoring.
-        _log.warning(
+        level = (
+            logging.DEBUG
+            if info["gameState"] in api.UPCOMING_STATES
+            else logging.WARNING
+        )
+        _log.log(
+            level,
             "No scores yet for %s: %s @ %s on %s",
             info["id"],
             away_team,
@@ -52,30 +153,341 @@ def _parse_goals_from_game_info(info: dict[str, Any]) -> list[Goal]:
         )
         return []
 
-    all_goals = []
+    rows = []
     for period in scoring:
         goal_period = int(period["periodDescriptor"]["number"])
         for goal in period["goals"]:
-            all_goals.append(
-                Goal(
-                    season=season,
-                    game_id=info["id"],
-                    game_date=game_date,
-                    period=goal_period,
-                    time_in_period=datetime.strptime(  # noqa: DTZ007
-                        goal["timeInPeriod"], "%M:%S"
-                    ).time(),
-                    player_name=goal["name"]["default"],
-                    player_team=goal["teamAbbrev"]["default"],
-                    home_team=home_team,
-                    away_team=away_team,
-                    home_score=int(goal["homeScore"]),
-                    away_score=int(goal["awayScore"]),
-                    strength=goal["strength"],
-                    # assists=[a["name"]["default"] for a in goal["assists"]],
+            rows.append(
+                (
+                    season,
+                    info["id"],
+                    game_date,
+                    goal_period,
+                    parse_clock(goal["timeInPeriod"]),
+                    goal["name"]["default"],
+                    goal["teamAbbrev"]["default"],
+                    home_team,
+                    away_team,
+                    int(goal["homeScore"]),
+                    int(goal["awayScore"]),
+                    goal["strength"],
+                    # [a["name"]["default"] for a in goal["assists"]],
+                )
+            )
+    return rows
+
+
+def parse_goals(info: dict[str, Any]) -> list[Goal]:
+    """Get all goals of a game from its gamecenter landing payload, in order.
+
+    Games that have not started yet have no goals. `info` may be decoded with
+    `decode.game_goals`, which keeps only what goals are parsed from.
+    """
+    return [Goal(*row) for row in _goal_rows(info)]
+
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+class _Dictionary:
+    """Dictionary encoding of strings as the codes of their first appearance."""
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class GoalTable:
+    """Goals stored column by column, in compact arrays.
+
+    Each field of `Goal` is a column: numbers in `array.array`s, dates as days
+    since 1970-01-01, times in period as seconds, and strings as codes into
+    dictionaries of their distinct values (`players`, `teams` and `strengths`).
+    A goal takes 45 bytes, several times less than a `Goal`, and
+    converting to pandas or Arrow shares the arrays rather than copying them.
+
+    Goals are added with `append` or `extend`, or straight from game info by
+    `get_goal_table`, and read back as `Goal` objects by index or iteration.
+    """
+
+    columns = tuple(f.name for f in fields(Goal))
+
+    def __init__(self) -> None:
+        self.players = _Dictionary()
+        self.teams = _Dictionary()
+        self.strengths = _Dictionary()
+        self.season = array("i")
+        self.game_id = array("q")
+        self.game_date = array("i")
+        self.period = array("b")
+        self.time_in_period = array("i")
+        self.player_name = array("i")
+        self.player_team = array("i")
+        self.home_team = array("i")
+        self.away_team = array("i")
+        self.home_score = array("h")
+        self.away_score = array("h")
+        self.strength = array("i")
+
+    @classmethod
+    def from_goals(cls, goals: Iterable[Goal]) -> "GoalTable":
+        """Make a table of goals."""
+        table = cls()
+        table.extend(goals)
+        return table
+
+    def __len__(self) -> int:
+        """Get the number of goals."""
+        return len(self.game_id)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the columns in bytes, not counting the dictionaries."""
+        return sum(
+            len(column) * column.itemsize
+            for column in (getattr(self, name) for name in self.columns)
+        )
+
+    def append_row(self, row: tuple[Any, ...]) -> None:
+        """Add a goal from its fields, in the order of `columns`."""
+        (season, game_id, game_date, period, clock, player, team, home, away) = row[:9]
+        self.season.append(season)
+        self.game_id.append(game_id)
+        self.game_date.append(game_date.toordinal() - _EPOCH)
+        self.period.append(period)
+        self.time_in_period.append(clock.minute * 60 + clock.second)
+        self.player_name.append(self.players.encode(player))
+        self.player_team.append(self.teams.encode(team))
+        self.home_team.append(self.teams.encode(home))
+        self.away_team.append(self.teams.encode(away))
+        self.home_score.append(row[9])
+        self.away_score.append(row[10])
+        self.strength.append(self.strengths.encode(row[11]))
+
+    def append(self, goal: Goal) -> None:
+        """Add a goal."""
+        self.append_row(goal.astuple())
+
+    def extend(self, goals: Iterable[Goal]) -> None:
+        """Add goals, column by column if they are in another `GoalTable`."""
+        if not isinstance(goals, GoalTable):
+            for goal in goals:
+                self.append(goal)
+            return
+        for name in ("season", "game_id", "game_date", "period", "time_in_period"):
+            getattr(self, name).extend(getattr(goals, name))
+        self.home_score.extend(goals.home_score)
+        self.away_score.extend(goals.away_score)
+        # Re-encode strings, whose codes differ between tables.
+        ours, theirs = self._dictionaries(), goals._dictionaries()  # noqa: SLF001
+        for name, dictionary in ours.items():
+            codes = [dictionary.encode(v) for v in theirs[name].values]
+            getattr(self, name).extend(codes[c] for c in getattr(goals, name))
+
+    def __getitem__(self, i: int) -> Goal:
+        """Get the goal at index `i`."""
+        seconds = self.time_in_period[i]
+        return Goal(
+            season=self.season[i],
+            game_id=self.game_id[i],
+            game_date=date.fromordinal(self.game_date[i] + _EPOCH),
+            period=self.period[i],
+            time_in_period=_clock(seconds),
+            player_name=self.players.values[self.player_name[i]],
+            player_team=self.teams.values[self.player_team[i]],
+            home_team=self.teams.values[self.home_team[i]],
+            away_team=self.teams.values[self.away_team[i]],
+            home_score=self.home_score[i],
+            away_score=self.away_score[i],
+            strength=self.strengths.values[self.strength[i]],
+        )
+
+    def __iter__(self) -> Iterator[Goal]:
+        """Iterate over the goals."""
+        return (self[i] for i in range(len(self)))
+
+    def _dictionaries(self) -> dict[str, _Dictionary]:
+        return {
+            "player_name": self.players,
+            "player_team": self.teams,
+            "home_team": self.teams,
+            "away_team": self.teams,
+            "strength": self.strengths,
+        }
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """Get the goals as a pandas DataFrame.
+
+        Numeric columns share memory with the table, which can't grow while
+        they exist. Strings are categoricals, dates are datetime64, and times in
+        period categoricals of `datetime.time`.
+        """
+        import numpy as np
+        import pandas as pd
+
+        def view(column: "array[int]") -> "np.ndarray[Any, Any]":
+            return np.frombuffer(column, dtype=column.typecode)
+
+        data: dict[str, Any] = {
+            name: view(getattr(self, name)) for name in self.columns
+        }
+        data["game_date"] = data["game_date"].astype("datetime64[D]")
+        for name, dictionary in self._dictionaries().items():
+            data[name] = pd.Categorical.from_codes(
+                data[name], pd.Index(dictionary.values)
+            )
+        clocks = range(max(self.time_in_period, default=-1) + 1)
+        data["time_in_period"] = pd.Categorical.from_codes(
+            data["time_in_period"],
+            dtype=pd.CategoricalDtype([_clock(s) for s in clocks]),
+        )
+        return pd.DataFrame(data, columns=list(self.columns), copy=False)
+
+    def to_arrow(self) -> "pa.Table":
+        """Get the goals as a pyarrow Table, without copying the columns.
+
+        Strings are dictionary arrays, dates date32 and times in period time32.
+
+        Raises
+        ------
+        ImportError
+            If pyarrow is not installed.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:  # pragma: no cover
+            raise ImportError("GoalTable.to_arrow requires pyarrow") from e
+
+        types = {"game_date": pa.date32(), "time_in_period": pa.time32("s")}
+        dictionaries = self._dictionaries()
+        arrays = []
+        for name in self.columns:
+            column = getattr(self, name)
+            values = pa.Array.from_buffers(
+                types.get(name, pa.from_numpy_dtype(column.typecode)),
+                len(column),
+                [None, pa.py_buffer(column)],
+            )
+            if name in dictionaries:
+                values = pa.DictionaryArray.from_arrays(
+                    values, pa.array(dictionaries[name].values, pa.string())
                 )
+            arrays.append(values)
+        return pa.Table.from_arrays(arrays, names=list(self.columns))
+
+
+def write_csv(goals: Iterable[Goal], f: IO[str], header: bool = True) -> int:
+    """Write goals to a CSV file one row at a time, returning how many were written.
+
+    Goals streamed from `get_goals` are written while later games are still
+    being fetched, without keeping them in memory. The rows are the same as
+    those of ``GoalTable.to_pandas().to_csv(f, index=False)``.
+    """
+    writer = csv.writer(f, lineterminator="\n")
+    if header:
+        writer.writerow(GoalTable.columns)
+    count = 0
+    for goal in goals:
+        writer.writerow(goal.astuple())
+        count += 1
+    return count
+
+
+def write_jsonl(goals: Iterable[Goal], f: IO[str]) -> int:
+    """Write goals to a JSON Lines file one object at a time.
+
+    Dates and period clocks are written as ISO strings, such as "2024-01-25"
+    and "00:12:34". Returns how many goals were written.
+    """
+    count = 0
+    for goal in goals:
+        row = dict(zip(GoalTable.columns, goal.astuple()))
+        row["game_date"] = goal.game_date.isoformat()
+        row["time_in_period"] = goal.time_in_period.isoformat()
+        f.write(json.dumps(row))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def write_arrow(table: GoalTable, f: IO[bytes]) -> None:
+    """Write a table of goals to an Arrow IPC file, with the types of `to_arrow`.
+
+    Raises
+    ------
+    ImportError
+        If pyarrow is not installed.
+    """
+    goals = table.to_arrow()
+    import pyarrow as pa
+
+    with pa.ipc.new_file(f, goals.schema) as writer:
+        writer.write_table(goals)
+
+
+def write_parquet(table: GoalTable, path: Union[str, PathLike[str]]) -> None:
+    """Write a table of goals to a Parquet dataset partitioned by season.
+
+    Goals of each season are written, compressed with zstd, under a
+    ``season=<season>`` directory of `path`, so readers filtering on season
+    only read the files of the seasons they need.
+
+    The goals of the games in `table` replace those already in the dataset,
+    and other games' goals are kept, so writing a few days' games updates
+    their season rather than replacing it. Seasons are rewritten whole, in
+    game order, to a hidden directory of `path` that then replaces the
+    season's, so a write that fails midway leaves the dataset as it was.
+    Games without goals in `table` are not known to it, so their goals
+    already in the dataset are kept too.
+
+    Parameters
+    ----------
+    table : GoalTable
+        The goals to write.
+    path : str or PathLike
+        Directory of the dataset. It is created if needed.
+
+    Raises
+    ------
+    ImportError
+        If pyarrow is not installed.
+    """
+    goals = table.to_arrow()
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    root = Path(path)
+    root.mkdir(parents=True, exist_ok=True)
+    for season in pc.unique(goals["season"]).to_pylist():
+        new = goals.filter(pc.equal(goals["season"], season))
+        partition = root / f"season={season}"
+        if partition.exists():
+            # Files of a partition don't have its column, only its directory.
+            old = pq.read_table(partition)
+            old = old.filter(pc.invert(pc.is_in(old["game_id"], new["game_id"])))
+            seasons = pa.array([season] * len(old), goals.schema.field("season").type)
+            old = old.append_column("season", seasons).select(goals.column_names)
+            new = pa.concat_tables([old.cast(goals.schema), new])
+        # Written next to the dataset, under a name its readers skip, and only
+        # swapped in once complete so a failed write leaves the season as it was.
+        with tempfile.TemporaryDirectory(prefix=".", dir=root) as staging:
+            pq.write_to_dataset(
+                new.sort_by([(c, "ascending") for c in _GAME_ORDER]),
+                staging,
+                partition_cols=["season"],
+                compression="zstd",
             )
-    return all_goals
+            if partition.exists():
+                partition.rename(Path(staging) / "replaced")
+            (Path(staging) / partition.name).rename(partition)
 
 
 def _date_opt(optstr: str) -> tuple[date, str]:
@@ -83,43 +495,366 @@ def _date_opt(optstr: str) -> tuple[date, str]:
     return dt, api.fmt_date(dt)
 
 
-def get_games(start_date: str = "", end_date: str = "") -> Iterable[dict[str, Any]]:
+def _date_range(start_date: str, end_date: str) -> tuple[str, str, date]:
+    """Normalize a range of dates, returning them with the last day to include."""
+    dt_from, start_date = _date_opt(start_date)
+    dt_to, end_date = _date_opt(end_date)
+
+    if dt_to < dt_from:
+        _log.warning(
+            "End date must be after start date; only getting games for %s", start_date
+        )
+        dt_to = dt_from
+
+    _log.debug("Getting games from %r to %r", dt_from, dt_to)
+    return start_date, end_date, dt_to
+
+
+def _games_until(week: dict[str, Any], dt_to: date) -> Iterator[dict[str, Any]]:
+    """Get the games of a schedule week played on or before `dt_to`."""
+    for day in week["gameWeek"]:
+        if api.parse_date(day["date"]) <= dt_to:
+            yield from day["games"]
+
+
+def _week_days(
+    week: dict[str, Any], start: date, end: date
+) -> list[tuple[date, list[dict[str, Any]]]]:
+    """Get the days of a schedule week between two days and their games."""
+    days = ((api.parse_date(d["date"]), d["games"]) for d in week["gameWeek"])
+    return sorted((day, games) for day, games in days if start <= day <= end)
+
+
+async def _aiter_indexed_games(
+    dt_from: date,
+    dt_to: date,
+    client: api.Client,
+    limits: api.RequestLimits,
+    index: schedule.ScheduleIndex,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Get the games between two days, only fetching days `index` doesn't cover.
+
+    Games are yielded in date order, those of covered days from the index and
+    the rest as their schedule weeks arrive.
+    """
+    start_dates = index.plan(dt_from, dt_to)
+    _log.debug("Schedule index covers all but weeks from %r", start_dates)
+    weeks = api.aiter_schedule_weeks(start_dates, client, limits=limits)
+    day = dt_from
+    try:
+        async for week in weeks:
+            index.add_week(week)
+            for fetched, games in _week_days(week, day, dt_to):
+                for _, known in index.games(day, fetched - ONE_DAY):
+                    for game in known:
+                        yield game
+                for game in games:
+                    yield game
+                day = fetched + ONE_DAY
+    finally:
+        await weeks.aclose()
+    for _, known in index.games(day, dt_to):
+        for game in known:
+            yield game
+
+
+async def _aiter_games(
+    start_date: str,
+    end_date: str,
+    client: api.Client,
+    limits: api.RequestLimits,
+    index: Optional[schedule.ScheduleIndex] = None,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Get the games between two dates as their schedule weeks arrive."""
+    start_date, end_date, dt_to = _date_range(start_date, end_date)
+    if index is not None:
+        games = _aiter_indexed_games(
+            api.parse_date(start_date), dt_to, client, limits, index
+        )
+        try:
+            async for game in games:
+                yield game
+        finally:
+            await games.aclose()
+        return
+    weeks = api.aiter_weekly_schedules(start_date, end_date, client, limits=limits)
+    try:
+        async for week in weeks:
+            for game in _games_until(week, dt_to):
+                yield game
+    finally:
+        await weeks.aclose()
+
+
+async def aget_games(
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+) -> list[dict[str, Any]]:
+    """Get all games between a range of dates on the running event loop.
+
+    See `get_games` for the parameters.
+    """
+    limits = api.RequestLimits(concurrency, rate)
+    async with api.use_client(client) as client:
+        return [
+            g async for g in _aiter_games(start_date, end_date, client, limits, index)
+        ]
+
+
+def get_games(
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+) -> Iterable[dict[str, Any]]:
     """Get all games between a range of dates.
 
     Parameters
     ----------
     start_date, end_date : str
         Start/end dates formatted as YYYY-MM-DD. Defaults to current date.
+    concurrency : int
+        Maximum number of API requests in flight at once.
+    rate : float, optional
+        Maximum number of API requests per second. Unlimited if not specified.
+    client : api.Client, optional
+        Client to make API requests with. Defaults to the shared client.
+    index : schedule.ScheduleIndex, optional
+        Index of schedule days already known, which is updated with the weeks
+        fetched. Only the days it doesn't cover are fetched.
 
     Returns
     -------
     Iterable[dict[str, Any]]
         Iterable of game info dictionaries.
     """
-    dt_from, start_date = _date_opt(start_date)
-    dt_to, end_date = _date_opt(end_date)
+    return api.run_sync(
+        aget_games(start_date, end_date, concurrency, rate, client, index)
+    )
 
-    if dt_to < dt_from:
-        _log.warning(
-            "End date must be after start date; only getting games for %s", start_date
-        )
-        dt_to = dt_from
 
-    _log.debug("Getting games from %r to %r", dt_from, dt_to)
+async def aget_scheduled_games(
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    limits: Optional[api.RequestLimits] = None,
+) -> list[schedule.ScheduledGame]:
+    """Get the scheduled games between a range of dates on the running event loop.
+
+    See `get_scheduled_games` for the parameters. Requests are made within
+    `limits` if given, such as ones shared with getting the games' goals.
+    """
+    start_date, end_date, dt_to = _date_range(start_date, end_date)
+    dt_from = api.parse_date(start_date)
+    limits = limits or api.RequestLimits(concurrency, rate)
+    games: list[schedule.ScheduledGame] = []
+    async with api.use_client(client) as client:
+        weeks = api.aiter_weekly_schedules(start_date, end_date, client, limits=limits)
+        async for week in weeks:
+            for day, day_games in _week_days(week, dt_from, dt_to):
+                games.extend(
+                    schedule.ScheduledGame.from_schedule(g, day) for g in day_games
+                )
+    return games
+
 
-    weekly_schedules = api.get_weekly_schedules(start_date, end_date)
+def get_scheduled_games(
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+) -> list[schedule.ScheduledGame]:
+    """Get the games between a range of dates, with the days they are played on.
+
+    Unlike `get_games`, games are parsed into `schedule.ScheduledGame` tuples,
+    in date order. See `get_games` for the parameters.
+    """
+    return api.run_sync(
+        aget_scheduled_games(start_date, end_date, concurrency, rate, client)
+    )
 
-    return chain(
-        *(
-            day["games"]
-            for week in weekly_schedules
-            for day in week["gameWeek"]
-            if api.parse_date(day["date"]) <= dt_to
+
+async def _aiter_game_ids(
+    start_date: str,
+    end_date: str,
+    client: api.Client,
+    limits: api.RequestLimits,
+    index: Optional[schedule.ScheduleIndex],
+) -> AsyncGenerator[int, None]:
+    """Get the ids of games between two dates as their schedule weeks arrive."""
+    games = _aiter_games(start_date, end_date, client, limits, index)
+    try:
+        async for game in games:
+            yield game["id"]
+    finally:
+        await games.aclose()
+
+
+async def _aiter_game_info(
+    start_date: str,
+    end_date: str,
+    concurrency: int,
+    rate: Optional[float],
+    client: Optional[api.Client],
+    index: Optional[schedule.ScheduleIndex],
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Get the info goals are parsed from of each game between two dates, in order.
+
+    Games are requested as soon as the schedule week they are in arrives, rather
+    than after the whole schedule. Both kinds of request share one set of limits.
+    Only the parts of game payloads that goals are parsed from are decoded.
+    """
+    limits = api.RequestLimits(concurrency, rate)
+    async with api.use_client(client) as client:
+        game_ids = _aiter_game_ids(start_date, end_date, client, limits, index)
+        game_info = api.aiter_game_info(
+            game_ids, client, ordered=True, limits=limits, decoder=decode.game_goals
         )
+        try:
+            async for info in game_info:
+                yield info
+        finally:
+            await game_info.aclose()
+            await game_ids.aclose()
+
+
+def _goal_table(game_info: list[dict[str, Any]]) -> GoalTable:
+    """Get a table of the goals of games. Runs in worker processes."""
+    table = GoalTable()
+    for info in game_info:
+        for row in _goal_rows(info):
+            table.append_row(row)
+    return table
+
+
+async def _aiter_goal_tables(
+    game_info: AsyncIterator[dict[str, Any]], workers: int
+) -> AsyncGenerator[GoalTable, None]:
+    """Get tables of the goals of chunks of games, parsed by worker processes.
+
+    Tables are yielded in game order. At most a couple of chunks per worker are
+    parsed or waiting to be at once, so game info is not held for long.
+    """
+    loop = asyncio.get_running_loop()
+    # Forking would copy the library's event loop thread in an unusable state.
+    pool = ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+    parsing: deque[asyncio.Future[GoalTable]] = deque()
+    chunks = _achunks(game_info, GAMES_PER_CHUNK)
+    try:
+        async for chunk in chunks:
+            parsing.append(loop.run_in_executor(pool, _goal_table, chunk))
+            while parsing and (parsing[0].done() or len(parsing) > 2 * workers):
+                yield await parsing.popleft()
+        while parsing:
+            yield await parsing.popleft()
+    finally:
+        await chunks.aclose()
+        for future in parsing:
+            future.cancel()
+        pool.shutdown(wait=not parsing, cancel_futures=True)
+
+
+async def _achunks(
+    items: AsyncIterator[_T], size: int
+) -> AsyncGenerator[list[_T], None]:
+    """Get lists of `size` items, but for the last which may be shorter."""
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _aiter_game_goals(
+    start_date: str,
+    end_date: str,
+    concurrency: int,
+    rate: Optional[float],
+    client: Optional[api.Client],
+    index: Optional[schedule.ScheduleIndex],
+    workers: Optional[int] = None,
+) -> AsyncGenerator[Iterable[Goal], None]:
+    """Get the goals of games between two dates, in game order.
+
+    Goals are parsed game by game, or in chunks of games by `workers` processes.
+    """
+    game_info = _aiter_game_info(start_date, end_date, concurrency, rate, client, index)
+    games = (
+        _aiter_goal_tables(game_info, workers)
+        if workers
+        else (parse_goals(info) async for info in game_info)
     )
+    try:
+        # Each game's info can be dropped as soon as its goals are parsed.
+        async for goals in games:
+            yield goals
+    finally:
+        await games.aclose()
+        await game_info.aclose()
 
 
-def get_goals(start_date: str, end_date: str = "") -> Iterable[Goal]:
+async def aiter_goals(
+    start_date: str,
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+    workers: Optional[int] = None,
+) -> AsyncGenerator[Goal, None]:
+    """Get all goals between specified dates as an async iterator.
+
+    Requests run on the running event loop. See `get_goals` for the parameters.
+    """
+    games = _aiter_game_goals(
+        start_date, end_date, concurrency, rate, client, index, workers
+    )
+    try:
+        async for goals in games:
+            for goal in goals:
+                yield goal
+    finally:
+        await games.aclose()
+
+
+async def aget_goals(
+    start_date: str,
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+    workers: Optional[int] = None,
+) -> list[Goal]:
+    """Get a list of all goals between specified dates on the running event loop.
+
+    See `get_goals` for the parameters.
+    """
+    goals = aiter_goals(start_date, end_date, concurrency, rate, client, index, workers)
+    return [g async for g in goals]
+
+
+def get_goals(
+    start_date: str,
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+    workers: Optional[int] = None,
+) -> Iterable[Goal]:
     """Get a list of all goals between specified dates.
 
     Parameters
@@ -128,18 +863,128 @@ def get_goals(start_date: str, end_date: str = "") -> Iterable[Goal]:
         The starting date, in YYYY-MM-DD format
     end_date : str
         The ending date, in YYYY-MM-DD. Defaults to the current date if not specified
+    concurrency : int
+        Maximum number of API requests in flight at once.
+    rate : float, optional
+        Maximum number of API requests per second. Unlimited if not specified.
+    client : api.Client, optional
+        Client to make API requests with. Defaults to the shared client.
+    index : schedule.ScheduleIndex, optional
+        Index of schedule days already known, which is updated with the weeks
+        fetched. Only the days it doesn't cover are fetched.
+    workers : int, optional
+        Number of processes to parse goals in, in chunks of games. Goals are
+        parsed in this process if not specified.
 
     Returns
     -------
-    list[Goal]
-        A list of `Goal` objects.
-    """
-    game_ids = [  # pragma: no branch
-        g["id"] for g in get_games(start_date, end_date=end_date)
-    ]
-    game_info = api.get_game_info(game_ids)
-
-    # _parse_goals_from_game_info returns a list of goals for a single game. So
-    # we'll have a list of lists of goals for each game that need to be chained
-    # into a single list.
-    return chain(*(_parse_goals_from_game_info(i) for i in game_info))
+    Iterable[Goal]
+        `Goal` objects, in game order. Games are parsed as their info arrives,
+        while later games are still being fetched.
+    """
+    # Hand goals over a game at a time, rather than crossing threads per goal.
+    games = _aiter_game_goals(
+        start_date, end_date, concurrency, rate, client, index, workers
+    )
+    return chain.from_iterable(api.iter_sync(games))
+
+
+async def _aiter_goals_by_game(
+    start_date: str,
+    end_date: str,
+    concurrency: int,
+    rate: Optional[float],
+    client: Optional[api.Client],
+    index: Optional[schedule.ScheduleIndex],
+) -> AsyncGenerator[tuple[int, list[Goal]], None]:
+    game_info = _aiter_game_info(start_date, end_date, concurrency, rate, client, index)
+    try:
+        async for info in game_info:
+            yield info["id"], parse_goals(info)
+    finally:
+        await game_info.aclose()
+
+
+def iter_game_goals(
+    start_date: str,
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+) -> Iterator[tuple[int, list[Goal]]]:
+    """Get the id and goals of each game between specified dates, in game order.
+
+    Unlike `get_goals`, games without goals are included, with no goals. See
+    `get_goals` for the parameters.
+    """
+    return api.iter_sync(
+        _aiter_goals_by_game(start_date, end_date, concurrency, rate, client, index)
+    )
+
+
+async def aiter_goals_of_games(
+    game_ids: Iterable[int],
+    client: Optional[api.Client] = None,
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    limits: Optional[api.RequestLimits] = None,
+) -> AsyncGenerator[tuple[int, list[Goal]], None]:
+    """Get the id and goals of games, in the order their info arrives.
+
+    Games that could not be fetched are logged and skipped. Requests are made
+    within `limits` if given, or else as `concurrency` and `rate` allow.
+    """
+    game_info = api.aiter_game_info(
+        game_ids, client, concurrency, rate, limits=limits, decoder=decode.game_goals
+    )
+    try:
+        async for info in game_info:
+            yield info["id"], parse_goals(info)
+    finally:
+        await game_info.aclose()
+
+
+async def aget_goal_table(
+    start_date: str,
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+    workers: Optional[int] = None,
+) -> GoalTable:
+    """Get a table of all goals between specified dates on the running event loop.
+
+    See `get_goals` for the parameters.
+    """
+    table = GoalTable()
+    games = _aiter_game_goals(
+        start_date, end_date, concurrency, rate, client, index, workers
+    )
+    try:
+        async for goals in games:
+            table.extend(goals)
+    finally:
+        await games.aclose()
+    return table
+
+
+def get_goal_table(
+    start_date: str,
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+    index: Optional[schedule.ScheduleIndex] = None,
+    workers: Optional[int] = None,
+) -> GoalTable:
+    """Get a table of all goals between specified dates.
+
+    Goals are added to the table in game order. With `workers`, they are parsed
+    into tables in worker processes and merged. See `get_goals` for the
+    parameters.
+    """
+    return api.run_sync(
+        aget_goal_table(start_date, end_date, concurrency, rate, client, index, workers)
+    )
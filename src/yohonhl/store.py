@@ -0,0 +1,309 @@
+"""Local SQLite store of games and goals, for querying without the API."""
+
+import logging
+import sqlite3
+from collections.abc import Iterable
+from datetime import date
+from datetime import time
+from itertools import islice
+from os import PathLike
+from pathlib import Path
+from typing import Any
+from typing import Optional
+from typing import Union
+
+from yohonhl import api
+from yohonhl.diff import DELETE
+from yohonhl.diff import GoalEvent
+from yohonhl.schedule import ScheduledGame
+from yohonhl.stats import Goal
+from yohonhl.stats import GoalTable
+
+_log = logging.getLogger("yohonhl.store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    season INTEGER NOT NULL,
+    game_type INTEGER NOT NULL,
+    game_date TEXT NOT NULL,
+    start_time_utc TEXT NOT NULL,
+    game_state TEXT NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_score INTEGER,
+    away_score INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_season ON games (season);
+CREATE INDEX IF NOT EXISTS games_date ON games (game_date);
+CREATE INDEX IF NOT EXISTS games_home_team ON games (home_team, game_date);
+CREATE INDEX IF NOT EXISTS games_away_team ON games (away_team, game_date);
+
+CREATE TABLE IF NOT EXISTS goals (
+    season INTEGER NOT NULL,
+    game_id INTEGER NOT NULL,
+    game_date TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    time_in_period INTEGER NOT NULL,
+    player_name TEXT NOT NULL,
+    player_team TEXT NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_score INTEGER NOT NULL,
+    away_score INTEGER NOT NULL,
+    strength TEXT NOT NULL,
+    PRIMARY KEY (game_id, period, time_in_period, player_name)
+);
+CREATE INDEX IF NOT EXISTS goals_season ON goals (season);
+CREATE INDEX IF NOT EXISTS goals_date ON goals (game_date);
+CREATE INDEX IF NOT EXISTS goals_team ON goals (player_team, game_date);
+CREATE INDEX IF NOT EXISTS goals_player ON goals (player_name, game_date);
+
+CREATE TABLE IF NOT EXISTS sync (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_GAME_COLUMNS = ScheduledGame._fields
+_GOAL_COLUMNS = GoalTable.columns
+_GOAL_KEY = ("game_id", "period", "time_in_period", "player_name")
+
+
+def _upsert(table: str, columns: tuple[str, ...], key: tuple[str, ...]) -> str:
+    """Get a statement inserting a row, or updating the row with the same key."""
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in key)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "  # noqa: S608
+        f"VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}"
+    )
+
+
+_UPSERT_GAME = _upsert("games", _GAME_COLUMNS, ("id",))
+_UPSERT_GOAL = _upsert("goals", _GOAL_COLUMNS, _GOAL_KEY)
+_DELETE_GOAL = (
+    "DELETE FROM goals "
+    "WHERE game_id = ? AND period = ? AND time_in_period = ? AND player_name = ?"
+)
+
+
+def _game_row(game: ScheduledGame) -> tuple[Any, ...]:
+    return (*game[:3], game.game_date.isoformat(), *game[4:])
+
+
+def _game(row: tuple[Any, ...]) -> ScheduledGame:
+    game_id, season, game_type, game_date, *rest = row
+    return ScheduledGame(game_id, season, game_type, api.parse_date(game_date), *rest)
+
+
+def _goal_row(goal: Goal) -> tuple[Any, ...]:
+    return (
+        goal.season,
+        goal.game_id,
+        goal.game_date.isoformat(),
+        goal.period,
+        goal.seconds,
+        goal.player_name,
+        goal.player_team,
+        goal.home_team,
+        goal.away_team,
+        goal.home_score,
+        goal.away_score,
+        goal.strength,
+    )
+
+
+def _goal_key_row(goal: Goal) -> tuple[Any, ...]:
+    return goal.game_id, goal.period, goal.seconds, goal.player_name
+
+
+def _goal(row: tuple[Any, ...]) -> Goal:
+    season, game_id, game_date, period, seconds, *rest = row
+    return Goal(
+        season,
+        game_id,
+        api.parse_date(game_date),
+        period,
+        time(0, *divmod(seconds, 60)),
+        *rest,
+    )
+
+
+class Store:
+    """SQLite database of games and their goals.
+
+    Games from the schedule and goals are upserted in bulk, keyed by game id and
+    by game, period, time in period and scorer. Both tables are indexed by
+    season, date and team, and goals by scorer too, so queries over a team's or
+    player's goals in a date range only read the matching rows.
+
+    Parameters
+    ----------
+    path : str or PathLike
+        Path to the database. Parent directories are created if needed. Use
+        ":memory:" for a store that lasts only as long as this object.
+    """
+
+    def __init__(self, path: Union[str, PathLike[str]]) -> None:
+        if str(path) != ":memory:":
+            path = Path(path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        # The store is used from whichever thread runs the event loop.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def upsert_games(self, games: Iterable[ScheduledGame]) -> int:
+        """Add or update games from the schedule, returning how many there were."""
+        with self._db:
+            cursor = self._db.executemany(_UPSERT_GAME, map(_game_row, games))
+        _log.debug("Upserted %d games", cursor.rowcount)
+        return cursor.rowcount
+
+    def upsert_goals(self, goals: Iterable[Goal]) -> int:
+        """Add or update goals, returning how many there were."""
+        with self._db:
+            cursor = self._db.executemany(_UPSERT_GOAL, map(_goal_row, goals))
+        _log.debug("Upserted %d goals", cursor.rowcount)
+        return cursor.rowcount
+
+    def replace_goals(
+        self, games: Iterable[tuple[int, list[Goal]]], batch_size: int = 256
+    ) -> int:
+        """Replace the goals of games, returning how many goals were written.
+
+        Goals no longer in a game, such as after a scoring correction, are
+        removed. Games are written a batch at a time, each batch in one
+        transaction.
+
+        Parameters
+        ----------
+        games : Iterable[tuple[int, list[Goal]]]
+            Ids and goals of games, such as from `stats.iter_game_goals`.
+        batch_size : int
+            Number of games to write per transaction.
+        """
+        it = iter(games)
+        count = 0
+        while batch := list(islice(it, batch_size)):
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM goals WHERE game_id = ?", ((g,) for g, _ in batch)
+                )
+                rows = [_goal_row(goal) for _, goals in batch for goal in goals]
+                self._db.executemany(_UPSERT_GOAL, rows)
+            count += len(rows)
+        _log.debug("Replaced goals of games, %d goals", count)
+        return count
+
+    def apply(self, events: Iterable[GoalEvent]) -> int:
+        """Apply changes to goals, such as from `GoalDiff`, returning how many.
+
+        All of the events are applied in one transaction. Updates replace the
+        previous goal, so a change of scorer leaves no stale row behind.
+        """
+        count = 0
+        with self._db:
+            for event in events:
+                if event.kind == DELETE:
+                    self._db.execute(_DELETE_GOAL, _goal_key_row(event.goal))
+                else:
+                    if event.previous is not None:
+                        self._db.execute(_DELETE_GOAL, _goal_key_row(event.previous))
+                    self._db.execute(_UPSERT_GOAL, _goal_row(event.goal))
+                count += 1
+        _log.debug("Applied %d goal events", count)
+        return count
+
+    def goals(
+        self,
+        season: Optional[int] = None,
+        team: Optional[str] = None,
+        player: Optional[str] = None,
+        strength: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> list[Goal]:
+        """Get the goals matching all of the given filters, in game order.
+
+        Parameters
+        ----------
+        season : int, optional
+            Season the goals were scored in, such as 20232024.
+        team : str, optional
+            Abbreviation of the scoring team, such as "DET".
+        player : str, optional
+            Name of the scorer, as in goals, such as "D. Larkin".
+        strength : str, optional
+            Strength the goals were scored at, such as "pp".
+        start, end : date, optional
+            First and last days the goals were scored on.
+        """
+        filters = {
+            "season = ?": season,
+            "player_team = ?": team,
+            "player_name = ?": player,
+            "strength = ?": strength,
+            "game_date >= ?": start.isoformat() if start else None,
+            "game_date <= ?": end.isoformat() if end else None,
+        }
+        conditions = [c for c, value in filters.items() if value is not None] or ["1"]
+        rows = self._db.execute(
+            f"SELECT {', '.join(_GOAL_COLUMNS)} FROM goals "  # noqa: S608
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY game_date, game_id, period, time_in_period",
+            [value for value in filters.values() if value is not None],
+        )
+        return [_goal(row) for row in rows]
+
+    def games(
+        self, season: Optional[int] = None, team: Optional[str] = None
+    ) -> list[ScheduledGame]:
+        """Get the games of a season or team, or all of them, in date order."""
+        filters = {"season = ?": season, "? IN (home_team, away_team)": team}
+        conditions = [c for c, value in filters.items() if value is not None] or ["1"]
+        rows = self._db.execute(
+            f"SELECT {', '.join(_GAME_COLUMNS)} FROM games "  # noqa: S608
+            f"WHERE {' AND '.join(conditions)} ORDER BY game_date, id",
+            [value for value in filters.values() if value is not None],
+        )
+        return [_game(row) for row in rows]
+
+    def game_states(self, start: date) -> dict[int, str]:
+        """Get the states of the games played on or after `start`, by id."""
+        rows = self._db.execute(
+            "SELECT id, game_state FROM games WHERE game_date >= ?",
+            (start.isoformat(),),
+        )
+        return dict(rows.fetchall())
+
+    @property
+    def watermark(self) -> Optional[date]:
+        """Get the last day up to which all stored games were final when synced."""
+        row = self._db.execute(
+            "SELECT value FROM sync WHERE key = 'watermark'"
+        ).fetchone()
+        return None if row is None else api.parse_date(row[0])
+
+    @watermark.setter
+    def watermark(self, day: date) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync (key, value) VALUES ('watermark', ?)",
+                (day.isoformat(),),
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> "Store":
+        """Enter a context that closes the store on exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the store."""
+        self.close()
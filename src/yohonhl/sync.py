@@ -0,0 +1,222 @@
+"""Keeping a store of games and goals up to date with few requests."""
+
+import logging
+from collections.abc import Iterable
+from datetime import date
+from datetime import datetime
+from typing import NamedTuple
+from typing import Optional
+
+from yohonhl import api
+from yohonhl import stats
+from yohonhl.schedule import ScheduledGame
+from yohonhl.store import Store
+
+_log = logging.getLogger("yohonhl.sync")
+
+
+class SyncResult(NamedTuple):
+    """The days a sync got the schedule of, what it updated, and its watermark."""
+
+    start: date
+    end: date
+    games: int
+    updated: int
+    watermark: Optional[date]
+
+
+def _today() -> date:
+    return datetime.now().date()  # noqa: DTZ005
+
+
+def _advanced(games: Iterable[ScheduledGame], states: dict[int, str]) -> list[int]:
+    """Get the ids of games whose goals may have changed since they were stored.
+
+    Those are games that have started, and are live or were not final when
+    stored. Games not stored yet count as upcoming.
+    """
+    return [
+        g.id
+        for g in games
+        if g.game_state not in api.UPCOMING_STATES
+        and (g.game_state not in api.FINAL_STATES or states.get(g.id) != g.game_state)
+    ]
+
+
+def _watermark(
+    games: list[ScheduledGame], missing: set[int], end: date, today: date
+) -> date:
+    """Get the last day up to which games are final and their goals stored."""
+    pending = [
+        g.game_date
+        for g in games
+        if g.game_state not in api.FINAL_STATES or g.id in missing
+    ]
+    last = min(end, today - stats.ONE_DAY)
+    return min(last, min(pending) - stats.ONE_DAY) if pending else last
+
+
+async def aupdate(
+    store: Store,
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+) -> SyncResult:
+    """Update a store with what changed since the last update, on the running loop.
+
+    See `update` for the parameters.
+    """
+    today = _today()
+    watermark = store.watermark
+    if watermark is not None:
+        start = watermark + stats.ONE_DAY
+    else:
+        start = api.parse_date(start_date) if start_date else today
+    end = api.parse_date(end_date) if end_date else today
+    if end < start:
+        _log.info("Store is up to date through %s", watermark)
+        return SyncResult(start, end, 0, 0, watermark)
+
+    limits = api.RequestLimits(concurrency, rate)
+    async with api.use_client(client) as client:
+        games = await stats.aget_scheduled_games(
+            api.fmt_date(start), api.fmt_date(end), client=client, limits=limits
+        )
+        advanced = _advanced(games, store.game_states(start))
+        _log.debug("Getting goals of %d of %d games", len(advanced), len(games))
+        updated = [
+            game
+            async for game in stats.aiter_goals_of_games(
+                advanced, client, limits=limits
+            )
+        ]
+
+    # Games that could not be fetched keep their stored state, so they are
+    # fetched again by the next update.
+    missing = set(advanced) - {game_id for game_id, _ in updated}
+    store.replace_goals(updated)
+    store.upsert_games(g for g in games if g.id not in missing)
+    last = _watermark(games, missing, end, today)
+    if watermark is None or last > watermark:
+        store.watermark = watermark = last
+    _log.info(
+        "Synced %s to %s: %d games, %d updated, final through %s",
+        start,
+        end,
+        len(games),
+        len(updated),
+        watermark,
+    )
+    return SyncResult(start, end, len(games), len(updated), watermark)
+
+
+def update(
+    store: Store,
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+) -> SyncResult:
+    """Update a store with the games and goals that changed since the last update.
+
+    The store keeps a watermark: the last day up to which all games were final
+    when it was updated. An update gets the schedule from the day after it (or
+    from `start_date` the first time) to `end_date`, and the goals of only the
+    games that started, or were live, since they were stored. Once games are
+    final, they are not fetched again, so a store of a whole season is kept up
+    to date with a few requests a day.
+
+    Parameters
+    ----------
+    store : Store
+        The store to update.
+    start_date : str
+        Date to get games from if the store has no watermark yet, formatted as
+        YYYY-MM-DD. Defaults to the current date.
+    end_date : str
+        Date to get games up to, formatted as YYYY-MM-DD. Defaults to the
+        current date.
+    concurrency : int
+        Maximum number of API requests in flight at once.
+    rate : float, optional
+        Maximum number of API requests per second. Unlimited if not specified.
+    client : api.Client, optional
+        Client to make API requests with. Defaults to the shared client.
+
+    Returns
+    -------
+    SyncResult
+        The days the schedule was fetched for, the number of games in it and
+        of those whose goals were fetched, and the watermark after the update.
+    """
+    return api.run_sync(aupdate(store, start_date, end_date, concurrency, rate, client))
+
+
+async def aingest(
+    store: Store,
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+) -> int:
+    """Store the games between two dates and their goals, on the running loop.
+
+    See `ingest` for the parameters.
+    """
+    limits = api.RequestLimits(concurrency, rate)
+    async with api.use_client(client) as client:
+        games = await stats.aget_scheduled_games(
+            start_date, end_date, client=client, limits=limits
+        )
+        started = [g.id for g in games if g.game_state not in api.UPCOMING_STATES]
+        fetched = [
+            game
+            async for game in stats.aiter_goals_of_games(started, client, limits=limits)
+        ]
+    store.replace_goals(fetched)
+    store.upsert_games(games)
+    _log.info("Stored %d games, %d with goals fetched", len(games), len(fetched))
+    return len(fetched)
+
+
+def ingest(
+    store: Store,
+    start_date: str = "",
+    end_date: str = "",
+    concurrency: int = api.DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    client: Optional[api.Client] = None,
+) -> int:
+    """Store the games between two dates, and the goals of those that started.
+
+    Unlike `update`, every game in the range is fetched again, whatever the
+    store has. The schedule is fetched once, and games are requested by the
+    ids in it, within the same limits.
+
+    Parameters
+    ----------
+    store : Store
+        The store to add the games and goals to.
+    start_date : str
+        Date to get games from, formatted as YYYY-MM-DD. Defaults to the
+        current date.
+    end_date : str
+        Date to get games up to, formatted as YYYY-MM-DD. Defaults to the
+        current date.
+    concurrency : int
+        Maximum number of API requests in flight at once.
+    rate : float, optional
+        Maximum number of API requests per second. Unlimited if not specified.
+    client : api.Client, optional
+        Client to make API requests with. Defaults to the shared client.
+
+    Returns
+    -------
+    int
+        Number of games whose goals were fetched and stored.
+    """
+    return api.run_sync(aingest(store, start_date, end_date, concurrency, rate, client))
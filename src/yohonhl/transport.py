@@ -0,0 +1,208 @@
+"""Transports sending the requests of API clients, or replaying recorded ones.
+
+A client sends each request through its transport. The default `Transport`
+sends requests over the client's aiohttp session. `RecordingTransport` also
+writes every response to a zip archive, which `ReplayTransport` serves from
+without a network, with simulated latency, for repeatable benchmarks and tests.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import zipfile
+from collections.abc import Mapping
+from http import HTTPStatus
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+if TYPE_CHECKING:
+    from yohonhl.api import Client
+
+_log = logging.getLogger("yohonhl.transport")
+
+# Headers that requests are retried and cached by, so are worth recording.
+_RECORDED_HEADERS = ("ETag", "Last-Modified", "Retry-After")
+
+_INDEX = "index.json"
+_VERSION = 1
+
+
+class Response(NamedTuple):
+    """Status, headers and body of a response.
+
+    Bodies are only read for responses that are `ok`, and empty otherwise.
+    """
+
+    status: int
+    headers: Mapping[str, str]
+    body: bytes = b""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the status is not an error, as with aiohttp."""
+        return self.status < HTTPStatus.BAD_REQUEST
+
+
+class Transport:
+    """Sends the GET requests of a client over its aiohttp session.
+
+    Subclasses override `get` to send requests some other way, or to serve
+    responses without sending requests at all.
+    """
+
+    async def get(
+        self, client: "Client", url: str, headers: Mapping[str, str]
+    ) -> Response:
+        """Send a GET request to `url` with `headers` on behalf of `client`.
+
+        Connection errors and timeouts are raised as they are by aiohttp, for
+        the client to retry.
+        """
+        async with client.session().get(url=url, headers=headers) as response:
+            body = await response.read() if response.ok else b""
+            return Response(response.status, response.headers, body)
+
+
+class RecordingTransport(Transport):
+    """Sends requests with another transport, recording their responses.
+
+    Responses are written to a zip archive as they arrive, their bodies
+    compressed, and indexed by URL when the transport is closed. Every response
+    to a URL is kept in order, so that games polled while live replay as they
+    changed.
+
+    Parameters
+    ----------
+    path : str or PathLike
+        Path to the archive, which is overwritten. Parent directories are
+        created if needed.
+    transport : Transport, optional
+        Transport to send requests with. Defaults to `Transport`.
+    """
+
+    def __init__(
+        self, path: Union[str, PathLike[str]], transport: Optional[Transport] = None
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.transport = transport or Transport()
+        self._zip = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED)
+        self._responses: dict[str, list[tuple[int, dict[str, str], str]]] = {}
+        self._count = 0
+        self._closed = False
+
+    async def get(
+        self, client: "Client", url: str, headers: Mapping[str, str]
+    ) -> Response:
+        """Send a GET request with the wrapped transport, and record its response."""
+        response = await self.transport.get(client, url, headers)
+        self._count += 1
+        name = f"bodies/{self._count}"
+        self._zip.writestr(name, response.body)
+        recorded = {
+            h: response.headers[h] for h in _RECORDED_HEADERS if h in response.headers
+        }
+        self._responses.setdefault(url, []).append((response.status, recorded, name))
+        return response
+
+    def close(self) -> None:
+        """Write the index of recorded responses and close the archive."""
+        if self._closed:
+            return
+        self._closed = True
+        index = {"version": _VERSION, "responses": self._responses}
+        self._zip.writestr(_INDEX, json.dumps(index))
+        self._zip.close()
+        _log.debug("Recorded %d responses to %s", self._count, self.path)
+
+    def __enter__(self) -> "RecordingTransport":
+        """Enter a context that closes the archive on exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the archive."""
+        self.close()
+
+
+class ReplayTransport(Transport):
+    """Serves responses recorded by `RecordingTransport`, without a network.
+
+    The responses recorded for a URL are served in the order they were
+    recorded, and the last one again after that. URLs not in the archive get
+    404 Not Found. Each response is delayed by `latency` seconds plus a random
+    part of up to `jitter` seconds, as if it came over a network.
+
+    Parameters
+    ----------
+    path : str or PathLike
+        Path to the archive.
+    latency : float
+        Seconds every response takes at least.
+    jitter : float
+        Most seconds added at random to the latency of a response.
+    seed : int, optional
+        Seed of the random jitter, to delay responses the same way every run.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, PathLike[str]],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        if latency < 0 or jitter < 0:
+            raise ValueError(
+                f"latency and jitter must not be negative, got {latency!r}, {jitter!r}"
+            )
+        self.path = Path(path).expanduser()
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)  # noqa: S311
+        self._zip = zipfile.ZipFile(self.path)
+        try:
+            index: dict[str, Any] = json.loads(self._zip.read(_INDEX))
+        except KeyError:
+            # Recordings are indexed when they are closed.
+            index = {}
+        if index.get("version") != _VERSION:
+            self._zip.close()
+            raise ValueError(f"{self.path} is not a complete recording to replay")
+        self._responses: dict[str, list[list[Any]]] = index["responses"]
+        self._served: dict[str, int] = {}
+
+    async def get(
+        self,
+        client: "Client",  # noqa: ARG002
+        url: str,
+        headers: Mapping[str, str],  # noqa: ARG002
+    ) -> Response:
+        """Serve the next response recorded for `url`, after a simulated delay."""
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        responses = self._responses.get(url)
+        if not responses:
+            return Response(HTTPStatus.NOT_FOUND, {})
+        served = self._served.get(url, 0)
+        self._served[url] = min(served + 1, len(responses) - 1)
+        status, recorded, name = responses[served]
+        return Response(status, recorded, self._zip.read(name))
+
+    def close(self) -> None:
+        """Close the archive."""
+        self._zip.close()
+
+    def __enter__(self) -> "ReplayTransport":
+        """Enter a context that closes the archive on exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the archive."""
+        self.close()
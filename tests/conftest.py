@@ -1,14 +1,17 @@
 """PyTest fixtures."""
 
 import re
+from collections.abc import Callable
 from collections.abc import Generator
 from copy import deepcopy
+from datetime import timedelta
 from typing import Any
 
 import pytest
 from aioresponses import aioresponses
 
 from yohonhl import api
+from yohonhl import stats
 
 
 @pytest.fixture
@@ -3169,9 +3172,46 @@ def game_data() -> dict[str, Any]:
     }
 
 
+@pytest.fixture
+def goals(game_data: dict[str, Any]) -> list[stats.Goal]:
+    """Goals parsed from sample game data."""
+    return stats.parse_goals(game_data)
+
+
 @pytest.fixture
 def game_data_without_scoring(game_data: dict[str, Any]) -> dict[str, Any]:
     """Game data with no scoring info."""
     new_game_data = deepcopy(game_data)
     new_game_data["summary"].pop("scoring")
     return new_game_data
+
+
+@pytest.fixture
+def week() -> Callable[..., dict[str, Any]]:
+    """Make schedule weeks with one game a day, with ids of their dates' ordinals."""
+
+    def make_week(start: str, days: int = 7, state: str = "OFF") -> dict[str, Any]:
+        first = api.parse_date(start)
+        dates = [first + timedelta(days=i) for i in range(days)]
+        return {
+            "nextStartDate": api.fmt_date(first + timedelta(days=days)),
+            "gameWeek": [
+                {
+                    "date": api.fmt_date(d),
+                    "games": [
+                        {
+                            "id": d.toordinal(),
+                            "season": 20232024,
+                            "gameType": 2,
+                            "startTimeUTC": f"{d}T00:00:00Z",
+                            "gameState": state,
+                            "homeTeam": {"abbrev": "DET", "score": 3},
+                            "awayTeam": {"abbrev": "PHI", "score": 1},
+                        }
+                    ],
+                }
+                for d in dates
+            ],
+        }
+
+    return make_week
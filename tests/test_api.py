@@ -1,13 +1,24 @@
 """Unit tests for the yohonhl.api module."""
 
+import asyncio
+import datetime
+import math
 import re
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Generator
 from typing import Any
 from typing import AnyStr
+from typing import Optional
 
+import aiohttp
 import pytest
+from aioresponses import CallbackResult
 from aioresponses import aioresponses
+from yarl import URL
 
 from yohonhl import api
+from yohonhl.cache import ResponseCache
 
 
 def test_get_week_start_dates_with_more_than_one_week() -> None:
@@ -62,6 +73,27 @@ def test_get_schedule_for_date(
     assert all(s == resp for s in api.get_weekly_schedules(datestr))
 
 
+@pytest.mark.parametrize(
+    ("datestr", "expected"),
+    [
+        ("2024-01-05", datetime.date(2024, 1, 5)),
+        ("2024-1-5", datetime.date(2024, 1, 5)),
+        ("1999-12-31", datetime.date(1999, 12, 31)),
+    ],
+)
+def test_parse_date(datestr: str, expected: datetime.date) -> None:
+    """Dates are parsed whether or not they are zero-padded."""
+    assert api.parse_date(datestr) == expected
+    assert api.normalize_datestr(datestr) == expected.isoformat()
+
+
+@pytest.mark.parametrize("datestr", ["2024-02-30", "2024-+1-01", "2024-01-05x"])
+def test_parse_bad_date_raises(datestr: str) -> None:
+    """Invalid dates raise ValueError, like strptime."""
+    with pytest.raises(ValueError, match=r"."):
+        api.parse_date(datestr)
+
+
 def test_get_schedule_with_bad_date_raises() -> None:
     """Test that an incorrect date supplied ot get_schedule raises value error."""
     datestr = "not-a-date"
@@ -115,3 +147,754 @@ async def test_can_run_in_thread(
     mock_aioresponse.get(ep_match_game, payload={"foo": "bar"}, repeat=True)
     game_info = list(api.get_game_info([20230207011, 20230207012]))
     assert len(game_info) == 2
+
+
+def test_get_client_is_shared() -> None:
+    """The shared client is created once and reused."""
+    assert api.get_client() is api.get_client()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_client_reuses_session(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """A client keeps one session open across requests until closed."""
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"}, repeat=True)
+    async with api.Client(limit=4, ttl_dns_cache=10) as client:
+        session = client.session()
+        get = api._get_endpoints_async  # noqa: SLF001
+        first = list(await get([f"{api.URL}/gamecenter/1/landing"], client))
+        second = list(await get([f"{api.URL}/gamecenter/2/landing"], client))
+        assert first == second == [{"foo": "bar"}]
+        assert client.session() is session
+        assert not client.closed
+    assert client.closed
+
+
+def test_client_bound_to_another_loop_raises() -> None:
+    """Using a client's open session from another event loop fails."""
+    client = api.Client()
+
+    async def open_session() -> None:
+        client.session()
+
+    api.run_sync(open_session())
+    other = asyncio.new_event_loop()
+    try:
+        with pytest.raises(RuntimeError, match="another event loop"):
+            other.run_until_complete(open_session())
+    finally:
+        other.close()
+        api.close(client)
+
+
+def test_sync_calls_reuse_client_session(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """Sync calls keep the client's session open for the next call."""
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"}, repeat=True)
+    client = api.Client()
+    assert list(api.get_game_info(1, client=client)) == [{"foo": "bar"}]
+    session = client._session  # noqa: SLF001
+    assert list(api.get_game_info(2, client=client)) == [{"foo": "bar"}]
+    assert client._session is session  # noqa: SLF001
+    assert not client.closed
+    api.close(client)
+    assert client.closed
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_close_unopened_client() -> None:
+    """Closing a client that never opened a session is a no-op."""
+    client = api.Client()
+    await client.close()
+    assert client.closed
+
+
+def test_get_game_info_limits_requests_in_flight(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """No more than `concurrency` requests are in flight at once."""
+    in_flight, peak = 0, 0
+
+    async def callback(url: Any, **_: Any) -> CallbackResult:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return CallbackResult(payload={"id": int(str(url).split("/")[-2])})
+
+    mock_aioresponse.get(ep_match_game, callback=callback, repeat=True)
+    game_ids = list(range(10))
+    game_info = list(api.get_game_info(game_ids, concurrency=3))
+    assert peak == 3
+    assert [g["id"] for g in game_info] == game_ids
+
+
+def test_get_game_info_limits_request_rate(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """Requests to a host are spaced out to the requested rate."""
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"}, repeat=True)
+    start = time.monotonic()
+    game_info = list(api.get_game_info(list(range(5)), rate=50.0))
+    assert time.monotonic() - start >= 4 / 50
+    assert len(game_info) == 5
+
+
+@pytest.mark.parametrize(
+    ("concurrency", "rate"),
+    [(0, None), (1, 0.0), (1, -1.0)],
+)
+def test_get_game_info_with_bad_scheduling_raises(
+    concurrency: int, rate: Optional[float]
+) -> None:
+    """Invalid concurrency or rate limits raise ValueError."""
+    with pytest.raises(ValueError, match="must be"):
+        api.get_game_info(1, concurrency=concurrency, rate=rate)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_token_bucket_refills_up_to_burst() -> None:
+    """Tokens refill over time without exceeding the burst size."""
+    bucket = api._TokenBucket(rate=1000.0, burst=2.0)  # noqa: SLF001
+    await asyncio.sleep(0.01)
+    await bucket.acquire()
+    await bucket.acquire()
+    assert bucket._tokens < 1  # noqa: SLF001
+
+
+@pytest.fixture
+def fast_retry_client() -> Generator[api.Client, None, None]:
+    """Client retrying without delays."""
+    client = api.Client(retry=api.RetryPolicy(max_attempts=3, backoff=0))
+    yield client
+    api.close(client)
+
+
+def test_get_game_info_retries_transient_errors(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    fast_retry_client: api.Client,
+) -> None:
+    """Retryable statuses and connection errors are retried."""
+    mock_aioresponse.get(ep_match_game, status=503, headers={"Retry-After": "0"})
+    mock_aioresponse.get(ep_match_game, exception=aiohttp.ClientConnectionError())
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"})
+    game_info = list(api.get_game_info(1, client=fast_retry_client))
+    assert game_info == [{"foo": "bar"}]
+
+
+def test_fetch_game_info_reports_failures(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    fast_retry_client: api.Client,
+) -> None:
+    """Each game gets a result, and failures record status and attempts."""
+    mock_aioresponse.get(f"{api.URL}/gamecenter/1/landing", payload={"id": 1})
+    mock_aioresponse.get(f"{api.URL}/gamecenter/2/landing", status=404)
+    mock_aioresponse.get(ep_match_game, status=429, repeat=True)
+    results = api.fetch_game_info([1, 2, 3], client=fast_retry_client)
+    assert list(results) == [1, 2, 3]
+    assert results[1].ok
+    assert results[1].data == {"id": 1}
+    assert (results[2].ok, results[2].status, results[2].attempts) == (False, 404, 1)
+    assert (results[3].ok, results[3].status, results[3].attempts) == (False, 429, 3)
+    assert results[3].error == "HTTP 429"
+    assert [g for g, r in results.items() if not r.ok] == [2, 3]
+
+
+def test_retries_are_rate_limited(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    fast_retry_client: api.Client,
+) -> None:
+    """Every attempt at a request waits for its turn within the rate."""
+    mock_aioresponse.get(ep_match_game, status=503)
+    mock_aioresponse.get(ep_match_game, status=503)
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"})
+    start = time.monotonic()
+    result = api.fetch_game_info([1], fast_retry_client, rate=20.0)[1]
+    assert time.monotonic() - start >= 2 / 20
+    assert (result.ok, result.attempts) == (True, 3)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_backoff_gives_up_request_slot(
+    mock_aioresponse: aioresponses, ep_match_game: re.Pattern[AnyStr]
+) -> None:
+    """Requests backing off before a retry let others take their place."""
+    requested = []
+
+    async def callback(url: Any, **_: Any) -> CallbackResult:
+        game_id = int(str(url).split("/")[-2])
+        requested.append(game_id)
+        if requested == [1]:
+            return CallbackResult(status=503, headers={"Retry-After": "0.05"})
+        return CallbackResult(payload={"id": game_id})
+
+    mock_aioresponse.get(ep_match_game, callback=callback, repeat=True)
+    limits = api.RequestLimits(concurrency=1)
+    async with api.Client() as client:
+        first = asyncio.ensure_future(api.aget_game_info(1, client, limits=limits))
+        await asyncio.sleep(0.01)
+        second = await api.aget_game_info(2, client, limits=limits)
+        assert second == [{"id": 2}]
+        assert await first == [{"id": 1}]
+    assert requested == [1, 2, 1]
+
+
+def test_fetch_game_info_does_not_retry_bad_bodies(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    fast_retry_client: api.Client,
+) -> None:
+    """Bodies that fail to decode are reported without being fetched again."""
+    mock_aioresponse.get(ep_match_game, body=b"{", repeat=True)
+    result = api.fetch_game_info([1], client=fast_retry_client)[1]
+    assert (result.ok, result.status, result.attempts) == (False, 200, 1)
+    assert str(result.error).startswith("JSONDecodeError")
+    assert len(mock_aioresponse.requests[("GET", URL(api.game_url(1)))]) == 1
+
+
+@pytest.mark.parametrize(
+    ("retry", "attempt", "retry_after", "expected"),
+    [
+        (api.RetryPolicy(backoff=1, jitter=False), 1, None, 1),
+        (api.RetryPolicy(backoff=1, jitter=False), 3, None, 4),
+        (api.RetryPolicy(backoff=1, max_backoff=5, jitter=False), 10, None, 5),
+        (api.RetryPolicy(max_backoff=5), 1, 2.0, 2),
+        (api.RetryPolicy(max_backoff=5), 1, 60.0, 5),
+        (api.RetryPolicy(), 1, -3.0, 0),
+    ],
+)
+def test_retry_policy_delay(
+    retry: api.RetryPolicy,
+    attempt: int,
+    retry_after: Optional[float],
+    expected: float,
+) -> None:
+    """Delays back off exponentially, honoring Retry-After within bounds."""
+    assert retry.delay(attempt, retry_after) == expected
+
+
+def test_retry_policy_delay_with_jitter() -> None:
+    """Jittered delays stay within the exponential backoff."""
+    retry = api.RetryPolicy(backoff=1)
+    assert all(0 <= retry.delay(3) <= 4 for _ in range(100))
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, None), ("120", 120.0), ("not a date", None)],
+)
+def test_parse_retry_after(value: Optional[str], expected: Optional[float]) -> None:
+    """Retry-After is parsed from seconds, ignoring garbage."""
+    assert api._parse_retry_after(value) == expected  # noqa: SLF001
+
+
+def test_parse_retry_after_http_date() -> None:
+    """Retry-After is parsed from an HTTP date relative to now."""
+    retry_after = api._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")  # noqa: SLF001
+    assert retry_after is not None
+    assert retry_after < 0
+
+
+@pytest.fixture
+def cached_client() -> Generator[api.Client, None, None]:
+    """Client with an in-memory response cache."""
+    with ResponseCache(":memory:", schedule_ttl=60) as cache:
+        client = api.Client(cache=cache)
+        yield client
+        api.close(client)
+
+
+def test_finished_games_are_served_from_cache(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    cached_client: api.Client,
+) -> None:
+    """Finished games are only requested once."""
+    mock_aioresponse.get(ep_match_game, payload={"id": 1, "gameState": "OFF"})
+    first = api.fetch_game_info([1], client=cached_client)[1]
+    second = api.fetch_game_info([1], client=cached_client)[1]
+    assert not first.cached
+    assert second.cached
+    assert second.data == first.data
+
+
+def test_live_games_are_not_cached(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    cached_client: api.Client,
+) -> None:
+    """Games that are not finished are requested every time."""
+    mock_aioresponse.get(ep_match_game, payload={"id": 1, "gameState": "LIVE"})
+    mock_aioresponse.get(ep_match_game, payload={"id": 1, "gameState": "OFF"})
+    assert api.fetch_game_info([1], client=cached_client)[1].data["gameState"] == "LIVE"
+    assert api.fetch_game_info([1], client=cached_client)[1].data["gameState"] == "OFF"
+
+
+@pytest.mark.parametrize(
+    ("url", "data", "expected"),
+    [
+        ("/gamecenter/1/landing", {"gameState": "FINAL"}, math.inf),
+        ("/gamecenter/1/landing", {"gameState": "FUT"}, None),
+        ("/gamecenter/1/landing", ["not", "a", "dict"], None),
+        (
+            "/schedule/2024-01-01",
+            {"gameWeek": [{"games": [{"gameState": "OFF"}]}]},
+            math.inf,
+        ),
+        ("/schedule/2024-01-01", {"gameWeek": [{"games": [{"gameState": "FUT"}]}]}, 60),
+        ("/schedule/2024-07-01", {"gameWeek": [{"games": []}]}, 60),
+        ("/schedule/now", {"gameWeek": [{"games": [{"gameState": "OFF"}]}]}, 60),
+    ],
+)
+def test_cache_ttl(url: str, data: Any, expected: Optional[float]) -> None:
+    """Only finished games and weeks are cached forever; live games not at all."""
+    assert api._cache_ttl(url, data, 60) == expected  # noqa: SLF001
+
+
+def test_schedule_weeks_are_cached_with_ttl(
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    schedule_data: dict[str, Any],
+    cached_client: api.Client,
+) -> None:
+    """Schedule weeks are served from cache until their ttl passes."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data)
+    first = list(api.get_weekly_schedules("2024-01-25", client=cached_client))
+    second = list(api.get_weekly_schedules("2024-01-25", client=cached_client))
+    assert first == second == [schedule_data]
+
+
+def test_stale_entries_are_revalidated(
+    mock_aioresponse: aioresponses,
+    cached_client: api.Client,
+) -> None:
+    """Stale entries are requested conditionally, and 304 reuses the cached body."""
+    url = f"{api.URL}/schedule/now"
+    validators = {"ETag": '"v1"', "Last-Modified": "Thu, 25 Jan 2024 00:00:00 GMT"}
+    mock_aioresponse.get(url, payload={"gameWeek": []}, headers=validators)
+    mock_aioresponse.get(url, status=304)
+    cache = cached_client.cache
+    assert cache is not None
+
+    run, fetch = api.run_sync, api._fetch_endpoints_async  # noqa: SLF001
+    first = run(fetch([url], cached_client))
+    cache.touch(url, ttl=-1)
+    second = run(fetch([url], cached_client))
+    assert first[0].data == second[0].data == {"gameWeek": []}
+    assert (second[0].status, second[0].cached) == (304, True)
+    request = mock_aioresponse.requests[("GET", URL(url))][1]
+    assert request.kwargs["headers"] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Thu, 25 Jan 2024 00:00:00 GMT",
+    }
+    entry = cache.get(url)
+    assert entry is not None
+    assert entry.fresh
+
+
+def test_live_games_with_validators_are_revalidated(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    cached_client: api.Client,
+) -> None:
+    """Live games are never served from cache, but 304 still avoids the body."""
+    live = {"id": 1, "gameState": "LIVE"}
+    mock_aioresponse.get(ep_match_game, payload=live, headers={"ETag": '"v1"'})
+    mock_aioresponse.get(ep_match_game, status=304)
+    first = api.fetch_game_info([1], client=cached_client)[1]
+    second = api.fetch_game_info([1], client=cached_client)[1]
+    assert first.data == second.data == live
+    assert (first.cached, second.cached) == (False, True)
+    cache = cached_client.cache
+    assert cache is not None
+    entry = cache.get(api.game_url(1))
+    assert entry is not None
+    assert not entry.fresh
+
+
+@pytest.fixture
+def slow_first_game(
+    mock_aioresponse: aioresponses, ep_match_game: re.Pattern[AnyStr]
+) -> None:
+    """Mock game responses where game 0 takes longer than the others."""
+
+    async def callback(url: Any, **_: Any) -> CallbackResult:
+        game_id = int(str(url).split("/")[-2])
+        await asyncio.sleep(0.05 if game_id == 0 else 0)
+        return CallbackResult(payload={"id": game_id})
+
+    mock_aioresponse.get(ep_match_game, callback=callback, repeat=True)
+
+
+@pytest.mark.usefixtures("slow_first_game")
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_game_info_yields_games_as_they_complete() -> None:
+    """Games are yielded as soon as they arrive, not in request order."""
+    async with api.Client() as client:
+        games = [g["id"] async for g in api.aiter_game_info(range(4), client)]
+    assert games[-1] == 0
+    assert sorted(games) == [0, 1, 2, 3]
+
+
+@pytest.mark.usefixtures("slow_first_game")
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_game_info_ordered() -> None:
+    """Games can be yielded in request order instead."""
+    async with api.Client() as client:
+        games = api.aiter_game_info(range(4), client, ordered=True)
+        assert [g["id"] async for g in games] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_game_info_ordered_holds_back_requests(
+    mock_aioresponse: aioresponses, ep_match_game: re.Pattern[AnyStr]
+) -> None:
+    """Results held behind a slow one keep later requests from starting."""
+    started = 0
+
+    async def callback(url: Any, **_: Any) -> CallbackResult:
+        nonlocal started
+        started += 1
+        game_id = int(str(url).split("/")[-2])
+        await asyncio.sleep(0.05 if game_id == 0 else 0)
+        return CallbackResult(payload={"id": game_id})
+
+    mock_aioresponse.get(ep_match_game, callback=callback, repeat=True)
+    async with api.Client() as client:
+        games = api.aiter_game_info(range(100), client, 5, ordered=True)
+        assert (await games.__anext__())["id"] == 0
+        assert started == 5
+        assert [g["id"] async for g in games] == list(range(1, 100))
+    assert started == 100
+
+
+@pytest.mark.usefixtures("slow_first_game")
+def test_iter_game_info_streams_from_sync_code(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """The sync iterator yields every game and skips failures."""
+    client = api.Client(retry=api.RetryPolicy(max_attempts=1))
+    games = api.iter_game_info([1, 2, 0, "bad"], client, concurrency=2)  # type: ignore
+    assert sorted(g["id"] for g in games) == [0, 1, 2]
+    assert "Failed to get" in caplog.text
+    api.close(client)
+
+
+def test_iter_game_info_abandoned_early_cancels_requests(
+    mock_aioresponse: aioresponses, ep_match_game: re.Pattern[AnyStr]
+) -> None:
+    """Stopping iteration early cancels the requests still in flight."""
+    cancelled = 0
+
+    async def callback(url: Any, **_: Any) -> CallbackResult:
+        nonlocal cancelled
+        game_id = int(str(url).split("/")[-2])
+        try:
+            await asyncio.sleep(0 if game_id == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return CallbackResult(payload={"id": game_id})
+
+    mock_aioresponse.get(ep_match_game, callback=callback, repeat=True)
+    games = api.iter_game_info(range(100), concurrency=5)
+    assert next(games)["id"] == 0
+    games.close()  # type: ignore[attr-defined]
+    assert cancelled == 4
+
+
+@pytest.mark.parametrize(
+    ("held", "next_index", "ordered", "expected"),
+    [
+        ({2: None, 0: None}, 0, False, [2, 0]),
+        ({2: None, 0: None}, 0, True, [0]),
+        ({2: None, 1: None}, 1, True, [1, 2]),
+        ({2: None}, 0, True, []),
+    ],
+)
+def test_ready(
+    held: dict[int, Any], next_index: int, ordered: bool, expected: list[int]
+) -> None:
+    """Held results are released in completion order, or contiguously in order."""
+    assert api._ready(held, next_index, ordered) == expected  # noqa: SLF001
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_get_game_info_from_running_loop(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """Sync calls work while the calling thread runs its own event loop."""
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"}, repeat=True)
+    assert list(api.get_game_info([1, 2])) == [{"foo": "bar"}] * 2
+    assert list(api.get_game_info([3])) == [{"foo": "bar"}]
+
+
+def test_run_async_from_background_loop_raises() -> None:
+    """Waiting on the background loop from one of its own coroutines fails."""
+
+    async def nested() -> None:
+        await asyncio.sleep(0)
+        api.run_sync(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError, match="from itself"):
+        api.run_sync(nested())
+
+
+def test_loop_thread_stops_and_restarts() -> None:
+    """The background loop can be stopped, and starts again when needed."""
+    background = api._LoopThread()  # noqa: SLF001
+    background.stop()
+    loop = background.loop()
+    assert background.run(asyncio.sleep(0, result="done")) == "done"
+    background.stop()
+    assert loop.is_closed()
+    assert background.run(asyncio.sleep(0, result="again")) == "again"
+    background.stop()
+
+
+def test_shutdown_closes_shared_client(
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[AnyStr],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Shutdown closes the shared client and stops the background loop."""
+    monkeypatch.setattr(api, "_background", api._LoopThread())  # noqa: SLF001
+    monkeypatch.setattr(api, "_client", None)
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"})
+    assert list(api.get_game_info(1)) == [{"foo": "bar"}]
+    client = api.get_client()
+    assert not client.closed
+    api._shutdown()  # noqa: SLF001
+    assert client.closed
+
+
+def test_after_fork_in_child_resets_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A forked child starts with a fresh shared client and background loop."""
+    background = api._LoopThread()  # noqa: SLF001
+    monkeypatch.setattr(api, "_background", background)
+    monkeypatch.setattr(api, "_client", None)
+    loop, thread = background.loop(), background._thread  # noqa: SLF001
+    shared = api.get_client()
+    api._after_fork_in_child()  # noqa: SLF001
+    assert api.get_client() is not shared
+    assert background._loop is None  # noqa: SLF001
+    loop.call_soon_threadsafe(loop.stop)
+    assert thread is not None
+    thread.join()
+    loop.close()
+
+
+def test_close_without_shared_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Closing before the shared client exists is a no-op."""
+    monkeypatch.setattr(api, "_client", None)
+    api.close()
+    assert api._client is None  # noqa: SLF001
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aget_functions_run_on_callers_loop(
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    ep_match_game: re.Pattern[AnyStr],
+    schedule_data: dict[str, Any],
+) -> None:
+    """Async functions make requests on the running loop with a temporary client."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload={"foo": "bar"}, repeat=True)
+    schedules, game_info, results = await asyncio.gather(
+        api.aget_weekly_schedules("2024-01-01", "2024-01-14"),
+        api.aget_game_info(1),
+        api.afetch_game_info([1, 2]),
+    )
+    assert schedules == [schedule_data, schedule_data]
+    assert game_info == [{"foo": "bar"}]
+    assert all(r.ok for r in results.values())
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_use_client() -> None:
+    """Given clients are used as is, otherwise a temporary one is closed on exit."""
+    async with api.Client() as given:
+        given.session()
+        async with api.use_client(given) as client:
+            assert client is given
+        assert not given.closed
+
+    async with api.use_client() as client:
+        assert client is not api.get_client()
+        client.session()
+    assert client.closed
+
+
+def test_use_client_on_background_loop_gets_shared_client() -> None:
+    """On the library's loop, the shared client is used."""
+
+    async def get() -> api.Client:
+        async with api.use_client() as client:
+            return client
+
+    assert api.run_sync(get()) is api.get_client()
+
+
+@pytest.mark.usefixtures("slow_first_game")
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_game_info_from_async_ids() -> None:
+    """Game ids can arrive from an async iterable while games are being fetched."""
+
+    async def game_ids() -> AsyncIterator[int]:
+        for game_id in range(4):
+            await asyncio.sleep(0.01)
+            yield game_id
+
+    async with api.Client() as client:
+        games = api.aiter_game_info(game_ids(), client, ordered=True)
+        assert [g["id"] async for g in games] == [0, 1, 2, 3]
+
+
+@pytest.mark.usefixtures("slow_first_game")
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_game_info_closed_while_waiting_for_ids() -> None:
+    """Closing early cancels the wait for the next id."""
+
+    async def game_ids() -> AsyncIterator[int]:
+        yield 1
+        await asyncio.sleep(10)
+        yield 2  # pragma: no cover
+
+    async with api.Client() as client:
+        games = api.aiter_game_info(game_ids(), client)
+        assert (await games.__anext__())["id"] == 1
+        await asyncio.wait_for(games.aclose(), 1)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_request_limits_are_shared(
+    mock_aioresponse: aioresponses, ep_match_game: re.Pattern[AnyStr]
+) -> None:
+    """Calls sharing limits stay within them together."""
+    in_flight, peak = 0, 0
+
+    async def callback(*_: Any, **__: Any) -> CallbackResult:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return CallbackResult(payload={})
+
+    mock_aioresponse.get(ep_match_game, callback=callback, repeat=True)
+    limits = api.RequestLimits(concurrency=3)
+    async with api.Client() as client:
+        await asyncio.gather(
+            api.aget_game_info(range(5), client, limits=limits),
+            api.aget_game_info(range(5, 10), client, limits=limits),
+        )
+    assert peak == 3
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_weekly_schedules_in_date_order(
+    mock_aioresponse: aioresponses, ep_match_schedule: re.Pattern[AnyStr]
+) -> None:
+    """Weeks are yielded in date order even when later ones arrive first."""
+
+    async def callback(url: Any, **_: Any) -> CallbackResult:
+        start = str(url).split("/")[-1]
+        await asyncio.sleep(0.05 if start == "2024-01-01" else 0)
+        return CallbackResult(payload={"start": start})
+
+    mock_aioresponse.get(ep_match_schedule, callback=callback, repeat=True)
+    async with api.Client() as client:
+        weeks = api.aiter_weekly_schedules("2024-01-01", "2024-01-20", client)
+        assert [w["start"] async for w in weeks] == [
+            "2024-01-01",
+            "2024-01-08",
+            "2024-01-15",
+        ]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_game_info_with_decoder(
+    mock_aioresponse: aioresponses, ep_match_game: re.Pattern[AnyStr]
+) -> None:
+    """Payloads are decoded with the given decoder."""
+    mock_aioresponse.get(ep_match_game, body=b"1234", repeat=True)
+    async with api.Client() as client:
+        games = api.aiter_game_info([1, 2], client, decoder=lambda b: {"n": len(b)})
+        assert [g async for g in games] == [{"n": 4}, {"n": 4}]
+
+
+@pytest.fixture
+def counted_games(
+    mock_aioresponse: aioresponses, ep_match_game: re.Pattern[AnyStr]
+) -> dict[int, int]:
+    """Mock slow game responses, counting the requests for each game."""
+    requests: dict[int, int] = {}
+
+    async def callback(url: Any, **_: Any) -> CallbackResult:
+        game_id = int(str(url).split("/")[-2])
+        requests[game_id] = requests.get(game_id, 0) + 1
+        await asyncio.sleep(0.02)
+        return CallbackResult(payload={"id": game_id})
+
+    mock_aioresponse.get(ep_match_game, callback=callback, repeat=True)
+    return requests
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_requests_for_same_url_are_shared(
+    counted_games: dict[int, int],
+) -> None:
+    """Overlapping calls share the requests they have in common."""
+    async with api.Client() as client:
+        first, second = await asyncio.gather(
+            api.afetch_game_info([1, 2, 3], client),
+            api.afetch_game_info([3, 2, 4, 4], client),
+        )
+        assert len(client._flights) == 0  # noqa: SLF001
+    assert counted_games == {1: 1, 2: 1, 3: 1, 4: 1}
+    assert first[3] is second[3]
+    assert second[4].data == {"id": 4}
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_completed_requests_are_not_shared(
+    counted_games: dict[int, int],
+) -> None:
+    """Requests are only shared while in flight."""
+    async with api.Client() as client:
+        await api.aget_game_info(1, client)
+        await api.aget_game_info(1, client)
+    assert counted_games == {1: 2}
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_shared_request_outlives_cancelled_caller(
+    counted_games: dict[int, int],
+) -> None:
+    """A shared request is only cancelled when all of its callers are."""
+    async with api.Client() as client:
+        cancelled = asyncio.ensure_future(api.aget_game_info(1, client))
+        kept = asyncio.ensure_future(api.aget_game_info(1, client))
+        await asyncio.sleep(0.005)
+        cancelled.cancel()
+        assert await kept == [{"id": 1}]
+        assert cancelled.cancelled()
+
+        abandoned = asyncio.ensure_future(api.aget_game_info(2, client))
+        await asyncio.sleep(0.005)
+        abandoned.cancel()
+        await asyncio.gather(abandoned, return_exceptions=True)
+        assert len(client._flights) == 0  # noqa: SLF001
+    assert counted_games == {1: 1, 2: 1}
@@ -0,0 +1,94 @@
+"""Unit tests for the yohonhl.cache module."""
+
+import math
+import sqlite3
+import zlib
+from pathlib import Path
+
+from yohonhl.cache import CacheEntry
+from yohonhl.cache import ResponseCache
+
+
+def test_put_and_get_round_trip(tmp_path: Path) -> None:
+    """Stored bodies are returned unchanged, creating the database directory."""
+    path = tmp_path / "nested" / "cache.db"
+    with ResponseCache(path) as cache:
+        cache.put("https://example.com/a", b'{"foo": "bar"}')
+        entry = cache.get("https://example.com/a")
+        assert entry is not None
+        assert entry.body == b'{"foo": "bar"}'
+        assert entry.expires is None
+        assert entry.fresh
+        assert cache.get("https://example.com/b") is None
+    assert path.exists()
+
+
+def test_entries_persist_between_instances(tmp_path: Path) -> None:
+    """Entries are read back from disk by a new cache instance."""
+    path = tmp_path / "cache.db"
+    with ResponseCache(path) as cache:
+        cache.put("url", b"body")
+    with ResponseCache(path) as cache:
+        assert len(cache) == 1
+
+
+def test_bodies_are_stored_compressed() -> None:
+    """Bodies are compressed in the database."""
+    body = b'{"goals": []}' * 100
+    with ResponseCache(":memory:") as cache:
+        cache.put("url", body)
+        (stored,) = cache._db.execute("SELECT body FROM responses").fetchone()  # noqa: SLF001
+    assert len(stored) < len(body)
+    assert zlib.decompress(stored) == body
+
+
+def test_expired_entries_are_stale_and_purged() -> None:
+    """Entries past their ttl are not fresh and are removed by purge."""
+    with ResponseCache(":memory:") as cache:
+        cache.put("stale", b"body", ttl=-1)
+        cache.put("fresh", b"body", ttl=60)
+        cache.put("forever", b"body", ttl=math.inf)
+        stale = cache.get("stale")
+        assert stale is not None
+        assert not stale.fresh
+        assert cache.purge() == 1
+        assert len(cache) == 2
+
+
+def test_cache_entry_without_expiry_is_fresh() -> None:
+    """Entries with no expiry never go stale."""
+    assert CacheEntry(b"", 0.0, None).fresh
+
+
+def test_validators_are_stored_and_entries_touched() -> None:
+    """Validators are kept with the body, and touch renews the expiry."""
+    with ResponseCache(":memory:") as cache:
+        cache.put("url", b"body", ttl=-1, etag='"abc"', last_modified="yesterday")
+        entry = cache.get("url")
+        assert entry is not None
+        assert (entry.etag, entry.last_modified) == ('"abc"', "yesterday")
+        assert not entry.fresh
+        cache.touch("url", ttl=60)
+        entry = cache.get("url")
+        assert entry is not None
+        assert entry.fresh
+
+
+def test_schema_is_migrated(tmp_path: Path) -> None:
+    """Databases from before validators were stored gain the new columns."""
+    path = tmp_path / "cache.db"
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE responses "
+        "(url TEXT PRIMARY KEY, body BLOB NOT NULL, stored REAL NOT NULL, expires REAL)"
+    )
+    db.execute(
+        "INSERT INTO responses VALUES (?, ?, ?, ?)",
+        ("url", zlib.compress(b"x"), 0, None),
+    )
+    db.commit()
+    db.close()
+    with ResponseCache(path) as cache:
+        assert cache.get("url") == CacheEntry(b"x", 0, None, None, None)
+    with ResponseCache(path) as cache:
+        assert len(cache) == 1
@@ -0,0 +1,71 @@
+"""Unit tests for the yohonhl.decode module."""
+
+import json
+import sys
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from yohonhl import decode
+from yohonhl import stats
+
+
+def test_loads(game_data: dict[str, Any]) -> None:
+    """Whole documents are decoded."""
+    assert decode.loads(json.dumps(game_data).encode()) == game_data
+
+
+def test_game_goals_decodes_only_what_goals_need(
+    game_data: dict[str, Any], goals: list[stats.Goal]
+) -> None:
+    """Only the keys goals are parsed from are decoded, giving the same goals."""
+    pytest.importorskip("msgspec")
+    info = decode.game_goals(json.dumps(game_data).encode())
+    assert set(info) == set(decode.GameGoals.__annotations__)
+    assert set(info["summary"]) == {"scoring"}
+    assert stats.parse_goals(info) == goals
+
+
+def test_game_goals_without_summary(game_data: dict[str, Any]) -> None:
+    """Games that have not started have no summary."""
+    del game_data["summary"]
+    assert "summary" not in decode.game_goals(json.dumps(game_data).encode())
+
+
+def test_game_goals_with_bad_body_raises() -> None:
+    """Malformed bodies raise ValueError."""
+    with pytest.raises(ValueError, match=r"."):
+        decode.game_goals(b"{")
+
+
+def test_game_goals_with_unexpected_payload_raises() -> None:
+    """Payloads not shaped like `GameGoals` raise ValueError, with msgspec."""
+    pytest.importorskip("msgspec")
+    with pytest.raises(ValueError, match="id"):
+        decode.game_goals(b'{"id": "not an int"}')
+
+
+@pytest.fixture
+def stdlib_decode(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Decode as if orjson and msgspec were not installed."""
+    backends = (decode._json_decoder, decode._game_goals_decoder)  # noqa: SLF001
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+    for backend in backends:
+        backend.cache_clear()
+    yield
+    for backend in backends:
+        backend.cache_clear()
+
+
+@pytest.mark.usefixtures("stdlib_decode")
+def test_stdlib_fallback(game_data: dict[str, Any], goals: list[stats.Goal]) -> None:
+    """Without the "fast" extra, whole documents are decoded with json."""
+    assert decode._json_decoder() is json.loads  # noqa: SLF001
+    assert decode._game_goals_decoder() is json.loads  # noqa: SLF001
+    info = decode.game_goals(json.dumps(game_data).encode())
+    assert info == game_data
+    assert stats.parse_goals(info) == goals
+    with pytest.raises(ValueError, match=r"."):
+        decode.game_goals(b"{")
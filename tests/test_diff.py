@@ -0,0 +1,36 @@
+"""Unit tests for the yohonhl.diff module."""
+
+import dataclasses
+
+from yohonhl import stats
+from yohonhl.diff import DELETE
+from yohonhl.diff import INSERT
+from yohonhl.diff import UPDATE
+from yohonhl.diff import GoalDiff
+from yohonhl.diff import GoalEvent
+
+
+def test_update_inserts_new_goals(goals: list[stats.Goal]) -> None:
+    """Goals not known before are inserted, and known ones give no events."""
+    diff = GoalDiff(goals[:1])
+    assert diff.update(goals[:3]) == [GoalEvent(INSERT, g) for g in goals[1:3]]
+    assert diff.update(goals[:3]) == []
+    assert GoalDiff().update([]) == []
+
+
+def test_update_updates_corrected_goals(goals: list[stats.Goal]) -> None:
+    """A change of scorer or strength updates the goal, keeping its identity."""
+    diff = GoalDiff(goals)
+    corrected = dataclasses.replace(goals[1], player_name="X", strength="pp")
+    events = diff.update([goals[0], corrected, *goals[2:]])
+    assert events == [GoalEvent(UPDATE, corrected, goals[1])]
+    assert list(diff.goals.values()) == [goals[0], corrected, *goals[2:]]
+
+
+def test_update_deletes_rescinded_goals(goals: list[stats.Goal]) -> None:
+    """Goals no longer in the game are deleted after other changes."""
+    diff = GoalDiff(goals[:2])
+    assert diff.update(goals[1:3]) == [
+        GoalEvent(INSERT, goals[2]),
+        GoalEvent(DELETE, goals[0]),
+    ]
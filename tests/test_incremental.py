@@ -0,0 +1,87 @@
+"""Unit tests for the yohonhl.incremental module."""
+
+import dataclasses
+import io
+from pathlib import Path
+
+import pytest
+
+from yohonhl import stats
+from yohonhl.incremental import Changes
+from yohonhl.incremental import GoalFile
+
+Games = list[tuple[int, list[stats.Goal]]]
+
+
+@pytest.fixture
+def games(goals: list[stats.Goal]) -> Games:
+    """Three games with the goals of the sample game."""
+    return [
+        (game_id, [dataclasses.replace(g, game_id=game_id) for g in goals])
+        for game_id in (1, 2, 3)
+    ]
+
+
+def written(games: Games, fmt: str = "csv") -> str:
+    """Get the contents of a file of `games` written in one go."""
+    f = io.StringIO()
+    goals = [g for _, goals in games for g in goals]
+    if fmt == "csv":
+        stats.write_csv(goals, f)
+    else:
+        stats.write_jsonl(goals, f)
+    return f.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_update_writes_games_once(games: Games, tmp_path: Path, fmt: str) -> None:
+    """Games already in the file are skipped, and new ones with goals appended."""
+    path = tmp_path / f"goals.{fmt}"
+    assert GoalFile(path, fmt).update([*games[:2], (4, [])]) == Changes(2, 0, 0)
+    assert GoalFile(path, fmt).update(games[1:]) == Changes(1, 0, 1)
+    assert path.read_text() == written(games, fmt)
+    assert Path(f"{path}.index").exists()
+
+
+def test_update_replaces_changed_games(games: Games, tmp_path: Path) -> None:
+    """Games whose goals changed are rewritten in place, and emptied ones removed."""
+    path = tmp_path / "goals.csv"
+    GoalFile(path).update(games)
+    corrected = [dataclasses.replace(g, player_name="X") for g in games[0][1]]
+    changes = GoalFile(path).update([(1, corrected), (2, [])])
+    assert changes == Changes(0, 2, 0)
+    assert path.read_text() == written([(1, corrected), games[2]])
+    assert GoalFile(path).update(games[2:]) == Changes(0, 0, 1)
+
+
+def test_update_rebuilds_missing_index(games: Games, tmp_path: Path) -> None:
+    """Files written without an index are indexed, dropping repeated games."""
+    path = tmp_path / "goals.csv"
+    path.write_text(written(games) + written(games[:1]).split("\n", 1)[1])
+    assert GoalFile(path).update(games) == Changes(0, 0, 3)
+    assert path.read_text() == written([games[1], games[2], games[0]])
+
+
+def test_update_rebuilds_stale_index(games: Games, tmp_path: Path) -> None:
+    """Files changed since they were indexed are indexed again."""
+    path = tmp_path / "goals.jsonl"
+    GoalFile(path, "jsonl").update(games[:1])
+    path.write_text(written(games[1:], "jsonl"))
+    assert GoalFile(path, "jsonl").update(games) == Changes(1, 0, 2)
+    assert path.read_text() == written([*games[1:], games[0]], "jsonl")
+
+
+def test_update_removes_partly_written_row(games: Games, tmp_path: Path) -> None:
+    """A row left partly written by an interrupted update is removed."""
+    path = tmp_path / "goals.csv"
+    GoalFile(path).update(games[:1])
+    with path.open("a") as f:
+        f.write("20232024,2,2024-01-25,1,00:")
+    assert GoalFile(path).update(games) == Changes(2, 0, 1)
+    assert path.read_text() == written(games)
+
+
+def test_bad_format_raises(tmp_path: Path) -> None:
+    """Only CSV and JSON Lines files can be updated."""
+    with pytest.raises(ValueError, match="fmt"):
+        GoalFile(tmp_path / "goals.parquet", "parquet")
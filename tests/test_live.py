@@ -0,0 +1,236 @@
+"""Unit tests for the yohonhl.live module."""
+
+import dataclasses
+import re
+from collections.abc import Callable
+from collections.abc import Generator
+from copy import deepcopy
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from typing import Optional
+
+import pytest
+from aioresponses import CallbackResult
+from aioresponses import aioresponses
+
+from yohonhl import api
+from yohonhl import live
+from yohonhl import stats
+from yohonhl.diff import DELETE
+from yohonhl.diff import INSERT
+from yohonhl.diff import UPDATE
+
+START = datetime(2024, 1, 26, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    """Time that passes only when sleeping."""
+
+    def __init__(self) -> None:
+        self.now = START - timedelta(seconds=30)
+
+    async def sleep(self, seconds: float) -> None:
+        """Pass `seconds` of time."""
+        self.now += timedelta(seconds=seconds)
+
+
+class FakeGames:
+    """Games whose payloads change from one poll to the next."""
+
+    def __init__(self, clock: FakeClock, polls: dict[int, list[Any]]) -> None:
+        self.clock = clock
+        self.polls = polls
+        self.requests: list[tuple[int, float]] = []
+
+    def game(self, url: Any, **_: Any) -> CallbackResult:
+        """Respond with the next payload of the requested game, or an error status."""
+        game_id = int(str(url).split("/")[-2])
+        self.requests.append((game_id, (self.clock.now - START).total_seconds()))
+        polls = self.polls[game_id]
+        payload = polls.pop(0) if len(polls) > 1 else polls[0]
+        if isinstance(payload, int):
+            return CallbackResult(status=payload)
+        return CallbackResult(payload={**payload, "id": game_id})
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """Make live mode wait on a fake clock."""
+    fake = FakeClock()
+    monkeypatch.setattr(live, "_now", lambda: fake.now)
+    monkeypatch.setattr(live, "_sleep", fake.sleep)
+    return fake
+
+
+@pytest.fixture
+def client() -> Generator[api.Client, None, None]:
+    """Make a client that does not retry failed requests itself."""
+    client = api.Client(retry=api.RetryPolicy(max_attempts=1))
+    yield client
+    api.close(client)
+
+
+@pytest.fixture
+def poll(game_data: dict[str, Any]) -> Callable[..., dict[str, Any]]:
+    """Make payloads of the sample game in a given state, with some of its goals."""
+
+    def make_poll(
+        state: str,
+        goals: int = 0,
+        intermission: Optional[int] = None,
+    ) -> dict[str, Any]:
+        payload = deepcopy(game_data)
+        payload["gameState"] = state
+        payload["clock"] = {
+            "secondsRemaining": intermission or 600,
+            "running": intermission is None,
+            "inIntermission": intermission is not None,
+        }
+        left = goals
+        for period in payload["summary"]["scoring"]:
+            period["goals"], left = period["goals"][:left], left - len(period["goals"])
+            left = max(left, 0)
+        if state == "PRE":
+            del payload["summary"]
+        return payload
+
+    return make_poll
+
+
+@pytest.mark.parametrize(
+    ("state", "clock", "start", "delay"),
+    [
+        ("LIVE", {"inIntermission": False}, None, 10),
+        ("CRIT", {"inIntermission": True, "secondsRemaining": 900}, None, 900),
+        ("LIVE", {"inIntermission": True, "secondsRemaining": 0}, None, 10),
+        ("FUT", {}, "2024-01-26T00:00:00Z", 60),
+        ("PRE", {}, "2024-01-25T23:59:00Z", 10),
+        ("FUT", {}, "2024-01-27T00:00:00Z", 300),
+        ("FUT", {}, None, 300),
+        ("OFF", {}, None, None),
+        ("PPD", {}, "2024-01-27T00:00:00Z", None),
+    ],
+)
+def test_delay(
+    state: str, clock: dict[str, Any], start: Optional[str], delay: Optional[float]
+) -> None:
+    """Games are polled often in play, less in intermissions, and at their start."""
+    info: dict[str, Any] = {"gameState": state, "clock": clock}
+    if start is not None:
+        info["startTimeUTC"] = start
+    now = START - timedelta(seconds=60)
+    assert live._delay(info, now) == delay  # noqa: SLF001
+
+
+def test_watch_yields_new_goals(
+    clock: FakeClock,
+    client: api.Client,
+    poll: Callable[..., dict[str, Any]],
+    goals: list[stats.Goal],
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[str],
+) -> None:
+    """Goals are yielded once, polling only as often as games change."""
+    games = FakeGames(
+        clock,
+        {
+            1: [
+                poll("PRE"),
+                poll("LIVE", goals=1),
+                poll("LIVE", goals=2, intermission=1000),
+                poll("OFF", goals=99),
+            ],
+            2: [503, poll("LIVE", goals=99), poll("OFF", goals=99)],
+        },
+    )
+    mock_aioresponse.get(ep_match_game, callback=games.game, repeat=True)
+    watched = list(live.watch([1, 2], client))
+    for game_id in (1, 2):
+        assert [g for g in watched if g.game_id == game_id] == [
+            dataclasses.replace(g, game_id=game_id) for g in goals
+        ]
+    assert sorted(games.requests) == [
+        (1, -30),
+        (1, 0),
+        (1, 10),
+        (1, 1010),
+        (2, -30),
+        (2, -20),
+        (2, -10),
+    ]
+
+
+def test_watch_stops_polling_failing_games(
+    clock: FakeClock,
+    client: api.Client,
+    poll: Callable[..., dict[str, Any]],
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[str],
+) -> None:
+    """Games that are not found, or keep failing, are no longer followed."""
+    games = FakeGames(clock, {1: [404], 2: [503], 3: [503, poll("OFF")]})
+    mock_aioresponse.get(ep_match_game, callback=games.game, repeat=True)
+    assert list(live.watch([1, 2, 3], client)) == []
+    assert [t for g, t in games.requests if g == 1] == [-30]
+    assert [t for g, t in games.requests if g == 2] == [-30, -20, -10, 0, 10]
+    assert [t for g, t in games.requests if g == 3] == [-30, -20]
+    with pytest.raises(ValueError, match="interval must be positive"):
+        list(live.watch([1], client, interval=0))
+
+
+def test_watch_events_tells_corrections_apart(
+    clock: FakeClock,
+    poll: Callable[..., dict[str, Any]],
+    mock_aioresponse: aioresponses,
+    ep_match_game: re.Pattern[str],
+) -> None:
+    """Corrected goals are updated, and disallowed ones deleted."""
+
+    def corrected(state: str, goals: int) -> dict[str, Any]:
+        payload = poll(state, goals)
+        scoring = payload["summary"]["scoring"]
+        next(g for period in scoring for g in period["goals"])["name"]["default"] = "X"
+        return payload
+
+    polls = [poll("LIVE", goals=2), corrected("LIVE", 2), corrected("OFF", 1)]
+    games = FakeGames(clock, {1: polls, 2: deepcopy(polls)})
+    mock_aioresponse.get(ep_match_game, callback=games.game, repeat=True)
+    events = list(live.watch_events([1]))
+    assert list(live.watch([2])) == [
+        dataclasses.replace(e.goal, game_id=2) for e in events[:2]
+    ]
+    assert [e.kind for e in events] == [INSERT, INSERT, UPDATE, DELETE]
+    assert events[2].goal.player_name == "X"
+    assert events[2].previous == events[0].goal
+    assert events[3].goal == events[1].goal
+
+
+def test_watch_follows_todays_games(
+    week: Callable[..., dict[str, Any]],
+    game_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[str],
+    ep_match_game: re.Pattern[str],
+) -> None:
+    """Today's games that are not final are followed by default."""
+
+    def schedule(url: Any, **_: Any) -> CallbackResult:
+        return CallbackResult(payload=week(str(url).split("/")[-1], state="LIVE"))
+
+    def game(url: Any, **_: Any) -> CallbackResult:
+        return CallbackResult(payload={**game_data, "id": int(str(url).split("/")[-2])})
+
+    mock_aioresponse.get(ep_match_schedule, callback=schedule, repeat=True)
+    mock_aioresponse.get(ep_match_game, callback=game, repeat=True)
+    goals = list(live.watch())
+    assert goals
+    assert {g.game_id for g in goals} == {date.today().toordinal()}  # noqa: DTZ011
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_sleep() -> None:
+    """Waiting between polls sleeps on the running loop."""
+    await live._sleep(0)  # noqa: SLF001
@@ -1,6 +1,10 @@
 """Test cases for the __main__ module."""
 
+import json
 import re
+import subprocess
+import sys
+from pathlib import Path
 from typing import Any
 
 import pytest
@@ -9,6 +13,26 @@ from click.testing import CliRunner
 
 from yohonhl import __main__
 
+# Cumulative microseconds importing the CLI may take, per `python -X importtime`.
+IMPORT_TIME_BUDGET = 200_000
+
+# Modules only the commands that need them may import.
+LAZY_MODULES = (
+    "aiohttp",
+    "msgspec",
+    "numpy",
+    "orjson",
+    "pandas",
+    "pyarrow",
+    "sqlite3",
+    "yohonhl.cache",
+    "yohonhl.stats",
+    "yohonhl.transport",
+)
+
+# Imports timed, taking the fastest so that a busy machine doesn't fail the test.
+IMPORT_TIME_RUNS = 5
+
 
 @pytest.fixture
 def runner() -> CliRunner:
@@ -58,3 +82,216 @@ def test_verbose_goals_succeeds(
     result = runner.invoke(__main__.main, ["-v", "goals"])
     assert result.exit_code == 0
     assert result.output
+
+
+def test_goals_with_scheduling_options_succeeds(
+    runner: CliRunner,
+    ep_match_schedule: re.Pattern[str],
+    ep_match_game: re.Pattern[str],
+    schedule_data: dict[str, Any],
+    game_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+) -> None:
+    """Goals subcommand accepts concurrency and rate limits."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    result = runner.invoke(__main__.main, ["goals", "-c", "2", "--rate", "1000"])
+    assert result.exit_code == 0
+    assert result.output
+
+
+def test_goals_with_jobs_succeeds(
+    runner: CliRunner,
+    ep_match_schedule: re.Pattern[str],
+    ep_match_game: re.Pattern[str],
+    schedule_data: dict[str, Any],
+    game_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+) -> None:
+    """Goals subcommand parses goals in several processes, with the same output."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    serial = runner.invoke(__main__.main, ["goals"])
+    result = runner.invoke(__main__.main, ["goals", "--jobs", "2"])
+    assert result.exit_code == 0
+    assert result.output == serial.output
+
+
+def test_goals_with_bad_concurrency_fails(runner: CliRunner) -> None:
+    """Goals subcommand rejects a concurrency below one."""
+    result = runner.invoke(__main__.main, ["goals", "--concurrency", "0"])
+    assert result.exit_code != 0
+
+
+def test_goals_with_cache_succeeds(
+    runner: CliRunner,
+    ep_match_schedule: re.Pattern[str],
+    ep_match_game: re.Pattern[str],
+    schedule_data: dict[str, Any],
+    game_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    tmp_path: Path,
+) -> None:
+    """Goals subcommand caches finished games in the given file."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    cache = tmp_path / "cache.db"
+    result = runner.invoke(__main__.main, ["goals", "--cache", str(cache)])
+    assert result.exit_code == 0
+    assert result.output
+    assert cache.exists()
+
+
+@pytest.fixture
+def mock_goals(
+    ep_match_schedule: re.Pattern[str],
+    ep_match_game: re.Pattern[str],
+    schedule_data: dict[str, Any],
+    game_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+) -> None:
+    """Mock the endpoints the goals subcommand gets."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+
+
+@pytest.mark.usefixtures("mock_goals")
+def test_goals_as_jsonl_succeeds(runner: CliRunner) -> None:
+    """Goals subcommand writes one JSON object per goal."""
+    csv_lines = runner.invoke(__main__.main, ["goals"]).output.splitlines()
+    result = runner.invoke(__main__.main, ["goals", "--format", "jsonl"])
+    assert result.exit_code == 0
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert len(rows) == len(csv_lines) - 1
+    assert list(rows[0]) == csv_lines[0].split(",")
+
+
+@pytest.mark.usefixtures("mock_goals")
+def test_goals_as_arrow_succeeds(runner: CliRunner, tmp_path: Path) -> None:
+    """Goals subcommand writes an Arrow IPC file of typed columns."""
+    pa = pytest.importorskip("pyarrow")
+    output = tmp_path / "goals.arrow"
+    args = ["goals", "--format", "arrow", "-o", str(output)]
+    result = runner.invoke(__main__.main, args)
+    assert result.exit_code == 0
+    table = pa.ipc.open_file(output).read_all()
+    assert table.num_rows > 0
+    assert table.schema.field("game_date").type == pa.date32()
+
+
+@pytest.mark.usefixtures("mock_goals")
+def test_goals_as_parquet_succeeds(runner: CliRunner, tmp_path: Path) -> None:
+    """Goals subcommand writes a Parquet dataset partitioned by season.
+
+    Writing the same games again, with or without --append, replaces them.
+    """
+    pq = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "goals"
+    args = ["goals", "--format", "parquet", "-o", str(output)]
+    assert runner.invoke(__main__.main, args).exit_code == 0
+    assert [p.name for p in output.iterdir()] == ["season=20232024"]
+    rows = pq.read_table(output).num_rows
+    assert runner.invoke(__main__.main, args).exit_code == 0
+    assert runner.invoke(__main__.main, [*args, "--append"]).exit_code == 0
+    table = pq.read_table(output, filters=[("season", "=", 20232024)])
+    assert table.num_rows == rows
+
+
+@pytest.mark.usefixtures("mock_goals")
+def test_goals_append_writes_games_once(runner: CliRunner, tmp_path: Path) -> None:
+    """Goals subcommand only appends games not in the output file yet.
+
+    Every game is mocked with the same game info, so it is written only once.
+    """
+    output = tmp_path / "goals.csv"
+    args = ["goals", "-o", str(output), "--append"]
+    assert runner.invoke(__main__.main, args).exit_code == 0
+    contents = output.read_text()
+    assert runner.invoke(__main__.main, args).exit_code == 0
+    assert output.read_text() == contents
+    rows = runner.invoke(__main__.main, ["goals"]).output.splitlines()
+    assert contents.splitlines() == list(dict.fromkeys(rows))
+
+
+@pytest.mark.usefixtures("mock_goals")
+def test_ingest_and_query_succeed(runner: CliRunner, tmp_path: Path) -> None:
+    """Goals ingested into a database are queried without the API."""
+    db = tmp_path / "goals.db"
+    ingest = ["ingest", "--db", str(db), "-f", "2024-01-25", "-t", "2024-01-31"]
+    result = runner.invoke(__main__.main, ingest)
+    assert result.exit_code == 0
+    args = ["query", "--db", str(db), "--team", "det", "--strength", "SH"]
+    result = runner.invoke(
+        __main__.main, [*args, "-f", "2024-01-01", "-t", "2024-01-31"]
+    )
+    assert result.exit_code == 0
+    rows = result.output.splitlines()[1:]
+    assert rows
+    assert all(",DET,DET,PHI," in r and r.endswith(",sh") for r in rows)
+    result = runner.invoke(
+        __main__.main, ["query", "--db", str(db), "--format", "jsonl"]
+    )
+    assert len(result.output.splitlines()) > len(rows)
+
+
+@pytest.mark.usefixtures("mock_goals")
+def test_sync_succeeds(runner: CliRunner, tmp_path: Path) -> None:
+    """Sync subcommand stores games, and picks up after them the next time."""
+    db = tmp_path / "goals.db"
+    args = ["sync", "--db", str(db), "-f", "2024-01-25", "-t", "2024-01-31"]
+    assert runner.invoke(__main__.main, args).exit_code == 0
+    assert runner.invoke(__main__.main, args).exit_code == 0
+    result = runner.invoke(__main__.main, ["query", "--db", str(db)])
+    assert result.exit_code == 0
+
+
+@pytest.mark.usefixtures("mock_goals")
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_watch_succeeds(runner: CliRunner, fmt: str) -> None:
+    """Watch subcommand writes the goals of games until they are over."""
+    goals = runner.invoke(__main__.main, ["goals", "--format", fmt]).output
+    result = runner.invoke(__main__.main, ["watch", "2023020747", "--format", fmt])
+    assert result.exit_code == 0
+    assert result.output in goals
+    assert len(result.output.splitlines()) > 1
+
+
+def test_watch_with_no_interval_fails(runner: CliRunner) -> None:
+    """Watch subcommand rejects intervals that would poll games nonstop."""
+    result = runner.invoke(__main__.main, ["watch", "1", "--interval", "0"])
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["--format", "parquet"], ["--format", "arrow", "--append", "-o", "goals"]],
+)
+def test_goals_with_unsupported_output_fails(
+    runner: CliRunner, args: list[str]
+) -> None:
+    """Goals subcommand rejects outputs a format can't be written to."""
+    result = runner.invoke(__main__.main, ["goals", *args])
+    assert result.exit_code == 2
+
+
+def _import_timings() -> dict[str, int]:
+    """Get the cumulative microseconds taken to import each module of the CLI."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import yohonhl.__main__"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like "import time:  self [us] | cumulative | imported package".
+    timings = {}
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, module = line.split("|")
+        timings[module.strip()] = int(cumulative)
+    return timings
+
+
+def test_import_time() -> None:
+    """The CLI imports quickly, leaving heavy dependencies to its commands."""
+    runs = [_import_timings() for _ in range(IMPORT_TIME_RUNS)]
+    assert not [m for m in runs[0] if m.startswith(LAZY_MODULES)]
+    assert min(t["yohonhl.__main__"] for t in runs) < IMPORT_TIME_BUDGET
@@ -0,0 +1,239 @@
+"""Unit tests for the yohonhl.schedule module."""
+
+import re
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+
+import pytest
+from aioresponses import CallbackResult
+from aioresponses import aioresponses
+
+from yohonhl import api
+from yohonhl.schedule import ScheduledGame
+from yohonhl.schedule import ScheduleIndex
+from yohonhl.schedule import get_season_schedule
+
+TODAY = date(2024, 3, 1)
+
+Week = Callable[..., dict[str, Any]]
+
+
+def test_only_settled_days_are_covered(schedule_data: dict[str, Any]) -> None:
+    """Days are covered once over, and only if all their games are final."""
+    index = ScheduleIndex()
+    assert index.add_week(schedule_data, today=date(2024, 1, 27)) == 2
+    assert index.add_week(schedule_data, today=TODAY) == 1
+    assert index.intervals == [(date(2024, 1, 25), date(2024, 1, 27))]
+    assert len(index) == 3
+    assert index.covers(date(2024, 1, 26))
+    assert not index.covers(date(2024, 1, 28))
+    assert not index.covers(date(2024, 1, 24))
+
+
+def test_days_missing_from_week_are_covered_up_to_next_start(week: Week) -> None:
+    """Days without games are covered up to the next week's start."""
+    index = ScheduleIndex()
+    sparse = week("2024-01-01")
+    del sparse["gameWeek"][2:]
+    assert index.add_week(sparse, today=TODAY) == 7
+    assert list(index.games(date(2024, 1, 2), date(2024, 1, 3))) == [
+        (date(2024, 1, 2), sparse["gameWeek"][1]["games"]),
+        (date(2024, 1, 3), []),
+    ]
+
+
+def test_week_without_next_start_or_days(week: Week) -> None:
+    """Weeks are covered up to their last day if they have no next start."""
+    index = ScheduleIndex()
+    last = week("2024-06-10", days=3)
+    del last["nextStartDate"]
+    assert index.add_week(last, today=TODAY.replace(month=7)) == 3
+    assert index.add_week({"gameWeek": []}) == 0
+
+
+def test_intervals_are_merged(week: Week) -> None:
+    """Adjacent and overlapping intervals are merged into one."""
+    index = ScheduleIndex()
+    for start in ("2024-01-01", "2024-01-22", "2024-01-15", "2024-02-05"):
+        index.add_week(week(start), today=TODAY)
+    assert index.intervals == [
+        (date(2024, 1, 1), date(2024, 1, 7)),
+        (date(2024, 1, 15), date(2024, 1, 28)),
+        (date(2024, 2, 5), date(2024, 2, 11)),
+    ]
+    index.add_week(week("2024-01-04", days=14), today=TODAY)
+    assert index.intervals == [
+        (date(2024, 1, 1), date(2024, 1, 28)),
+        (date(2024, 2, 5), date(2024, 2, 11)),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("start", "end", "gaps"),
+    [
+        ("2024-01-01", "2024-01-07", []),
+        ("2024-01-05", "2024-01-20", [("2024-01-08", "2024-01-14")]),
+        (
+            "2023-12-30",
+            "2024-02-01",
+            [
+                ("2023-12-30", "2023-12-31"),
+                ("2024-01-08", "2024-01-14"),
+                ("2024-01-22", "2024-02-01"),
+            ],
+        ),
+    ],
+)
+def test_gaps(week: Week, start: str, end: str, gaps: list[tuple[str, str]]) -> None:
+    """Gaps are the uncovered parts of a range."""
+    index = ScheduleIndex()
+    index.add_week(week("2024-01-01"), today=TODAY)
+    index.add_week(week("2024-01-15"), today=TODAY)
+    assert index.gaps(api.parse_date(start), api.parse_date(end)) == [
+        (api.parse_date(s), api.parse_date(e)) for s, e in gaps
+    ]
+
+
+def test_plan_fetches_only_gaps(week: Week) -> None:
+    """Weeks are planned from the start of each gap until it is covered."""
+    index = ScheduleIndex()
+    index.add_week(week("2024-01-08", days=10), today=TODAY)
+    assert index.plan(date(2024, 1, 1), date(2024, 2, 1)) == [
+        "2024-01-01",
+        "2024-01-18",
+        "2024-01-25",
+        "2024-01-29",
+    ]
+    assert ScheduleIndex().plan(date(2024, 1, 1), date(2024, 1, 15)) == [
+        "2024-01-01",
+        "2024-01-08",
+        "2024-01-15",
+    ]
+
+
+def test_plan_covers_short_gaps_with_one_week(week: Week) -> None:
+    """Gaps a planned week reaches are not planned again."""
+    index = ScheduleIndex()
+    index.add_week(week("2024-01-03", days=2), today=TODAY)
+    index.add_week(week("2024-01-08", days=2), today=TODAY)
+    index.add_week(week("2024-01-13", days=1), today=TODAY)
+    assert index.gaps(date(2024, 1, 1), date(2024, 1, 14)) == [
+        (date(2024, 1, 1), date(2024, 1, 2)),
+        (date(2024, 1, 5), date(2024, 1, 7)),
+        (date(2024, 1, 10), date(2024, 1, 12)),
+        (date(2024, 1, 14), date(2024, 1, 14)),
+    ]
+    assert index.plan(date(2024, 1, 1), date(2024, 1, 14)) == [
+        "2024-01-01",
+        "2024-01-10",
+    ]
+    assert index.plan(date(2024, 1, 1), date(2024, 1, 12)) == [
+        "2024-01-01",
+        "2024-01-06",
+    ]
+
+
+def test_games_of_covered_days_in_range(week: Week) -> None:
+    """Games are only returned for covered days in the range, in date order."""
+    index = ScheduleIndex()
+    index.add_week(week("2024-01-15"), today=TODAY)
+    index.add_week(week("2024-01-01"), today=TODAY)
+    index.add_week(week("2024-02-01"), today=TODAY)
+    days = [d for d, _ in index.games(date(2024, 1, 6), date(2024, 1, 16))]
+    assert days == [
+        date(2024, 1, 6),
+        date(2024, 1, 7),
+        date(2024, 1, 15),
+        date(2024, 1, 16),
+    ]
+
+
+@pytest.fixture
+def season_weeks(
+    week: Week, mock_aioresponse: aioresponses, ep_match_schedule: re.Pattern[str]
+) -> list[str]:
+    """Mock schedule weeks of a short season, listing the weeks requested."""
+    requested = []
+
+    def callback(url: Any, **_: Any) -> CallbackResult:
+        start = str(url).split("/")[-1]
+        requested.append(start)
+        payload = week(start, state="FUT" if start > "2024-02" else "OFF")
+        payload.update(
+            preSeasonStartDate="2023-12-20",
+            regularSeasonStartDate="2024-01-01",
+            regularSeasonEndDate="2024-01-31",
+            playoffEndDate="2024-02-10",
+        )
+        if start == "2024-01-22":
+            # A game of another season, and one moved to a later week.
+            payload["gameWeek"][0]["games"][0]["season"] = 20222023
+            payload["gameWeek"][1]["games"][0]["id"] += 7
+        return CallbackResult(payload=payload)
+
+    mock_aioresponse.get(ep_match_schedule, callback=callback, repeat=True)
+    return requested
+
+
+def test_get_season_schedule(season_weeks: list[str]) -> None:
+    """The bounds of a season come from one week, then the rest are fetched."""
+    season = get_season_schedule(20232024)
+    assert season_weeks == [
+        "2024-01-15",
+        "2024-01-01",
+        "2024-01-08",
+        "2024-01-22",
+        "2024-01-29",
+        "2024-02-05",
+    ]
+    assert (season.start, season.regular_season_end, season.playoff_end) == (
+        date(2024, 1, 1),
+        date(2024, 1, 31),
+        date(2024, 2, 10),
+    )
+    assert len(season) == 41 - 2
+    assert [g.id for g in season] == sorted(g.id for g in season)
+    moved = season.by_id[date(2024, 1, 30).toordinal()]
+    assert moved.game_date == date(2024, 1, 30)
+    assert season.on(date(2024, 1, 23)) == ()
+    assert [g.game_date.day for g in season.between(date(2024, 2, 8), TODAY)] == [
+        8,
+        9,
+        10,
+    ]
+    assert season.on(date(2024, 2, 9))[0].game_state == "FUT"
+    assert season.games[0] == ScheduledGame(
+        id=date(2024, 1, 1).toordinal(),
+        season=20232024,
+        game_type=2,
+        game_date=date(2024, 1, 1),
+        start_time_utc="2024-01-01T00:00:00Z",
+        game_state="OFF",
+        home_team="DET",
+        away_team="PHI",
+        home_score=3,
+        away_score=1,
+    )
+
+
+def test_get_season_schedule_with_preseason(season_weeks: list[str]) -> None:
+    """The preseason can be included."""
+    season = get_season_schedule(20232024, preseason=True)
+    assert season_weeks[:3] == ["2024-01-15", "2023-12-20", "2023-12-27"]
+    assert season.games[0].game_date == date(2023, 12, 20)
+
+
+def test_get_season_schedule_with_bad_season() -> None:
+    """Seasons are two consecutive years."""
+    with pytest.raises(ValueError, match="consecutive years"):
+        get_season_schedule(20232025)
+
+
+def test_get_season_schedule_without_response(
+    mock_aioresponse: aioresponses, ep_match_schedule: re.Pattern[str]
+) -> None:
+    """An error is raised if the bounds of the season can't be found."""
+    mock_aioresponse.get(ep_match_schedule, status=404)
+    with pytest.raises(RuntimeError, match="season 20232024"):
+        get_season_schedule(20232024)
@@ -1,11 +1,27 @@
 """Unit tests for yohonhl.stats module."""
 
+import asyncio
+import dataclasses
+import io
+import json
+import pickle
 import re
+from collections.abc import Callable
+from dataclasses import FrozenInstanceError
+from datetime import date
+from datetime import time
+from pathlib import Path
 from typing import Any
 from typing import AnyStr
 
+import numpy as np
+import pandas as pd
+import pytest
+from aioresponses import CallbackResult
 from aioresponses import aioresponses
 
+from yohonhl import api
+from yohonhl import schedule
 from yohonhl import stats
 
 
@@ -31,6 +47,18 @@ def test_get_games_with_bad_dates(
     assert len(games) == 35
 
 
+def test_get_scheduled_games(
+    schedule_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[str],
+) -> None:
+    """Scheduled games between two dates have the days they are played on."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    games = stats.get_scheduled_games("2024-01-26", "2024-01-27")
+    assert {g.game_date for g in games} == {date(2024, 1, 26), date(2024, 1, 27)}
+    assert len(games) == 4 + 14
+
+
 def test_get_goals(
     game_data: dict[str, Any],
     game_data_without_scoring: dict[str, Any],
@@ -45,3 +73,307 @@ def test_get_goals(
     mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
     goals = list(stats.get_goals(start_date="2024-01-01"))
     assert len(goals) > 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aget_goals_for_date_ranges_concurrently(
+    game_data: dict[str, Any],
+    schedule_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """Goals for several date ranges are fetched concurrently on one loop."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    async with api.Client() as client:
+        january, february = await asyncio.gather(
+            stats.aget_goals("2024-01-22", "2024-01-28", client=client),
+            stats.aget_goals("2024-02-01", "2024-02-07", client=client),
+        )
+    assert (len(january), len(february)) == (87, 35 * 3)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_goals_stops_early(
+    game_data: dict[str, Any],
+    schedule_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """Iteration over goals can be stopped before all games are fetched."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    goals = stats.aiter_goals("2024-01-22", "2024-01-28")
+    first = await goals.__anext__()
+    await goals.aclose()
+    assert first.game_id == game_data["id"]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_goals_pipeline_requests_games_before_schedule_completes(
+    game_data: dict[str, Any],
+    schedule_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """Games of early weeks are requested while later weeks are still loading."""
+    events = []
+
+    async def schedule(url: Any, **_: Any) -> CallbackResult:
+        last_week = str(url).endswith("2024-01-29")
+        await asyncio.sleep(0.1 if last_week else 0)
+        events.append("last week" if last_week else "week")
+        return CallbackResult(payload=schedule_data)
+
+    async def game(*_: Any, **__: Any) -> CallbackResult:
+        events.append("game")
+        return CallbackResult(payload=game_data)
+
+    mock_aioresponse.get(ep_match_schedule, callback=schedule, repeat=True)
+    mock_aioresponse.get(ep_match_game, callback=game, repeat=True)
+    goals = await stats.aget_goals("2024-01-22", "2024-01-29")
+    assert events.index("game") < events.index("last week")
+    assert goals
+
+
+def test_get_games_with_index_fetches_only_uncovered_days(
+    week: Callable[..., dict[str, Any]],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[str],
+) -> None:
+    """Days covered by the index are served from it, and the rest fetched."""
+    requested = []
+
+    def callback(url: Any, **_: Any) -> CallbackResult:
+        start = str(url).split("/")[-1]
+        requested.append(start)
+        return CallbackResult(payload=week(start))
+
+    def ids(start: str, end: str) -> list[int]:
+        first, last = api.parse_date(start), api.parse_date(end)
+        return list(range(first.toordinal(), last.toordinal() + 1))
+
+    mock_aioresponse.get(ep_match_schedule, callback=callback, repeat=True)
+    index = schedule.ScheduleIndex()
+    games = stats.get_games("2024-01-01", "2024-01-10", index=index)
+    assert [g["id"] for g in games] == ids("2024-01-01", "2024-01-10")
+    assert requested == ["2024-01-01", "2024-01-08"]
+
+    requested.clear()
+    games = stats.get_games("2024-01-05", "2024-01-20", index=index)
+    assert [g["id"] for g in games] == ids("2024-01-05", "2024-01-20")
+    assert requested == ["2024-01-15"]
+
+    requested.clear()
+    games = stats.get_games("2024-01-02", "2024-01-03", index=index)
+    assert [g["id"] for g in games] == ids("2024-01-02", "2024-01-03")
+    assert requested == []
+
+
+def test_goal_is_frozen_and_slotted(goals: list[stats.Goal]) -> None:
+    """Goals can't be changed, have no instance dict, and can be pickled."""
+    goal = goals[0]
+    with pytest.raises(FrozenInstanceError):
+        goal.period = 1  # type: ignore[misc]
+    assert not hasattr(goal, "__dict__")
+    assert pickle.loads(pickle.dumps(goal)) == goal
+    assert goal.astuple() == tuple(getattr(goal, c) for c in stats.GoalTable.columns)
+
+
+def test_goal_table_round_trips_goals(goals: list[stats.Goal]) -> None:
+    """Goals added to a table read back the same, with strings encoded once."""
+    table = stats.GoalTable.from_goals(goals * 2)
+    assert len(table) == len(goals) * 2
+    assert list(table) == goals * 2
+    assert table[1] == goals[1]
+    assert table.teams.values == ["DET", "PHI"]
+    assert len(table.players.values) == len({g.player_name for g in goals})
+    assert table.nbytes == len(table) * 45
+
+
+def test_goal_table_to_pandas(goals: list[stats.Goal]) -> None:
+    """Tables convert to DataFrames sharing their numeric columns."""
+    table = stats.GoalTable.from_goals(goals)
+    df = table.to_pandas()
+    expected = pd.DataFrame(goals)
+    pd.testing.assert_frame_equal(df.astype(str), expected.astype(str))
+    assert str(df["game_date"].dtype).startswith("datetime64")
+    assert df["player_team"].dtype == "category"
+    assert np.shares_memory(df["game_id"].to_numpy(), np.asarray(table.game_id))
+
+
+def test_empty_goal_table_to_pandas() -> None:
+    """Empty tables convert too."""
+    df = stats.GoalTable().to_pandas()
+    assert list(df.columns) == list(stats.GoalTable.columns)
+    assert df.empty
+
+
+def test_goal_table_to_arrow(goals: list[stats.Goal]) -> None:
+    """Tables convert to Arrow with dictionary-encoded strings."""
+    pytest.importorskip("pyarrow")
+    arrow = stats.GoalTable.from_goals(goals).to_arrow()
+    assert arrow.column_names == list(stats.GoalTable.columns)
+    assert arrow.to_pylist() == [dataclasses.asdict(g) for g in goals]
+    assert str(arrow.schema.field("home_team").type).startswith("dictionary")
+
+
+def test_write_parquet_replaces_games_written(
+    goals: list[stats.Goal], tmp_path: Path
+) -> None:
+    """Goals of games written again are replaced, and other games' goals kept."""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    def game(game_id: int, season: int = 20232024) -> list[stats.Goal]:
+        return [dataclasses.replace(g, game_id=game_id, season=season) for g in goals]
+
+    corrected = [dataclasses.replace(g, player_name="X") for g in game(2)[:1]]
+    stats.write_parquet(stats.GoalTable.from_goals(game(1) + game(2)), tmp_path)
+    stats.write_parquet(stats.GoalTable.from_goals(game(3, 20222023)), tmp_path)
+    stats.write_parquet(stats.GoalTable.from_goals(corrected), tmp_path)
+    written = pq.read_table(tmp_path, filters=[("season", "=", 20232024)])
+    assert written.column("game_id").to_pylist() == [1] * len(goals) + [2]
+    assert written.column("player_name").to_pylist()[-1] == "X"
+    assert pq.read_table(tmp_path).num_rows == 2 * len(goals) + 1
+
+
+def test_write_parquet_failure_keeps_season(
+    goals: list[stats.Goal], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A write failing midway leaves the goals written before untouched."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    stats.write_parquet(stats.GoalTable.from_goals(goals), tmp_path)
+    write_to_dataset = pq.write_to_dataset
+
+    def fail_midway(*args: Any, **kwargs: Any) -> None:
+        write_to_dataset(*args, **kwargs)
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(pq, "write_to_dataset", fail_midway)
+    more = [dataclasses.replace(g, game_id=1) for g in goals]
+    with pytest.raises(OSError, match="No space"):
+        stats.write_parquet(stats.GoalTable.from_goals(more), tmp_path)
+    assert pq.read_table(tmp_path).num_rows == len(goals)
+    assert [p.name for p in tmp_path.iterdir()] == ["season=20232024"]
+
+
+def test_write_csv_matches_pandas(goals: list[stats.Goal]) -> None:
+    """Goals are written as CSV rows like those of their DataFrame."""
+    f = io.StringIO()
+    assert stats.write_csv(iter(goals), f) == len(goals)
+    table = stats.GoalTable.from_goals(goals)
+    assert f.getvalue() == table.to_pandas().to_csv(index=False)
+
+
+def test_write_csv_without_header(goals: list[stats.Goal]) -> None:
+    """Rows can be appended to a CSV file that already has a header."""
+    f = io.StringIO()
+    stats.write_csv(goals[:1], f, header=False)
+    assert f.getvalue().splitlines() == [
+        "20232024,2023020747,2024-01-25,2,00:01:37,D. Larkin,DET,DET,PHI,1,0,ev"
+    ]
+
+
+def test_write_jsonl(goals: list[stats.Goal]) -> None:
+    """Goals are written as JSON objects, with ISO dates and clocks."""
+    f = io.StringIO()
+    assert stats.write_jsonl(iter(goals), f) == len(goals)
+    first = json.loads(f.getvalue().splitlines()[0])
+    assert first["game_date"] == "2024-01-25"
+    assert first["time_in_period"] == "00:01:37"
+    assert first["player_name"] == "D. Larkin"
+
+
+def test_get_goal_table(
+    game_data: dict[str, Any],
+    schedule_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    ep_match_game: re.Pattern[AnyStr],
+) -> None:
+    """Tables of goals are filled straight from game info."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    table = stats.get_goal_table("2024-01-25", "2024-01-26")
+    assert list(table) == list(stats.get_goals("2024-01-25", "2024-01-26"))
+
+
+def test_goal_table_extend_with_table_reencodes_strings(
+    goals: list[stats.Goal],
+) -> None:
+    """Tables extended with another table re-encode its strings."""
+    table = stats.GoalTable.from_goals(goals[::-1])
+    table.extend(stats.GoalTable.from_goals(goals))
+    assert list(table) == goals[::-1] + goals
+    assert len(table.players.values) == len({g.player_name for g in goals})
+
+
+def test_goal_table_of_games(
+    game_data: dict[str, Any], goals: list[stats.Goal]
+) -> None:
+    """Worker processes parse chunks of games into tables."""
+    table = stats._goal_table([game_data, game_data])  # noqa: SLF001
+    assert list(table) == goals * 2
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64])
+def test_get_goals_in_worker_processes(
+    chunk_size: int,
+    game_data: dict[str, Any],
+    schedule_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    ep_match_game: re.Pattern[AnyStr],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Goals parsed by worker processes are the same, in the same order."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    monkeypatch.setattr(stats, "GAMES_PER_CHUNK", chunk_size)
+    serial = list(stats.get_goals("2024-01-22", "2024-01-28"))
+    assert list(stats.get_goals("2024-01-22", "2024-01-28", workers=2)) == serial
+    table = stats.get_goal_table("2024-01-22", "2024-01-28", workers=2)
+    assert list(table) == serial
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_aiter_goals_in_worker_processes_stops_early(
+    game_data: dict[str, Any],
+    schedule_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[AnyStr],
+    ep_match_game: re.Pattern[AnyStr],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Worker processes are shut down when iteration stops early."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    monkeypatch.setattr(stats, "GAMES_PER_CHUNK", 1)
+    goals = stats.aiter_goals("2024-01-22", "2024-01-28", workers=1)
+    first = await goals.__anext__()
+    await goals.aclose()
+    assert first.game_id == game_data["id"]
+
+
+@pytest.mark.parametrize(
+    ("clock", "expected"),
+    [("00:00", time(0, 0, 0)), ("12:34", time(0, 12, 34)), ("1:05", time(0, 1, 5))],
+)
+def test_parse_clock(clock: str, expected: time) -> None:
+    """Period clocks are parsed, whether or not they are zero-padded."""
+    assert stats.parse_clock(clock) == expected
+
+
+@pytest.mark.parametrize("clock", ["75:00", "12:60", "1234"])
+def test_parse_bad_clock_raises(clock: str) -> None:
+    """Invalid clocks raise ValueError, like strptime."""
+    with pytest.raises(ValueError, match=r"."):
+        stats.parse_clock(clock)
+
+
+def test_goal_seconds(goals: list[stats.Goal]) -> None:
+    """Goals know how many seconds into the period they were scored."""
+    assert [g.seconds for g in goals[:3]] == [97, 435, 608]
@@ -0,0 +1,88 @@
+"""Unit tests for the yohonhl.store module."""
+
+import dataclasses
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from yohonhl import stats
+from yohonhl.diff import GoalDiff
+from yohonhl.schedule import ScheduledGame
+from yohonhl.store import Store
+
+
+@pytest.fixture
+def store() -> Iterator[Store]:
+    """Open an empty in-memory store."""
+    with Store(":memory:") as store:
+        yield store
+
+
+def game(
+    game_id: int, day: date, home: str = "DET", away: str = "PHI"
+) -> ScheduledGame:
+    """Make a final game."""
+    return ScheduledGame(
+        game_id, 20232024, 2, day, f"{day}T00:00:00Z", "OFF", home, away, 3, 1
+    )
+
+
+def test_upsert_games(store: Store) -> None:
+    """Games are added, and updated by id."""
+    games = [game(1, date(2024, 1, 2)), game(2, date(2024, 1, 1), "BOS", "DET")]
+    assert store.upsert_games(games) == 2
+    store.upsert_games([games[0]._replace(game_state="FINAL")])
+    assert store.games() == [games[1], games[0]._replace(game_state="FINAL")]
+    assert store.games(team="BOS") == [games[1]]
+    assert store.games(season=20222023) == []
+
+
+def test_upsert_goals(store: Store, goals: list[stats.Goal]) -> None:
+    """Goals are added, and updated by game, period, time and scorer."""
+    assert store.upsert_goals(goals) == len(goals)
+    corrected = dataclasses.replace(goals[0], strength="pp")
+    store.upsert_goals([corrected])
+    assert store.goals() == [corrected, *goals[1:]]
+
+
+def test_replace_goals(store: Store, goals: list[stats.Goal]) -> None:
+    """Goals of games are replaced, removing those no longer in them."""
+    other = [dataclasses.replace(g, game_id=1) for g in goals]
+    assert store.replace_goals([(goals[0].game_id, goals), (1, other)]) == 2 * len(
+        goals
+    )
+    assert store.replace_goals([(1, other[:1])], batch_size=1) == 1
+    assert store.goals() == [other[0], *goals]
+
+
+def test_apply(store: Store, goals: list[stats.Goal]) -> None:
+    """Goal events insert, update and delete goals, replacing corrected ones."""
+    diff = GoalDiff()
+    assert store.apply(diff.update(goals[:2])) == 2
+    corrected = dataclasses.replace(goals[0], player_name="X")
+    assert store.apply(diff.update([corrected, *goals[2:]])) == len(goals)
+    assert store.goals() == [corrected, *goals[2:]]
+
+
+def test_goals_filters(store: Store, goals: list[stats.Goal]) -> None:
+    """Goals are filtered by season, team, player, strength and dates."""
+    store.upsert_goals(goals)
+    day = goals[0].game_date
+    sh = store.goals(team="DET", strength="sh", start=day, end=day)
+    assert sh
+    assert sh == [g for g in goals if g.player_team == "DET" and g.strength == "sh"]
+    assert store.goals(player="D. Larkin", season=20232024) == [
+        g for g in goals if g.player_name == "D. Larkin"
+    ]
+    assert store.goals(start=day.replace(day=26)) == []
+
+
+def test_store_persists(tmp_path: Path, goals: list[stats.Goal]) -> None:
+    """Games and goals are read back by a new store, creating its directory."""
+    path = tmp_path / "nested" / "goals.db"
+    with Store(path) as store:
+        store.upsert_goals(goals)
+    with Store(path) as store:
+        assert store.goals() == goals
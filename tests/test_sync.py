@@ -0,0 +1,142 @@
+"""Unit tests for the yohonhl.sync module."""
+
+import re
+from collections.abc import Callable
+from collections.abc import Iterator
+from datetime import date
+from typing import Any
+
+import pytest
+from aioresponses import CallbackResult
+from aioresponses import aioresponses
+
+from yohonhl import api
+from yohonhl import sync
+from yohonhl.store import Store
+
+
+class FakeNHL:
+    """Schedule weeks and game info of games whose states change over time."""
+
+    def __init__(self, week: Callable[..., dict[str, Any]]) -> None:
+        self.week = week
+        self.states: dict[date, str] = {}
+        self.failing: set[int] = set()
+        self.schedule_requests: list[str] = []
+        self.game_requests: list[int] = []
+        self.today = date(2024, 1, 1)
+
+    def schedule(self, url: Any, **_: Any) -> CallbackResult:
+        """Respond with the schedule week starting on the requested date."""
+        start = str(url).split("/")[-1]
+        self.schedule_requests.append(start)
+        week = self.week(start)
+        for day in week["gameWeek"]:
+            for game in day["games"]:
+                game["gameState"] = self.states.get(api.parse_date(day["date"]), "FUT")
+        return CallbackResult(payload=week)
+
+    def game(self, game_data: dict[str, Any]) -> Callable[..., CallbackResult]:
+        """Get a callback responding with `game_data` as the requested game."""
+
+        def callback(url: Any, **_: Any) -> CallbackResult:
+            game_id = int(str(url).split("/")[-2])
+            self.game_requests.append(game_id)
+            if game_id in self.failing:
+                return CallbackResult(status=404)
+            return CallbackResult(payload={**game_data, "id": game_id})
+
+        return callback
+
+    def advance(self, today: date, **states: str) -> None:
+        """Set the states of games by day, and what day it is."""
+        for day, state in states.items():
+            self.states[date(2024, 1, int(day[1:]))] = state
+        self.schedule_requests.clear()
+        self.game_requests.clear()
+        self.today = today
+
+
+@pytest.fixture
+def nhl(
+    week: Callable[..., dict[str, Any]],
+    game_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[str],
+    ep_match_game: re.Pattern[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> FakeNHL:
+    """Mock the API with games whose states change when advanced."""
+    fake = FakeNHL(week)
+    mock_aioresponse.get(ep_match_schedule, callback=fake.schedule, repeat=True)
+    mock_aioresponse.get(ep_match_game, callback=fake.game(game_data), repeat=True)
+    monkeypatch.setattr(sync, "_today", lambda: fake.today)
+    return fake
+
+
+@pytest.fixture
+def store() -> Iterator[Store]:
+    """Open an empty in-memory store."""
+    with Store(":memory:") as store:
+        yield store
+
+
+def day(n: int) -> date:
+    """Get a day of January 2024, whose game's id is its ordinal."""
+    return date(2024, 1, n)
+
+
+def test_update_fetches_only_what_changed(nhl: FakeNHL, store: Store) -> None:
+    """Updates get new schedule days and games that started since the last one."""
+    final = {f"d{n}": "OFF" for n in range(1, 9)}
+    nhl.advance(day(10), **final, d9="LIVE")
+    result = sync.update(store, "2024-01-01")
+    assert result == sync.SyncResult(day(1), day(10), 10, 9, day(8))
+    assert nhl.schedule_requests == ["2024-01-01", "2024-01-08"]
+    assert sorted(nhl.game_requests) == [day(n).toordinal() for n in range(1, 10)]
+    assert store.watermark == day(8)
+
+    nhl.advance(day(11), d9="OFF", d10="OFF")
+    result = sync.update(store)
+    assert result == sync.SyncResult(day(9), day(11), 3, 2, day(10))
+    assert nhl.schedule_requests == ["2024-01-09"]
+    assert sorted(nhl.game_requests) == [day(9).toordinal(), day(10).toordinal()]
+
+    nhl.advance(day(11))
+    assert sync.update(store) == sync.SyncResult(day(11), day(11), 1, 0, day(10))
+    assert nhl.game_requests == []
+    assert {g.game_state for g in store.games()} == {"OFF", "FUT"}
+    assert len(store.goals()) > 0
+
+
+def test_update_holds_watermark_before_failed_games(nhl: FakeNHL, store: Store) -> None:
+    """Games that could not be fetched are fetched again by the next update."""
+    nhl.advance(day(5), d1="OFF", d2="OFF", d3="OFF", d4="OFF")
+    nhl.failing.add(day(2).toordinal())
+    assert sync.update(store, "2024-01-01").watermark == day(1)
+    assert day(2).toordinal() not in store.game_states(day(1))
+
+    nhl.failing.clear()
+    nhl.advance(day(5))
+    result = sync.update(store)
+    assert result.watermark == day(4)
+    assert nhl.game_requests == [day(2).toordinal()]
+
+
+def test_update_without_dates_starts_today(nhl: FakeNHL, store: Store) -> None:
+    """The first update gets today's games by default, and later ones stop there."""
+    nhl.advance(day(3), d3="LIVE")
+    assert sync.update(store) == sync.SyncResult(day(3), day(3), 1, 1, day(2))
+    nhl.advance(day(3))
+    assert sync.update(store, end_date="2024-01-01").updated == 0
+    assert nhl.schedule_requests == []
+
+
+def test_ingest_gets_schedule_once(nhl: FakeNHL, store: Store) -> None:
+    """Ingesting gets each schedule week once, and the games that started."""
+    nhl.advance(day(10), **{f"d{n}": "OFF" for n in range(1, 9)}, d9="LIVE")
+    assert sync.ingest(store, "2024-01-01", "2024-01-10") == 9
+    assert nhl.schedule_requests == ["2024-01-01", "2024-01-08"]
+    assert sorted(nhl.game_requests) == [day(n).toordinal() for n in range(1, 10)]
+    assert len(store.games()) == 10
+    assert store.watermark is None
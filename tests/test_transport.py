@@ -0,0 +1,102 @@
+"""Unit tests for the yohonhl.transport module."""
+
+import re
+import time
+import zipfile
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aioresponses import aioresponses
+
+from yohonhl import api
+from yohonhl import stats
+from yohonhl.transport import RecordingTransport
+from yohonhl.transport import ReplayTransport
+
+
+def game(game_id: int) -> str:
+    """Get the URL of a game's info."""
+    return api.game_url(game_id)
+
+
+def test_replay_serves_recorded_goals(
+    tmp_path: Path,
+    schedule_data: dict[str, Any],
+    game_data: dict[str, Any],
+    mock_aioresponse: aioresponses,
+    ep_match_schedule: re.Pattern[str],
+    ep_match_game: re.Pattern[str],
+) -> None:
+    """Goals got over a network are got again from its recording without one."""
+    mock_aioresponse.get(ep_match_schedule, payload=schedule_data, repeat=True)
+    mock_aioresponse.get(ep_match_game, payload=game_data, repeat=True)
+    path = tmp_path / "recordings" / "week.zip"
+    with RecordingTransport(path) as recording:
+        client = api.Client(transport=recording)
+        goals = list(stats.get_goals("2024-01-25", "2024-01-31", client=client))
+        api.close(client)
+    requests = sum(map(len, mock_aioresponse.requests.values()))
+
+    with ReplayTransport(path, latency=0.001, jitter=0.001, seed=1) as replay:
+        client = api.Client(transport=replay)
+        replayed = list(stats.get_goals("2024-01-25", "2024-01-31", client=client))
+        api.close(client)
+    assert replayed == goals
+    assert len(goals) > 0
+    assert sum(map(len, mock_aioresponse.requests.values())) == requests
+
+
+def test_replay_serves_responses_in_order(
+    tmp_path: Path, mock_aioresponse: aioresponses, ep_match_game: re.Pattern[str]
+) -> None:
+    """Responses to a URL are served as recorded, then the last one again."""
+    mock_aioresponse.get(ep_match_game, payload={"poll": 1}, headers={"ETag": '"1"'})
+    mock_aioresponse.get(ep_match_game, status=404)
+    mock_aioresponse.get(ep_match_game, payload={"poll": 2})
+    path = tmp_path / "polls.zip"
+    with RecordingTransport(path) as recording:
+        client = api.Client(transport=recording)
+        recorded = [api.fetch_game_info([1], client=client)[1] for _ in range(3)]
+        api.close(client)
+        recording.close()
+
+    with ReplayTransport(path) as replay:
+        client = api.Client(transport=replay)
+        replayed = [api.fetch_game_info([1], client=client)[1] for _ in range(4)]
+        missing = api.fetch_game_info([2], client=client)[2]
+        api.close(client)
+    assert [r.data for r in replayed] == [{"poll": 1}, None, {"poll": 2}, {"poll": 2}]
+    assert [r.status for r in replayed[:3]] == [r.status for r in recorded]
+    assert missing.status == 404
+    assert client.closed
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_replay_keeps_headers_and_latency(
+    tmp_path: Path, mock_aioresponse: aioresponses
+) -> None:
+    """Validators are replayed, after the latency given."""
+    mock_aioresponse.get(game(1), payload={}, headers={"ETag": '"1"', "Other": "x"})
+    path = tmp_path / "headers.zip"
+    with RecordingTransport(path) as recording:
+        async with api.Client(transport=recording) as client:
+            await recording.get(client, game(1), {})
+
+    with ReplayTransport(path, latency=0.05) as replay:
+        start = time.monotonic()
+        response = await replay.get(api.Client(), game(1), {})
+        assert time.monotonic() - start >= 0.05
+    assert response.ok
+    assert response.headers == {"ETag": '"1"'}
+
+
+def test_replay_of_bad_archive_raises(tmp_path: Path) -> None:
+    """Archives not closed by their recording can't be replayed."""
+    path = tmp_path / "partial.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("bodies/1", b"{}")
+    with pytest.raises(ValueError, match="not a complete recording"):
+        ReplayTransport(path)
+    with pytest.raises(ValueError, match="must not be negative"):
+        ReplayTransport(path, latency=-1)